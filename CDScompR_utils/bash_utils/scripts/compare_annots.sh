@@ -9,7 +9,10 @@ set -euo pipefail
 # GMT_DIR: path to GeneModelTransfer cloned repo
 # GMT_SIF: path to GeneModelTransfer .sif
 # PYTHON_LIBS_SIF: path to python libraries .sif (compare_annots.py and CDScompR dependencies)
-# CDSCOMPR_DIR: path to CDScompR cloned repo
+# CDSCOMPR_DIR: path to CDScompR cloned repo (not needed with SCORE_ENGINE=builtin)
+# SCORE_ENGINE (optional): "CDScompR" (default, sorted GFFs + CDScompR.py) or "builtin" (identity scores computed by compare_annots.py, without sorting the GFFs nor running CDScompR;
+#   the GFFs are parsed once into Arrow annotation tables and the scores are written as Parquet, the overlaps TSV and summary being the only text outputs)
+# SCORE_THREADS (optional): number of processes computing the builtin identity scores (default: 1)
 
 module load singularity/3.6.3
 
@@ -69,9 +72,18 @@ import_and_check_variables() {
   check_files_exist "$CONFIG_FILE"
   source "${CONFIG_FILE}"
 
-  check_variables_exist GMT_DIR GMT_SIF PYTHON_LIBS_SIF CDSCOMPR_DIR REF_GFF ALT_GFF REF_NAME ALT_NAME OUT_DIR SPAN_TYPE
+  SCORE_ENGINE=${SCORE_ENGINE:-CDScompR}
+  SCORE_THREADS=${SCORE_THREADS:-1}
+  check_variables_exist GMT_DIR GMT_SIF PYTHON_LIBS_SIF REF_GFF ALT_GFF REF_NAME ALT_NAME OUT_DIR SPAN_TYPE
   check_files_exist "$GMT_SIF" "$PYTHON_LIBS_SIF" "$REF_GFF" "$ALT_GFF"
-  check_folders_exist "$GMT_DIR" "$CDSCOMPR_DIR"
+  check_folders_exist "$GMT_DIR"
+  if [[ "$SCORE_ENGINE" == "CDScompR" ]]; then
+    check_variables_exist CDSCOMPR_DIR
+    check_folders_exist "$CDSCOMPR_DIR"
+  elif [[ "$SCORE_ENGINE" != "builtin" ]]; then
+    echo "Error: SCORE_ENGINE must be 'CDScompR' or 'builtin' (got '$SCORE_ENGINE')." >&2
+    exit 1
+  fi
 
   SCRIPT_DIR="$(dirname "$(realpath "$0")")"
   CDSCOMPR_UTILS_DIR=$(realpath ${SCRIPT_DIR}/../..)
@@ -110,56 +122,50 @@ run_CDScompR() {
   cd - >/dev/null
   mv ${out_dir}/results ${out_dir}/02_CDScompR_results
   
-  awk -F ',' '{if (NR > 1 && $3 != "~" && $4 != "~"){print $7}}' ${out_dir}/02_CDScompR_results/*.csv | sort -n | uniq -c >${out_dir}/02_CDScompR_results/${suffix}_overlaping_genes_score_distr.txt
-  
   cdscompr_csv_output=$(realpath "${out_dir}/02_CDScompR_results/*.csv")
-
-  singularity exec "$PYTHON_LIBS_SIF" python3 "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/plot_identity_hist.py" --csv $cdscompr_csv_output --ref-name ${REF_NAME} --alt-name ${ALT_NAME} --output ${out_dir}/02_CDScompR_results/${suffix}_overlaping_genes_score_hist.png >${out_dir}/hist.log 2>&1
+  summarize_scores "${cdscompr_csv_output}" "${suffix}" "${out_dir}"
 
   echo $cdscompr_csv_output
 }
 
-summarize_overlap_types() {
-    local input="$1"
-    local output="$2"
-
-    cut -f12 "$input" | tail -n +2 | sort | uniq -c | awk '{print $2":\t"$1}' >"$output"
-
-    local match_mean_score
-    match_mean_score=$(awk -F'\t' '
-    BEGIN { sum=0; count=0 }
-    $12 == "match" {
-        gsub(/[\[\]'\'' ]/, "", $11);
-        split($11, parts, ":");
-        sum += parts[2];
-        count++;
-    }
-    END {
-        if (count > 0)
-            printf "(mean id score: %.2f%%)", sum/count;
-    }' "$input")
-
-    read -r nb_match_with_overlap nb_match_without_overlap < <(
-        awk -F'\t' '
-        BEGIN { w = 0; wo = 0 }
-        $12 == "match" {
-            gsub(/[\[\]'\'' ]/, "", $11);
-            if ($11 ~ /^<NA>:0\.0$/) {
-                wo++;
-            } else if ($11 ~ /:0\.0$/) {
-                w++;
-            }
-        }
-        END { print w, wo }
-        ' "$input"
-    )
-
-    if [[ -n "$match_mean_score" ]]; then
-        sed -i "/^match:/ s/$/ $match_mean_score\n--- including ${nb_match_with_overlap} match(es) with a 0.00% score, overlapping according to CDScompR/" "$output"
-    fi
-    if [[ "$nb_match_without_overlap" -ne 0 ]]; then
-        echo -e "\nWARNING: ${nb_match_without_overlap} match(es) were not detected by CDScompR and appear with a score of 0.00%" >>"$output"
-    fi
+run_builtin_scores() {
+  local ref_gff=$1
+  local alt_gff=$2
+  local suffix=$3
+  local out_dir=$(realpath $4)
+
+  mkdir -p "${out_dir}/01_annotation_tables" "${out_dir}/02_identity_scores" "${out_dir}/03_overlaps"
+  local ref_table="${out_dir}/01_annotation_tables/ref_"$(basename "$ref_gff" .gff)".arrow"
+  local alt_table="${out_dir}/01_annotation_tables/alt_"$(basename "$alt_gff" .gff)".arrow"
+  singularity exec "$PYTHON_LIBS_SIF" python3 "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/annotation_table.py" from_gff --gff "$ref_gff" -o "${ref_table}" >/dev/null &
+  local ref_pid=$!
+  singularity exec "$PYTHON_LIBS_SIF" python3 "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/annotation_table.py" from_gff --gff "$alt_gff" -o "${alt_table}" >/dev/null
+  wait $ref_pid
+
+  local scores_file="${out_dir}/02_identity_scores/${suffix}_identity_scores.parquet"
+  (
+    singularity run "$PYTHON_LIBS_SIF" "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/compare_annots.py" \
+        --ref_gff "${ref_table}" --pred_gff "${alt_table}" --span_type "${SPAN_TYPE}" --threads "${SCORE_THREADS}" \
+        --scores_output "${scores_file}" -o "${out_dir}/03_overlaps/${suffix}_overlaps.tsv" \
+        --summary_output "${out_dir}/03_overlaps/${suffix}_summary.tsv" --summary_json "${out_dir}/03_overlaps/${suffix}_summary.json" \
+        >"${out_dir}/overlaps.log" 2>&1
+  ) || {
+    echo "Error: compare_annots.py failed. Check ${out_dir}/overlaps.log for details." >&2
+    exit 1
+  }
+  summarize_scores "${scores_file}" "${suffix}" "${out_dir}"
+
+  echo "${scores_file}"
+}
+
+summarize_scores() {
+  local scores_file=$1
+  local suffix=$2
+  local out_dir=$3
+  local scores_dir=$(dirname "${scores_file}")
+
+  singularity exec "$PYTHON_LIBS_SIF" python3 "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/plot_identity_hist.py" --csv "${scores_file}" --ref-name ${REF_NAME} --alt-name ${ALT_NAME} --output ${scores_dir}/${suffix}_overlaping_genes_score_hist.png \
+    --distribution_output ${scores_dir}/${suffix}_overlaping_genes_score_distr.txt >${out_dir}/hist.log 2>&1
 }
 
 
@@ -169,15 +175,20 @@ main() {
   source ${GMT_DIR}/bin/lib_gff_comment.sh
 
   mkdir -p "${OUT_DIR}"
+  if [[ "$SCORE_ENGINE" == "builtin" ]]; then
+    # The identity scores and the overlaps are computed in a single compare_annots.py run, on the unsorted GFFs
+    run_builtin_scores "$REF_GFF" "$ALT_GFF" "${OUTPUT_SUFFIX}" "${OUT_DIR}" >/dev/null
+    return
+  fi
+
   read sorted_ref_gff sorted_alt_gff < <(sort_gffs "$REF_GFF" "$ALT_GFF" "$OUT_DIR")
 
   CDScompR_output_csv=$(run_CDScompR "${sorted_ref_gff}" "${sorted_alt_gff}" "${OUTPUT_SUFFIX}" "${OUT_DIR}")
   
   if contains_arg "--overlaps" "${OPT_ARGS}"; then
     mkdir -p "${OUT_DIR}/03_overlaps"
-    singularity run "$PYTHON_LIBS_SIF" "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/compare_annots.py" --ref_gff "${sorted_ref_gff}" --pred_gff "${sorted_alt_gff}" --cdscompr_csv "${CDScompR_output_csv}" --span_type "${SPAN_TYPE}" -o "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_overlaps.tsv" 2>&1 | tee "${OUT_DIR}/overlaps.log"
-
-    summarize_overlap_types "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_overlaps.tsv" "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_summary.tsv"
+    singularity run "$PYTHON_LIBS_SIF" "${CDSCOMPR_UTILS_DIR}/python_utils/scripts/compare_annots.py" --ref_gff "${sorted_ref_gff}" --pred_gff "${sorted_alt_gff}" --cdscompr_csv "${CDScompR_output_csv}" --span_type "${SPAN_TYPE}" -o "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_overlaps.tsv" \
+      --summary_output "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_summary.tsv" --summary_json "${OUT_DIR}/03_overlaps/${OUTPUT_SUFFIX}_summary.json" 2>&1 | tee "${OUT_DIR}/overlaps.log"
   fi
 }
 
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Convert a GFF file to an annotation table (one row per gene model: gene, its transcript and its CDS coordinates),
+written as Arrow IPC (.arrow, read memory-mapped by the other scripts) or Parquet (.parquet), and back to GFF.
+The table is parsed once from the GFF text and can then replace the GFF in compare_annots.py (--ref_gff/--pred_gff),
+which skips the gffutils databases.
+"""
+import argparse
+import sys
+import os
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from CDScompR_lib.arrow_io import gff_to_table, read_table, write_gff, write_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a GFF file to an Arrow/Parquet annotation table, and back.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    from_gff_parser = subparsers.add_parser("from_gff", help="Parse a GFF file into an annotation table")
+    from_gff_parser.add_argument("--gff", required=True, help="Input GFF file")
+    from_gff_parser.add_argument("-o", "--output", required=True, help="Output table (.arrow or .parquet)")
+
+    to_gff_parser = subparsers.add_parser("to_gff", help="Export an annotation table to GFF (gene, mRNA and CDS features)")
+    to_gff_parser.add_argument("--table", required=True, help="Input table (.arrow or .parquet)")
+    to_gff_parser.add_argument("-o", "--output", required=True, help="Output GFF file")
+
+    args = parser.parse_args()
+
+    if args.command == "from_gff":
+        table = gff_to_table(args.gff)
+        write_table(table, args.output)
+        print(f"{len(table)} gene(s) written to {args.output}")
+    elif args.command == "to_gff":
+        with open(args.output, "w") as out:
+            write_gff(read_table(args.table), out)
+
+
+if __name__ == "__main__":
+    main()
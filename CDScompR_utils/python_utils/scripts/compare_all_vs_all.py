@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare K annotations all-vs-all: for each pair of annotations, count the overlap groups of each type and compute
+the mean identity score of the paired genes (built-in identity engine), and write them as a tidy table
+(one row per ordered pair of annotations).
+Each GFF is parsed once into a cache (--cache_dir, reused by later runs while the GFF is unchanged), then the
+K(K-1)/2 pairwise comparisons are run in a process pool reading these caches.
+"""
+import argparse
+import sys
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from CDScompR_lib.annotation_cache import cache_annotation, genes_from_records, read_cached_records
+from CDScompR_lib.gff_utils import parse_annotation_argument
+from CDScompR_lib.identity import compute_identity_scores
+from CDScompR_lib.overlap_group import OverlapGroup
+
+TYPES = ["match", "split", "fusion", "complex", "appearance", "disappearance"]
+REVERSED_TYPES = {"match": "match", "split": "fusion", "fusion": "split", "complex": "complex",
+                  "appearance": "disappearance", "disappearance": "appearance"}
+
+# Records of the annotations already read by a worker process, by cache path
+_records = {}
+
+
+def _cached_records(cache_path):
+    if cache_path not in _records:
+        _records[cache_path] = read_cached_records(cache_path)
+    return _records[cache_path]
+
+
+def compare_pair(task):
+    """
+    Compare two cached annotations (the first one as reference). Returns the group type counts, the number of
+    paired genes and their mean identity score.
+    """
+    name1, cache1, name2, cache2 = task
+    ref_genes = genes_from_records(_cached_records(cache1), is_ref=True)
+    pred_genes = genes_from_records(_cached_records(cache2), is_ref=False)
+    groups = OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
+    scores = [pair.identity_score for pairs in compute_identity_scores(groups) for pair in pairs]
+    counts = Counter(group.get_type() for group in groups)
+    return {
+        "annotation1": name1,
+        "annotation2": name2,
+        **{group_type: counts.get(group_type, 0) for group_type in TYPES},
+        "nb_paired_genes": len(scores),
+        "mean_identity_score": round(sum(scores) / len(scores), 2) if scores else None,
+    }
+
+
+def reverse_row(row):
+    """
+    Row of the same comparison with annotation2 as reference.
+    """
+    reversed_row = dict(row, annotation1=row["annotation2"], annotation2=row["annotation1"])
+    for group_type in TYPES:
+        reversed_row[REVERSED_TYPES[group_type]] = row[group_type]
+    return reversed_row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="All-vs-all comparison of K annotations (overlap group types and mean identity scores).")
+    parser.add_argument("--gff", required=True, nargs="+", type=parse_annotation_argument, help="Annotations as name=path/to/annot.gff")
+    parser.add_argument("--span_type", choices=["gene", "mRNA", "CDS"], default="gene",
+                        help="Feature span to use for overlap detection (default: gene)")
+    parser.add_argument("--cache_dir", default="annotation_cache", help="Directory of the parsed annotations (default: annotation_cache)")
+    parser.add_argument("--threads", type=int, default=1, help="Number of processes (default: 1)")
+    parser.add_argument("-o", "--output", required=True, help="Output TSV file (one row per ordered pair of annotations)")
+
+    args = parser.parse_args()
+
+    names = [name for name, _ in args.gff]
+    if len(set(names)) != len(names):
+        parser.error("annotation names must be unique")
+    if len(names) < 2:
+        parser.error("at least two annotations are needed")
+    os.makedirs(args.cache_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.threads) as executor:
+        print(f"Parsing {len(names)} annotations...")
+        cache_paths = list(executor.map(
+            cache_annotation,
+            [gff_path for _, gff_path in args.gff],
+            [args.span_type] * len(names),
+            [os.path.join(args.cache_dir, f"{name}.{args.span_type}.pkl") for name in names],
+        ))
+        tasks = [
+            (names[i], cache_paths[i], names[j], cache_paths[j])
+            for i in range(len(names)) for j in range(i + 1, len(names))
+        ]
+        print(f"Running {len(tasks)} pairwise comparisons...")
+        rows = list(executor.map(compare_pair, tasks))
+
+    rows += [reverse_row(row) for row in rows]
+    order = {name: i for i, name in enumerate(names)}
+    rows.sort(key=lambda row: (order[row["annotation1"]], order[row["annotation2"]]))
+    pd.DataFrame(rows).to_csv(args.output, sep="\t", index=False)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
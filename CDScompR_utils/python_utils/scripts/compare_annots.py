@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 """
 Compare expert and predicted GFF annotations by overlapping genes and summarize CDS stats.
-Adds best hit info and identity score from CDScompR CSV output.
+Adds best hit info and identity score from CDScompR CSV output, or computes them with the built-in identity engine
+(CDScompR_lib.identity) when no CSV is given.
+With --shard i/N, only the chromosomes of the i-th of N shards are compared; 'compare_annots.py gather' then
+concatenates the outputs of the shards.
 """
 import argparse
 import sys
@@ -10,33 +13,102 @@ import os
 sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 )
-from CDScompR_lib.gene import Gene
 from CDScompR_lib.overlap_group import OverlapGroup
-from CDScompR_lib.comparison_utils import add_identity_scores, summarize_overlaps, load_score_file
-from CDScompR_lib.gff_utils import build_db
+from CDScompR_lib.comparison_utils import add_identity_scores, summarize_overlaps, load_score_file, summarize_overlap_types, merge_overlap_summaries, read_overlap_summary, write_overlap_summary
+from CDScompR_lib.gff_utils import parse_region, read_regions
+from CDScompR_lib.identity import compute_identity_scores, write_scores
+from CDScompR_lib.arrow_io import load_genes
+from CDScompR_lib.sharding import gather_scores, gather_tsv, parse_shard, shard_regions
+
+
+def gather(argv):
+    """
+    Concatenate the outputs of the shards of a comparison (run with --shard i/N), in the given order,
+    and merge their summaries into the summary of the whole comparison.
+    """
+    parser = argparse.ArgumentParser(prog="compare_annots.py gather", description="Concatenate the outputs of compare_annots.py shards.")
+    parser.add_argument("--overlaps", nargs="+", required=True, help="Overlaps TSV files of the shards (-o of each shard), in shard order")
+    parser.add_argument("-o", "--output", required=True, help="Output TSV file")
+    parser.add_argument("--scores", nargs="+", help="Identity scores files of the shards (--scores_output of each shard), in shard order")
+    parser.add_argument("--scores_output", help="Concatenated identity scores file (CSV, or a typed table if it ends with .parquet or .arrow)")
+    parser.add_argument("--summaries", nargs="+", help="JSON summaries of the shards (--summary_json of each shard)")
+    parser.add_argument("--summary_output", help="Write the number of groups per type and the identity scores of the matches of all shards to this file")
+    parser.add_argument("--summary_json", help="Also write the summary to this JSON file (requires --summary_output)")
+    args = parser.parse_args(argv)
+
+    if bool(args.scores) != bool(args.scores_output):
+        parser.error("--scores and --scores_output must be given together")
+    if bool(args.summaries) != bool(args.summary_output):
+        parser.error("--summaries and --summary_output must be given together")
+    if args.summary_json and not args.summary_output:
+        parser.error("--summary_json requires --summary_output")
+
+    nb_rows = gather_tsv(args.overlaps, args.output)
+    print(f"{nb_rows} groups of {len(args.overlaps)} shard(s) written to {args.output}")
+    if args.scores:
+        gather_scores(args.scores, args.scores_output)
+        print(f"Identity scores written to {args.scores_output}")
+    if args.summary_output:
+        summary = merge_overlap_summaries([read_overlap_summary(summary_json) for summary_json in args.summaries])
+        write_overlap_summary(summary, args.summary_output, args.summary_json)
+
 
 def main():
+    if sys.argv[1:2] == ["gather"]:
+        gather(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description="Compare expert and predicted GFF annotations.")
-    parser.add_argument("--ref_gff", help="Reference (expert) GFF file")
-    parser.add_argument("--pred_gff", help="Predicted GFF file")
-    parser.add_argument("--cdscompr_csv", help="CDScompR csv output file")
+    parser.add_argument("--ref_gff", help="Reference (expert) GFF file, or its annotation table (.arrow/.parquet, see annotation_table.py)")
+    parser.add_argument("--pred_gff", help="Predicted GFF file, or its annotation table (.arrow/.parquet)")
+    parser.add_argument("--cdscompr_csv", help="CDScompR csv output file, or a .parquet/.arrow scores file (if not given, the identity scores are computed by the built-in engine)")
+    parser.add_argument("--scores_output", help="Write the identity scores computed by the built-in engine to this file (CDScompR layout; CSV, or a typed table if it ends with .parquet or .arrow)")
+    parser.add_argument("--threads", type=int, default=1, help="Number of processes computing the built-in identity scores (default: 1)")
     parser.add_argument("--span_type", choices=["gene", "mRNA", "CDS"], default="gene",
                         help="Feature span to use for overlap detection (default: gene)")
+    parser.add_argument("--regions", help="Only compare the genes overlapping the regions of this file (chr start end, 1-based inclusive, one region per line, e.g. zones.tsv)")
+    parser.add_argument("--region", action="append", default=[],
+                        help="Only compare the genes overlapping this region (chr:start-end, 1-based inclusive). Can be repeated and combined with --regions")
+    parser.add_argument("--shard",
+                        help="Only compare the chromosomes of the i-th of N shards (i/N, 1-based), chromosomes being split into N shards of balanced gene counts. Gather the shard outputs with 'compare_annots.py gather'")
+    parser.add_argument("--overlap_matrix", action="store_true",
+                        help="Add a 'pairwise_overlaps' column: for each overlapping ref/pred pair of the group, (ref ID, pred ID, span overlap (bp), fraction of the ref span, fraction of the pred span, shared CDS (bp))")
     parser.add_argument("-o", "--output", help="Output TSV file")
+    parser.add_argument("--summary_output", help="Write the number of groups per type and the identity scores of the matches to this file")
+    parser.add_argument("--summary_json", help="Also write the summary to this JSON file (requires --summary_output)")
 
     args = parser.parse_args()
 
-    print("Building GFF databases...")
-    ref_genes_db = build_db(args.ref_gff)
-    pred_genes_db = build_db(args.pred_gff)
+    if not args.ref_gff or not args.pred_gff:
+        parser.error("--ref_gff and --pred_gff are required (except for 'compare_annots.py gather')")
+    if args.scores_output and args.cdscompr_csv:
+        parser.error("--scores_output requires the built-in identity engine (no --cdscompr_csv)")
+    if args.summary_json and not args.summary_output:
+        parser.error("--summary_json requires --summary_output")
+
+    regions = None
+    if args.regions or args.region:
+        regions = (read_regions(args.regions) if args.regions else []) + [parse_region(region) for region in args.region]
+        print(f"Restricting the comparison to the genes overlapping {len(regions)} region(s)...")
+
+    if args.shard:
+        try:
+            parse_shard(args.shard)
+        except ValueError as error:
+            parser.error(str(error))
+        regions = shard_regions([args.ref_gff, args.pred_gff], args.shard, regions)
+        print(f"Shard {args.shard}: comparing the genes of {len({chrom for chrom, _, _ in regions})} chromosome(s)...")
 
-    print("Parsing genes...")
-    ref_genes = [Gene.from_gff(ref_genes_db, g, is_ref=True, span_type=args.span_type) for g in ref_genes_db.features_of_type("gene")]
-    pred_genes = [Gene.from_gff(pred_genes_db, g, is_ref=False, span_type=args.span_type) for g in pred_genes_db.features_of_type("gene")]
+    print("Building GFF databases and parsing genes...")
+    ref_genes = load_genes(args.ref_gff, True, args.span_type, regions)
+    pred_genes = load_genes(args.pred_gff, False, args.span_type, regions)
 
 
     if args.cdscompr_csv:
-        score_df = load_score_file(args.cdscompr_csv)
+        if regions is None:
+            score_df = load_score_file(args.cdscompr_csv)
+        else:
+            score_df = load_score_file(args.cdscompr_csv, ref_ids={gene.id for gene in ref_genes}, alt_ids={gene.id for gene in pred_genes})
         print("Adding identity scores...")
         add_identity_scores(ref_genes, score_df, is_ref=True)
         add_identity_scores(pred_genes, score_df, is_ref=False)
@@ -45,7 +117,16 @@ def main():
     overlap_groups = OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
     print(f"Found {len(overlap_groups)} overlapping groups.")
 
-    summarize_overlaps(overlap_groups, args.span_type, args.output)
+    if not args.cdscompr_csv:
+        group_pairs = compute_identity_scores(overlap_groups, threads=args.threads)
+        if args.scores_output:
+            write_scores(overlap_groups, group_pairs, args.scores_output)
+
+    summarize_overlaps(overlap_groups, args.span_type, args.output, overlap_matrix=args.overlap_matrix)
+
+    if args.summary_output:
+        score_source = "CDScompR" if args.cdscompr_csv else "built-in"
+        write_overlap_summary(summarize_overlap_types(overlap_groups, score_source), args.summary_output, args.summary_json)
 
 if __name__ == "__main__":
     main()
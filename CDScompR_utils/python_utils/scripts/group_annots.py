@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Group the overlapping genes of N annotations (e.g. a reference and several predictors) in a single sweep,
+and report for each group its genes per annotation and the type of annotation change for each pair of annotations.
+"""
+import argparse
+import sys
+import os
+import pandas as pd
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+from CDScompR_lib.overlap_group import MultiOverlapGroup
+from CDScompR_lib.arrow_io import load_genes
+from CDScompR_lib.gff_utils import parse_annotation_argument, parse_region, read_regions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group the overlapping genes of N annotations in a single sweep.")
+    parser.add_argument("--gff", required=True, nargs="+", type=parse_annotation_argument,
+                        help="Annotations as name=path/to/annot.gff (the first one is the reference of the pairwise types)")
+    parser.add_argument("--span_type", choices=["gene", "mRNA", "CDS"], default="gene",
+                        help="Feature span to use for overlap detection (default: gene)")
+    parser.add_argument("--regions", help="Only group the genes overlapping the regions of this file (chr start end, 1-based inclusive, one region per line)")
+    parser.add_argument("--region", action="append", default=[],
+                        help="Only group the genes overlapping this region (chr:start-end, 1-based inclusive). Can be repeated and combined with --regions")
+    parser.add_argument("-o", "--output", help="Output TSV file")
+
+    args = parser.parse_args()
+
+    sources = [name for name, _ in args.gff]
+    if len(set(sources)) != len(sources):
+        parser.error("annotation names must be unique")
+    if any("_vs_" in source for source in sources):
+        parser.error("annotation names cannot contain '_vs_'")
+
+    regions = None
+    if args.regions or args.region:
+        regions = (read_regions(args.regions) if args.regions else []) + [parse_region(region) for region in args.region]
+
+    print("Building GFF databases and parsing genes...")
+    genes_by_source = {
+        name: load_genes(gff_path, i == 0, args.span_type, regions, source=name) for i, (name, gff_path) in enumerate(args.gff)
+    }
+
+    print("Detecting overlapping gene groups...")
+    groups = MultiOverlapGroup.overlap_groups_from_annotations(genes_by_source)
+    print(f"Found {len(groups)} overlapping groups across {len(sources)} annotations.")
+
+    df = pd.DataFrame([group.summarize(sources) for group in groups])
+    df.insert(0, "span_type", args.span_type)
+    if args.output:
+        df.to_csv(args.output, sep="\t", index=False)
+        print(f"Results written to {args.output}")
+    else:
+        print(df)
+
+
+if __name__ == "__main__":
+    main()
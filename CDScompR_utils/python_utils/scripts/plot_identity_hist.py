@@ -10,7 +10,7 @@ sys.path.insert(
     0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 )
 
-from CDScompR_lib.plots import plot_identity_hist_from_csv
+from CDScompR_lib.plots import plot_identity_hist_from_csv, write_identity_distribution
 
 
 def main():
@@ -18,7 +18,7 @@ def main():
         description="Plot histogram of identity scores from a CDScompR CSV file"
     )
     parser.add_argument(
-        "--csv", required=True, help="Path to the CDScompR CSV file to process"
+        "--csv", required=True, help="Path to the CDScompR CSV file to process (or its .parquet/.arrow version)"
     )
     parser.add_argument(
         "--ref-name",
@@ -35,9 +35,16 @@ def main():
         help="Output file path (PNG)",
     )
 
+    parser.add_argument(
+        "--distribution_output",
+        help="Also write the number of overlapping genes per identity score to this file ('sort -n | uniq -c' layout)",
+    )
+
     args = parser.parse_args()
 
     plot_identity_hist_from_csv(args.csv, args.ref_name, args.alt_name, args.output)
+    if args.distribution_output:
+        write_identity_distribution(args.csv, args.distribution_output)
 
 
 if __name__ == "__main__":
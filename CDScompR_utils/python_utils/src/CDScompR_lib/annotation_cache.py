@@ -0,0 +1,98 @@
+import os
+import pickle
+import numpy as np
+from typing import List, Optional, Tuple
+from attrs import define, field
+from .gene import Gene
+from .gff_utils import build_db
+
+CACHE_VERSION = 1
+
+# (gene ID, mRNA ID, chromosome, strand, mRNA start, mRNA end, span start, span end, CDS coordinates (n, 2))
+GeneRecord = Tuple[str, str, str, str, int, int, int, int, np.ndarray]
+
+
+@define
+class CachedFeature:
+    seqid: str
+    strand: str
+    start: int
+    end: int
+
+
+@define
+class CachedProtein:
+    """
+    Stand-in for Protein built from a cached annotation: the CDS coordinates are kept in memory instead of
+    being queried from a gffutils database. The CDS coordinates are left out of the generated equality, as
+    comparing numpy arrays is ambiguous (genes of two annotations sharing an ID and a span are compared in the interval trees).
+    """
+    id: str
+    feature: CachedFeature
+    cds: np.ndarray = field(eq=False)
+
+    def cds_length(self) -> int:
+        return int((self.cds[:, 1] - self.cds[:, 0] + 1).sum())
+
+    def cds_count(self) -> int:
+        return len(self.cds)
+
+    def cds_coords(self) -> np.ndarray:
+        return self.cds
+
+
+def _gff_signature(gff_path: str, span_type: str) -> Tuple:
+    stat = os.stat(gff_path)
+    return CACHE_VERSION, os.path.abspath(gff_path), stat.st_size, stat.st_mtime_ns, span_type
+
+
+def parse_annotation(gff_path: str, span_type: str) -> List[GeneRecord]:
+    """
+    Parse the genes of a GFF file (through a gffutils database) into compact records.
+    """
+    db = build_db(gff_path)
+    records = []
+    for gene_feature in db.features_of_type("gene"):
+        gene = Gene.from_gff(db, gene_feature, is_ref=True, span_type=span_type)
+        transcript = gene.protein.feature
+        records.append((gene.id, transcript.id, transcript.seqid, transcript.strand, transcript.start, transcript.end,
+                        gene.span_start, gene.span_end, gene.protein.cds_coords()))
+    return records
+
+
+def cache_annotation(gff_path: str, span_type: str, cache_path: str) -> str:
+    """
+    Parse a GFF once into cache_path (pickled gene records), unless the cache is already up to date
+    (same GFF path, size, modification time and span type). Returns cache_path.
+    """
+    signature = _gff_signature(gff_path, span_type)
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as cache:
+            if pickle.load(cache) == signature:
+                return cache_path
+    records = parse_annotation(gff_path, span_type)
+    tmp_path = f"{cache_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as cache:
+        pickle.dump(signature, cache)
+        pickle.dump(records, cache, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def read_cached_records(cache_path: str) -> List[GeneRecord]:
+    with open(cache_path, "rb") as cache:
+        pickle.load(cache)
+        return pickle.load(cache)
+
+
+def genes_from_records(records: List[GeneRecord], is_ref: bool, source: Optional[str] = None) -> List[Gene]:
+    """
+    Build Gene objects (with CachedProtein proteins) from cached records, as Gene.from_gff would.
+    """
+    genes = []
+    for gene_id, mrna_id, seqid, strand, mrna_start, mrna_end, span_start, span_end, cds in records:
+        protein = CachedProtein(id=mrna_id, feature=CachedFeature(seqid, strand, mrna_start, mrna_end), cds=cds)
+        uid = f"{source if source is not None else ('ref' if is_ref else 'pred')}:{gene_id}"
+        genes.append(Gene(id=gene_id, span_start=span_start, span_end=span_end, protein=protein,
+                          is_ref=is_ref, uid=uid, source=source))
+    return genes
@@ -0,0 +1,201 @@
+import gffutils
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, List, Optional, TextIO
+from urllib.parse import unquote
+from .annotation_cache import CachedFeature, CachedProtein
+from .gene import Gene
+from .gff_utils import Region, build_db
+
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+# One row per gene model (gene, its single transcript and the CDS of the transcript, sorted by start)
+ANNOTATION_SCHEMA = pa.schema([
+    ("gene_id", pa.string()),
+    ("mrna_id", pa.string()),
+    ("seqid", pa.string()),
+    ("strand", pa.string()),
+    ("gene_start", pa.int64()),
+    ("gene_end", pa.int64()),
+    ("mrna_start", pa.int64()),
+    ("mrna_end", pa.int64()),
+    ("cds_starts", pa.list_(pa.int64())),
+    ("cds_ends", pa.list_(pa.int64())),
+])
+
+
+def is_table_path(path: str) -> bool:
+    """
+    True if path is an Arrow IPC or Parquet file (by its extension), rather than a text file.
+    """
+    return path.endswith(ARROW_SUFFIXES + PARQUET_SUFFIXES)
+
+
+def write_table(table: pa.Table, path: str) -> None:
+    """
+    Write a table as Parquet or Arrow IPC, according to the extension of path (Arrow IPC by default).
+    """
+    if path.endswith(PARQUET_SUFFIXES):
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_table(path: str) -> pa.Table:
+    """
+    Read a table written by write_table. Arrow IPC files are memory-mapped: their columns are not copied.
+    """
+    if path.endswith(PARQUET_SUFFIXES):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def scan_table(path: str, **csv_options) -> pl.LazyFrame:
+    """
+    Lazily scan a Parquet, Arrow IPC or CSV file (csv_options being passed to pl.scan_csv).
+    """
+    if path.endswith(PARQUET_SUFFIXES):
+        return pl.scan_parquet(path)
+    if path.endswith(ARROW_SUFFIXES):
+        return pl.scan_ipc(path)
+    return pl.scan_csv(path, **csv_options)
+
+
+def _attributes(column: str) -> Dict[str, str]:
+    attributes = {}
+    for attribute in column.strip().rstrip(";").split(";"):
+        key, _, value = attribute.strip().partition("=")
+        attributes[key] = unquote(value)
+    return attributes
+
+
+def gff_to_table(gff_path: str) -> pa.Table:
+    """
+    Parse the gene models of a GFF file into an annotation table (ANNOTATION_SCHEMA), in a single pass over the text.
+    As in Gene.from_gff, each gene must have exactly one transcript (mRNA or transcript feature).
+    """
+    genes: Dict[str, list] = {}
+    transcripts: Dict[str, list] = {}
+    cds_by_transcript: Dict[str, List[tuple]] = {}
+    with open(gff_path) as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 9:
+                continue
+            feature_type = fields[2]
+            if feature_type not in ("gene", "mRNA", "transcript", "CDS"):
+                continue
+            attributes = _attributes(fields[8])
+            start, end = int(fields[3]), int(fields[4])
+            if feature_type == "gene":
+                genes[attributes["ID"]] = [fields[0], fields[6], start, end]
+            elif feature_type == "CDS":
+                for parent in attributes.get("Parent", "").split(","):
+                    cds_by_transcript.setdefault(parent, []).append((start, end))
+            else:
+                transcripts[attributes["ID"]] = [attributes.get("Parent", ""), start, end]
+
+    transcripts_by_gene: Dict[str, List[str]] = {gene_id: [] for gene_id in genes}
+    for transcript_id, (parent, _, _) in transcripts.items():
+        if parent in transcripts_by_gene:
+            transcripts_by_gene[parent].append(transcript_id)
+
+    columns: Dict[str, list] = {name: [] for name in ANNOTATION_SCHEMA.names}
+    for gene_id, (seqid, strand, gene_start, gene_end) in genes.items():
+        gene_transcripts = transcripts_by_gene[gene_id]
+        if len(gene_transcripts) != 1:
+            raise ValueError(f"Gene {gene_id} has {len(gene_transcripts)} transcripts (expected exactly 1) — One mRNA is required and alternative splicing is currently not supported.")
+        transcript_id = gene_transcripts[0]
+        _, mrna_start, mrna_end = transcripts[transcript_id]
+        cds = sorted(cds_by_transcript.get(transcript_id, []))
+        for name, value in zip(ANNOTATION_SCHEMA.names, (
+            gene_id, transcript_id, seqid, strand, gene_start, gene_end, mrna_start, mrna_end,
+            [s for s, _ in cds], [e for _, e in cds]
+        )):
+            columns[name].append(value)
+    return pa.Table.from_pydict(columns, schema=ANNOTATION_SCHEMA)
+
+
+def write_gff(table: pa.Table, out: TextIO, source: str = "CDScompR_lib") -> None:
+    """
+    Export an annotation table back to GFF (gene, mRNA and CDS features only).
+    """
+    out.write("##gff-version 3\n")
+    for row in table.to_pylist():
+        seqid, strand = row["seqid"], row["strand"]
+        out.write(f"{seqid}\t{source}\tgene\t{row['gene_start']}\t{row['gene_end']}\t.\t{strand}\t.\tID={row['gene_id']}\n")
+        out.write(f"{seqid}\t{source}\tmRNA\t{row['mrna_start']}\t{row['mrna_end']}\t.\t{strand}\t.\tID={row['mrna_id']};Parent={row['gene_id']}\n")
+        for start, end in zip(row["cds_starts"], row["cds_ends"]):
+            out.write(f"{seqid}\t{source}\tCDS\t{start}\t{end}\t.\t{strand}\t.\tParent={row['mrna_id']}\n")
+
+
+def _in_regions(table: pa.Table, regions: List[Region]) -> np.ndarray:
+    """
+    Mask of the genes overlapping a region (1-based, inclusive), as in gff_utils.filter_gff_by_regions.
+    """
+    seqids = table.column("seqid").to_numpy(zero_copy_only=False)
+    starts = table.column("gene_start").to_numpy()
+    ends = table.column("gene_end").to_numpy()
+    mask = np.zeros(len(table), dtype=bool)
+    for chrom, region_start, region_end in regions:
+        mask |= (seqids == chrom) & (starts <= region_end) & (ends >= region_start)
+    return mask
+
+
+def genes_from_table(table: pa.Table, is_ref: bool, span_type: str = "gene", source: Optional[str] = None,
+                     regions: Optional[List[Region]] = None) -> List[Gene]:
+    """
+    Build Gene objects (with in-memory CDS coordinates) from an annotation table, as Gene.from_gff would from a GFF.
+    If regions are given, only the genes overlapping them are kept.
+    """
+    if span_type not in ("gene", "mRNA", "CDS"):
+        raise ValueError(f"Unsupported span_type: {span_type} (accepted span types are 'gene', 'mRNA' and 'CDS')")
+    if regions is not None:
+        table = table.filter(pa.array(_in_regions(table, regions)))
+    cds_starts, cds_ends = table.column("cds_starts").combine_chunks(), table.column("cds_ends").combine_chunks()
+    offsets = cds_starts.offsets.to_numpy()
+    offsets = offsets - offsets[0]
+    cds_coords = np.column_stack((cds_starts.flatten().to_numpy(), cds_ends.flatten().to_numpy()))
+    columns = {name: table.column(name).to_pylist() for name in ANNOTATION_SCHEMA.names[:8]}
+
+    genes = []
+    for i in range(len(table)):
+        cds = cds_coords[offsets[i]:offsets[i + 1]]
+        gene_id = columns["gene_id"][i]
+        if span_type == "gene":
+            span_start, span_end = columns["gene_start"][i], columns["gene_end"][i]
+        elif span_type == "mRNA":
+            span_start, span_end = columns["mrna_start"][i], columns["mrna_end"][i]
+        else:
+            if not len(cds):
+                raise ValueError(f"No CDS found for gene {gene_id}")
+            span_start, span_end = int(cds[:, 0].min()), int(cds[:, 1].max())
+        feature = CachedFeature(columns["seqid"][i], columns["strand"][i], columns["mrna_start"][i], columns["mrna_end"][i])
+        uid = f"{source if source is not None else ('ref' if is_ref else 'pred')}:{gene_id}"
+        genes.append(Gene(id=gene_id, span_start=span_start, span_end=span_end,
+                          protein=CachedProtein(id=columns["mrna_id"][i], feature=feature, cds=cds),
+                          is_ref=is_ref, uid=uid, source=source))
+    return genes
+
+
+def load_genes(path: str, is_ref: bool, span_type: str = "gene", regions: Optional[List[Region]] = None,
+               source: Optional[str] = None) -> List[Gene]:
+    """
+    Parse the genes of a GFF file (through a gffutils database), or read them from an annotation table
+    (see annotation_table.py), only those overlapping the regions if given.
+    """
+    if is_table_path(path):
+        return genes_from_table(read_table(path), is_ref, span_type, source=source, regions=regions)
+    try:
+        genes_db = build_db(path, regions)
+    except gffutils.exceptions.EmptyInputError:
+        if regions is None:
+            raise
+        return []
+    return [Gene.from_gff(genes_db, g, is_ref=is_ref, span_type=span_type, source=source) for g in genes_db.features_of_type("gene")]
@@ -1,31 +1,39 @@
+import json
 import pandas as pd
 import polars as pl
-from typing import List, Optional
+from collections import Counter
+from typing import Dict, List, Optional, Set
+from .arrow_io import scan_table
 from .gene import Gene
 from .overlap_group import OverlapGroup
 
 
-def load_score_file(csv_path: str) -> pl.DataFrame:
+def load_score_file(csv_path: str, ref_ids: Optional[Set[str]] = None, alt_ids: Optional[Set[str]] = None) -> pl.DataFrame:
     """
-    Load and preprocess a CDScompR CSV score file.
+    Load and preprocess a CDScompR CSV score file (or its Parquet/Arrow version, see identity.write_scores).
     Keeps only relevant columns and renames them for easier downstream use.
+    If ref_ids/alt_ids are given, only the rows whose reference or alternative locus is among them are loaded.
     """
     print("Loading score CSV...")
 
     needed_cols = ["Reference locus", "Alternative locus", "Identity score (%)"]
 
-    score_df = pl.read_csv(
+    score_lf = scan_table(
         csv_path,
-        columns=needed_cols,
         null_values=["_", "~"],
         try_parse_dates=False,
-    ).rename({
+    ).select(needed_cols).rename({
         "Reference locus": "ref_id",
         "Alternative locus": "alt_id",
         "Identity score (%)": "identity_score",
     })
 
-    return score_df
+    if ref_ids is not None or alt_ids is not None:
+        score_lf = score_lf.filter(
+            pl.col("ref_id").is_in(list(ref_ids or [])) | pl.col("alt_id").is_in(list(alt_ids or []))
+        )
+
+    return score_lf.collect()
 
 
 def add_identity_scores(genes: List[Gene], score_df: pl.DataFrame, is_ref: bool) -> None:
@@ -44,12 +52,12 @@ def add_identity_scores(genes: List[Gene], score_df: pl.DataFrame, is_ref: bool)
         gene.set_identity_scores(best_hit_lookup)
 
 
-def summarize_overlaps(groups: List[OverlapGroup], span_type: str, output_path: Optional[str] = None) -> None:
+def summarize_overlaps(groups: List[OverlapGroup], span_type: str, output_path: Optional[str] = None, overlap_matrix: bool = False) -> None:
     """
     Summarize a list of OverlapGroups into a DataFrame and write it to a TSV file or print it.
-
+    If overlap_matrix, a last column gives the nonzero pairwise overlaps of each group (see OverlapGroup.overlap_matrix).
     """
-    summary_rows = [group.summarize() for group in groups]
+    summary_rows = [group.summarize(include_overlap_matrix=overlap_matrix) for group in groups]
     df = pd.DataFrame(summary_rows)
     
     df.insert(0, "span_type", span_type)
@@ -59,3 +67,98 @@ def summarize_overlaps(groups: List[OverlapGroup], span_type: str, output_path:
         print(f"Results written to {output_path}")
     else:
         print(df)
+
+
+# Wording of the summary lines about the matches with a 0.0 score, according to the source of the identity scores:
+# (with a best hit, without a best hit)
+SCORE_SOURCE_LABELS = {
+    "CDScompR": ("overlapping according to CDScompR", "were not detected by CDScompR"),
+    "built-in": ("overlapping CDS", "were not paired by the built-in identity engine"),
+}
+
+
+def summarize_overlap_types(groups: List[OverlapGroup], score_source: str = "CDScompR") -> Dict:
+    """
+    Aggregate the overlap groups: number of groups of each type, mean identity score of the matches
+    (a missing score counting as 0) and number of matches with a 0.0 score, with or without a best hit
+    (without a best hit, the pair was not compared by the identity engine).
+    score_source (see SCORE_SOURCE_LABELS) is the engine that computed the identity scores, only used for the wording of the summary.
+    The number of matches and the unrounded sum of their scores are kept so that the summaries of several
+    parts of a comparison (e.g. shards) can be merged (see merge_overlap_summaries).
+    """
+    type_counts = Counter(group.get_type() for group in groups)
+    match_scores = []
+    nb_zero_with_hit, nb_zero_without_hit = 0, 0
+    for group in groups:
+        if group.get_type() != "match":
+            continue
+        ref_gene = group.ref_genes[0]
+        score = ref_gene.identity_score
+        match_scores.append(score or 0.0)
+        if score == 0.0:
+            if ref_gene.best_hit_id is None:
+                nb_zero_without_hit += 1
+            else:
+                nb_zero_with_hit += 1
+    return _overlap_summary(type_counts, len(match_scores), sum(match_scores), nb_zero_with_hit, nb_zero_without_hit, score_source)
+
+
+def merge_overlap_summaries(summaries: List[Dict]) -> Dict:
+    """
+    Merge summaries of summarize_overlap_types (e.g. read back from the --summary_json of each shard)
+    into the summary of all their groups. Raises ValueError if their identity scores do not come from the same source.
+    """
+    type_counts = Counter()
+    for summary in summaries:
+        type_counts.update(summary["types"])
+    score_sources = {summary.get("score_source", "CDScompR") for summary in summaries}
+    if len(score_sources) > 1:
+        raise ValueError(f"The summaries to merge have identity scores from different sources ({', '.join(sorted(score_sources))})")
+    return _overlap_summary(
+        type_counts,
+        sum(summary["nb_matches"] for summary in summaries),
+        sum(summary["match_identity_score_sum"] for summary in summaries),
+        sum(summary["nb_matches_zero_score_with_hit"] for summary in summaries),
+        sum(summary["nb_matches_zero_score_without_hit"] for summary in summaries),
+        score_sources.pop() if score_sources else "CDScompR",
+    )
+
+
+def _overlap_summary(type_counts: Counter, nb_matches: int, match_score_sum: float, nb_zero_with_hit: int, nb_zero_without_hit: int, score_source: str) -> Dict:
+    return {
+        "types": dict(sorted(type_counts.items())),
+        "match_mean_identity_score": round(match_score_sum / nb_matches, 2) if nb_matches else None,
+        "nb_matches_zero_score_with_hit": nb_zero_with_hit,
+        "nb_matches_zero_score_without_hit": nb_zero_without_hit,
+        "nb_matches": nb_matches,
+        "match_identity_score_sum": match_score_sum,
+        "score_source": score_source,
+    }
+
+
+def read_overlap_summary(json_path: str) -> Dict:
+    with open(json_path) as summary_json:
+        return json.load(summary_json)
+
+
+def write_overlap_summary(summary: Dict, output_path: str, json_path: Optional[str] = None) -> None:
+    """
+    Write the summary of summarize_overlap_types as text (one 'type:<tab>count' line per type, as in the former
+    compare_annots.sh summaries) and, if json_path is given, as JSON.
+    """
+    with_hit_label, without_hit_label = SCORE_SOURCE_LABELS[summary.get("score_source", "CDScompR")]
+    lines = []
+    for group_type, count in summary["types"].items():
+        lines.append(f"{group_type}:\t{count}")
+        if group_type == "match" and summary["match_mean_identity_score"] is not None:
+            lines[-1] += f" (mean id score: {summary['match_mean_identity_score']:.2f}%)"
+            lines.append(f"--- including {summary['nb_matches_zero_score_with_hit']} match(es) with a 0.00% score, {with_hit_label}")
+    if summary["nb_matches_zero_score_without_hit"]:
+        lines.append(f"\nWARNING: {summary['nb_matches_zero_score_without_hit']} match(es) {without_hit_label} and appear with a score of 0.00%")
+    with open(output_path, "w") as out:
+        out.write("\n".join(lines) + "\n")
+    print(f"Summary written to {output_path}")
+    if json_path:
+        with open(json_path, "w") as out:
+            json.dump(summary, out, indent=2)
+            out.write("\n")
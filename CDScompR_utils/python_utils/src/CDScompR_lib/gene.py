@@ -13,6 +13,7 @@ class Gene:
     uid: str
     best_hit_id: Optional[str] = None
     identity_score: Optional[float] = None
+    source: Optional[str] = None
 
 
     def set_identity_scores(self, score_lookup: dict[str, tuple[str, float]]) -> None:
@@ -41,17 +42,18 @@ class Gene:
 
 
     @classmethod
-    def from_gff(cls, db: gffutils.FeatureDB, gene: gffutils.Feature, is_ref: bool, span_type: str = "gene") -> "Gene":
+    def from_gff(cls, db: gffutils.FeatureDB, gene: gffutils.Feature, is_ref: bool, span_type: str = "gene", source: Optional[str] = None) -> "Gene":
         """
         Create a Gene object from a GFF feature and its associated transcript.
+        source labels the annotation of the gene when more than two annotations are grouped (see MultiOverlapGroup).
         """
         transcripts = list(db.children(gene, featuretype=('mRNA', 'transcript'), level=1))
         if len(transcripts) != 1:
             raise ValueError(f"Gene {gene.id} has {len(transcripts)} transcripts (expected exactly 1) — One mRNA is required and alternative splicing is currently not supported.")
         transcript = transcripts[0]
         protein = Protein(id=transcript.id, db=db, feature=transcript)
-        uid = f"{'ref' if is_ref else 'pred'}:{gene.id}"
+        uid = f"{source if source is not None else ('ref' if is_ref else 'pred')}:{gene.id}"
 
         span_start, span_end = Gene._get_span(db, gene, transcript, span_type)
 
-        return cls(id=gene.id, span_start=span_start, span_end=span_end, protein=protein, is_ref=is_ref, uid=uid)
+        return cls(id=gene.id, span_start=span_start, span_end=span_end, protein=protein, is_ref=is_ref, uid=uid, source=source)
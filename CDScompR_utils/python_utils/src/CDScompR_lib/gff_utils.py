@@ -1,10 +1,24 @@
+import argparse
+import bisect
 import gffutils
+import os
+import re
 import tempfile
+from typing import Dict, List, Optional, Set, Tuple
 
-def build_db(gff_path: str) -> gffutils.FeatureDB:
+Region = Tuple[str, int, int]
+
+
+def build_db(gff_path: str, regions: Optional[List[Region]] = None) -> gffutils.FeatureDB:
     """
     Create a gffutils database from a GFF file.
+    If regions are given, only the gene models overlapping them are loaded (see filter_gff_by_regions).
     """
+    if regions is not None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filtered_gff = os.path.join(tmp_dir, "in_regions.gff")
+            filter_gff_by_regions(gff_path, regions, filtered_gff)
+            return build_db(filtered_gff)
     db_path = tempfile.NamedTemporaryFile(delete=True).name
     return gffutils.create_db(
         gff_path,
@@ -15,3 +29,86 @@ def build_db(gff_path: str) -> gffutils.FeatureDB:
         sort_attribute_values=True
     )
 
+
+def parse_region(region: str) -> Region:
+    """
+    Parse a 'chr:start-end' region (1-based, inclusive, commas allowed in positions).
+    """
+    match = re.fullmatch(r"(.+):([\d,]+)-([\d,]+)", region.strip())
+    if match is None:
+        raise ValueError(f"Invalid region '{region}' (expected chr:start-end)")
+    chrom, start, end = match.groups()
+    return chrom, int(start.replace(",", "")), int(end.replace(",", ""))
+
+
+def parse_annotation_argument(annotation: str) -> Tuple[str, str]:
+    """
+    Parse a 'name=path/to/annot.gff' command line argument (argparse type of the scripts comparing several annotations).
+    """
+    name, sep, gff_path = annotation.partition("=")
+    if not sep or not name or not gff_path:
+        raise argparse.ArgumentTypeError(f"Invalid annotation '{annotation}' (expected name=path/to/annot.gff)")
+    return name, gff_path
+
+
+def read_regions(regions_path: str) -> List[Region]:
+    """
+    Read a zones file (chr, start, end, 1-based inclusive, one region per line, e.g. zones.tsv).
+    """
+    regions = []
+    with open(regions_path) as regions_file:
+        for line in regions_file:
+            if line.strip() and not line.startswith("#"):
+                fields = line.split()
+                regions.append((fields[0], int(fields[1]), int(fields[2])))
+    return regions
+
+
+def _get_attribute(attributes: str, key: str) -> Optional[str]:
+    for attribute in attributes.rstrip("\n").split(";"):
+        if attribute.startswith(key + "="):
+            return attribute[len(key) + 1:]
+    return None
+
+
+def filter_gff_by_regions(gff_path: str, regions: List[Region], out_path: str) -> int:
+    """
+    Write to out_path the gene models of gff_path whose top-level feature overlaps a region, with all their descendants
+    (found through Parent, parents being before their children), in a single pass. Returns the number of kept gene models.
+    """
+    regions_per_chr: Dict[str, List[Tuple[int, int]]] = {}
+    for chrom, start, end in regions:
+        regions_per_chr.setdefault(chrom, []).append((start, end))
+    starts: Dict[str, List[int]] = {}
+    max_ends: Dict[str, List[int]] = {}
+    for chrom, chrom_regions in regions_per_chr.items():
+        chrom_regions.sort()
+        starts[chrom] = [start for start, _ in chrom_regions]
+        max_ends[chrom] = []
+        for _, end in chrom_regions:
+            max_ends[chrom].append(max(end, max_ends[chrom][-1]) if max_ends[chrom] else end)
+
+    kept_features: Set[str] = set()
+    nb_kept = 0
+    with open(gff_path) as gff, open(out_path, "w") as out:
+        out.write("##gff-version 3\n")
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.split("\t")
+            chrom = fields[0]
+            if chrom not in starts:
+                continue
+            parents = _get_attribute(fields[8], "Parent")
+            if parents is None:
+                nb_regions_before_end = bisect.bisect_right(starts[chrom], int(fields[4]))
+                keep = nb_regions_before_end > 0 and max_ends[chrom][nb_regions_before_end - 1] >= int(fields[3])
+                nb_kept += keep
+            else:
+                keep = any(parent in kept_features for parent in parents.split(","))
+            if keep:
+                feature_id = _get_attribute(fields[8], "ID")
+                if feature_id is not None:
+                    kept_features.add(feature_id)
+                out.write(line)
+    return nb_kept
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from attrs import define, field
+from .arrow_io import is_table_path, write_table
+from .overlap_group import OverlapGroup
+
+# (gene ID, CDS coordinates (n, 2), strand) of a group member, as sent to the worker processes
+CdsModel = Tuple[str, np.ndarray, str]
+Zone = Tuple[int, int]
+
+
+@define
+class PairScore:
+    """
+    CDScompR-like comparison of the CDS of a reference and a predicted transcript.
+    """
+    ref_id: str
+    pred_id: str
+    matches: int
+    ei_mismatches: int
+    rf_mismatches: int
+    ei_zones: List[Zone] = field(factory=list)
+    rf_zones: List[Zone] = field(factory=list)
+
+    @property
+    def mismatches(self) -> int:
+        return self.ei_mismatches + self.rf_mismatches
+
+    @property
+    def cds_overlap(self) -> int:
+        """
+        Number of nucleotides in the CDS of both transcripts, whatever their reading frame.
+        """
+        return self.matches + self.rf_mismatches
+
+    @property
+    def identity_score(self) -> float:
+        """
+        Identity score (%) as computed by CDScompR: matches / (matches + mismatches), rounded to one decimal.
+        """
+        compared = self.matches + self.mismatches
+        return round(100 * self.matches / compared, 1) if compared else 0.0
+
+
+def _frame_keys(cds: np.ndarray, strand: str) -> np.ndarray:
+    """
+    For each CDS interval, a key such that two bases of two transcripts are in the same reading frame if and only if
+    the keys of their intervals are congruent modulo 3 (the position of a base in the CDS, counted from the start codon,
+    being key + x on the forward strand and key - x on the reverse strand).
+    """
+    lengths = cds[:, 1] - cds[:, 0] + 1
+    if strand == "-":
+        downstream_lengths = np.cumsum(lengths[::-1])[::-1] - lengths
+        return downstream_lengths + cds[:, 1]
+    upstream_lengths = np.cumsum(lengths) - lengths
+    return upstream_lengths - cds[:, 0]
+
+
+def _covering_intervals(cds: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Index of the CDS interval containing each position (-1 if none).
+    """
+    indexes = np.searchsorted(cds[:, 0], positions, side="right") - 1
+    covered = (indexes >= 0) & (cds[np.maximum(indexes, 0), 1] >= positions)
+    return np.where(covered, indexes, -1)
+
+
+def _zones(starts: np.ndarray, ends: np.ndarray, selected: np.ndarray) -> List[Zone]:
+    """
+    Merge the adjacent selected segments [start, end] into zones.
+    """
+    zones: List[Zone] = []
+    for start, end in zip(starts[selected].tolist(), ends[selected].tolist()):
+        if zones and zones[-1][1] + 1 == start:
+            zones[-1] = (zones[-1][0], end)
+        else:
+            zones.append((start, end))
+    return zones
+
+
+def compare_cds(ref: CdsModel, pred: CdsModel) -> PairScore:
+    """
+    Compare the CDS of a reference and a predicted transcript at the nucleotide level.
+    The union of both CDS is cut into segments at every CDS boundary; the bases of a segment covered by only one CDS are
+    exon/intron (EI) mismatches, those covered by both CDS are matches if they are in the same reading frame,
+    and reading frame (RF) mismatches otherwise.
+    """
+    ref_id, ref_cds, strand = ref
+    pred_id, pred_cds, _ = pred
+    boundaries = np.unique(np.concatenate((ref_cds[:, 0], ref_cds[:, 1] + 1, pred_cds[:, 0], pred_cds[:, 1] + 1)))
+    starts, ends = boundaries[:-1], boundaries[1:] - 1
+    lengths = ends - starts + 1
+
+    ref_intervals = _covering_intervals(ref_cds, starts)
+    pred_intervals = _covering_intervals(pred_cds, starts)
+    in_ref, in_pred = ref_intervals >= 0, pred_intervals >= 0
+    in_both = in_ref & in_pred
+    same_frame = (_frame_keys(ref_cds, strand)[ref_intervals] - _frame_keys(pred_cds, strand)[pred_intervals]) % 3 == 0
+
+    match = in_both & same_frame
+    rf_mismatch = in_both & ~same_frame
+    ei_mismatch = in_ref ^ in_pred
+    return PairScore(
+        ref_id=ref_id,
+        pred_id=pred_id,
+        matches=int(lengths[match].sum()),
+        ei_mismatches=int(lengths[ei_mismatch].sum()),
+        rf_mismatches=int(lengths[rf_mismatch].sum()),
+        ei_zones=_zones(starts, ends, ei_mismatch),
+        rf_zones=_zones(starts, ends, rf_mismatch),
+    )
+
+
+def _spans_overlap(cds1: np.ndarray, cds2: np.ndarray) -> bool:
+    return bool(len(cds1) and len(cds2) and cds1[0, 0] <= cds2[-1, 1] and cds2[0, 0] <= cds1[-1, 1])
+
+
+def score_group(refs: List[CdsModel], preds: List[CdsModel]) -> List[PairScore]:
+    """
+    Compare every reference with every predicted transcript of a group whose CDS overlap, then pair them as CDScompR does:
+    pairs are taken by decreasing identity score (then decreasing CDS overlap), each transcript being paired at most once.
+    Transcripts without any CDS overlap with the other annotation stay unpaired.
+    """
+    candidates = []
+    for ref_index, ref in enumerate(refs):
+        for pred_index, pred in enumerate(preds):
+            if _spans_overlap(ref[1], pred[1]):
+                score = compare_cds(ref, pred)
+                if score.cds_overlap > 0:
+                    candidates.append((-score.identity_score, -score.cds_overlap, ref_index, pred_index, score))
+    candidates.sort(key=lambda candidate: candidate[:4])
+
+    pairs = []
+    paired_refs, paired_preds = set(), set()
+    for _, _, ref_index, pred_index, score in candidates:
+        if ref_index not in paired_refs and pred_index not in paired_preds:
+            paired_refs.add(ref_index)
+            paired_preds.add(pred_index)
+            pairs.append(score)
+    return pairs
+
+
+def _score_groups(groups: List[Tuple[List[CdsModel], List[CdsModel]]]) -> List[List[PairScore]]:
+    return [score_group(refs, preds) for refs, preds in groups]
+
+
+def _cds_models(group: OverlapGroup) -> Tuple[List[CdsModel], List[CdsModel]]:
+    def cds_model(gene) -> CdsModel:
+        return gene.id, gene.protein.cds_coords(), gene.protein.feature.strand
+    return [cds_model(g) for g in group.ref_genes], [cds_model(g) for g in group.pred_genes]
+
+
+def compute_identity_scores(groups: List[OverlapGroup], threads: int = 1, chunk_size: int = 256) -> List[List[PairScore]]:
+    """
+    Compute the CDScompR-like identity scores of the ref/pred pairs of each group and set the best hit and identity score
+    of their genes (genes of a group left unpaired get no best hit and a 0.0 score, as in CDScompR outputs).
+    The CDS coordinates are read from the GFF databases in the main process; the groups are then scored by chunks
+    in `threads` worker processes.
+
+    Returns:
+        The pairs of each group, in the order of the groups.
+    """
+    print("Computing identity scores...")
+    models = [_cds_models(group) for group in groups]
+    chunks = [models[i:i + chunk_size] for i in range(0, len(models), chunk_size)]
+    if threads > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=threads) as executor:
+            scored_chunks = list(executor.map(_score_groups, chunks))
+    else:
+        scored_chunks = [_score_groups(chunk) for chunk in chunks]
+    group_pairs = [pairs for chunk in scored_chunks for pairs in chunk]
+
+    for group, pairs in zip(groups, group_pairs):
+        best_hits: Dict[str, Tuple[Optional[str], float]] = {}
+        for pair in pairs:
+            best_hits[f"ref:{pair.ref_id}"] = (pair.pred_id, pair.identity_score)
+            best_hits[f"pred:{pair.pred_id}"] = (pair.ref_id, pair.identity_score)
+        for gene in group.ref_genes + group.pred_genes:
+            gene.best_hit_id, gene.identity_score = best_hits.get(gene.uid, (None, 0.0))
+    return group_pairs
+
+
+def _format_zones(zones: List[Zone], exclusive_end: bool = False) -> str:
+    """
+    Format zones as in CDScompR outputs ('[start//end] ' each); CDScompR writes the end of EI zones exclusive
+    and the end of RF zones inclusive.
+    """
+    return "".join(f"[{start}//{end + exclusive_end}] " for start, end in zones)
+
+
+def write_scores(groups: List[OverlapGroup], group_pairs: List[List[PairScore]], output_path: str) -> None:
+    """
+    Write the identity scores in the layout of CDScompR CSV outputs (one row per pair, then one row per unpaired gene,
+    '~' for a missing locus and '_' for missing values), so that they can be read by load_score_file and plots.py.
+    If output_path is a Parquet or Arrow file, the same columns are written as a typed table, with nulls for the missing loci and values.
+    """
+    rows = []
+    for cluster_index, (group, pairs) in enumerate(zip(groups, group_pairs)):
+        genes = {gene.uid: gene for gene in group.ref_genes + group.pred_genes}
+        some_gene = next(iter(genes.values()))
+        chromosome = f"{some_gene.protein.feature.seqid}_{'reverse' if some_gene.protein.feature.strand == '-' else 'direct'}"
+        paired = set()
+        for pair in pairs:
+            ref, pred = genes[f"ref:{pair.ref_id}"], genes[f"pred:{pair.pred_id}"]
+            paired.update((ref.uid, pred.uid))
+            rows.append(_score_row(chromosome, cluster_index, ref, pred, pair))
+        for uid, gene in genes.items():
+            if uid not in paired:
+                rows.append(_score_row(chromosome, cluster_index, gene if gene.is_ref else None, None if gene.is_ref else gene, None))
+    if is_table_path(output_path):
+        rows = [{key: None if value in ("_", "~") else value for key, value in row.items()} for row in rows]
+        write_table(pa.Table.from_pylist(rows), output_path)
+    else:
+        pd.DataFrame(rows).to_csv(output_path, index=False)
+    print(f"Identity scores written to {output_path}")
+
+
+def _score_row(chromosome: str, cluster_index: int, ref, pred, pair: Optional[PairScore]) -> Dict:
+    def locus(gene, missing: str = "_") -> Tuple:
+        if gene is None:
+            return missing, missing, missing, missing
+        return gene.id, gene.protein.feature.start, gene.protein.feature.end, gene.protein.id
+
+    ref_id, ref_start, ref_end, ref_mrna = locus(ref)
+    pred_id, pred_start, pred_end, pred_mrna = locus(pred)
+    return {
+        "Chromosome": chromosome,
+        "Cluster name": f"cluster {cluster_index}",
+        "Reference locus": ref_id if ref is not None else "~",
+        "Alternative locus": pred_id if pred is not None else "~",
+        "Comparison matches": pair.matches if pair else "_",
+        "Comparison mismatches": pair.mismatches if pair else "_",
+        "Identity score (%)": pair.identity_score if pair else 0.0,
+        "Reference start": ref_start,
+        "Reference end": ref_end,
+        "Alternative start": pred_start,
+        "Alternative end": pred_end,
+        "Reference mRNA": ref_mrna,
+        "Alternative mRNA": pred_mrna,
+        "Exon_intron (EI) non-correspondance zones": _format_zones(pair.ei_zones, exclusive_end=True) if pair else "_",
+        "Reading frame (RF) non-correspondance zones": _format_zones(pair.rf_zones) if pair else "_",
+        "Exon_Intron (EI) mismatches": pair.ei_mismatches if pair else "_",
+        "Reading Frame (RF) mismatches": pair.rf_mismatches if pair else "_",
+        "reference mRNA number": 1 if ref is not None else "_",
+        "alternative mRNA number": 1 if pred is not None else "_",
+    }
@@ -1,4 +1,5 @@
 from typing import List, Dict, Tuple
+import numpy as np
 from attrs import define, field
 from intervaltree import Interval, IntervalTree
 from collections import defaultdict
@@ -14,9 +15,13 @@ class OverlapGroup:
         """
         Infer the type of annotation change based on gene counts in the group.
         """
-        n_ref = len(self.ref_genes)
-        n_pred = len(self.pred_genes)
+        return OverlapGroup.classify(len(self.ref_genes), len(self.pred_genes))
 
+    @staticmethod
+    def classify(n_ref: int, n_pred: int) -> str:
+        """
+        Type of annotation change of a group with n_ref reference and n_pred predicted genes.
+        """
         if n_ref == 0 and n_pred > 0:
             return "appearance"
         elif n_ref > 0 and n_pred == 0:
@@ -30,12 +35,57 @@ class OverlapGroup:
         else:
             return "complex"
 
-    def summarize(self) -> Dict:
+    def overlap_matrix(self) -> List[Tuple[str, str, int, float, float, int]]:
+        """
+        Compute the pairwise overlaps between the ref and pred members of the group, by broadcasting
+        the members' coordinates (ref along rows, pred along columns).
+
+        Returns:
+            Sparse matrix, as the list of its nonzero entries: (ref ID, pred ID, span overlap (bp),
+            span overlap / ref span, span overlap / pred span, shared CDS (bp)).
+        """
+        if not self.ref_genes or not self.pred_genes:
+            return []
+        ref_spans = np.array([sorted((g.span_start, g.span_end)) for g in self.ref_genes], dtype=np.int64)
+        pred_spans = np.array([sorted((g.span_start, g.span_end)) for g in self.pred_genes], dtype=np.int64)
+        span_overlaps = np.clip(
+            np.minimum(ref_spans[:, None, 1], pred_spans[None, :, 1]) - np.maximum(ref_spans[:, None, 0], pred_spans[None, :, 0]) + 1,
+            0, None
+        )
+        ref_fractions = span_overlaps / (ref_spans[:, 1] - ref_spans[:, 0] + 1)[:, None]
+        pred_fractions = span_overlaps / (pred_spans[:, 1] - pred_spans[:, 0] + 1)[None, :]
+
+        # Shared CDS: overlaps between all ref and pred CDS intervals, summed per (ref, pred) pair
+        ref_cds, ref_owners = OverlapGroup._stack_cds(self.ref_genes)
+        pred_cds, pred_owners = OverlapGroup._stack_cds(self.pred_genes)
+        shared_cds = np.zeros_like(span_overlaps)
+        cds_overlaps = np.clip(
+            np.minimum(ref_cds[:, None, 1], pred_cds[None, :, 1]) - np.maximum(ref_cds[:, None, 0], pred_cds[None, :, 0]) + 1,
+            0, None
+        )
+        np.add.at(shared_cds, (ref_owners[:, None], pred_owners[None, :]), cds_overlaps)
+
+        return [
+            (self.ref_genes[i].id, self.pred_genes[j].id, int(span_overlaps[i, j]),
+             round(float(ref_fractions[i, j]), 3), round(float(pred_fractions[i, j]), 3), int(shared_cds[i, j]))
+            for i, j in zip(*np.nonzero(span_overlaps | shared_cds))
+        ]
+
+    @staticmethod
+    def _stack_cds(genes: List["Gene"]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stack the CDS coordinates of genes into one (n, 2) array, with the index of the gene of each CDS.
+        """
+        coords = [g.protein.cds_coords() for g in genes]
+        owners = np.repeat(np.arange(len(genes)), [len(c) for c in coords])
+        return np.concatenate(coords).reshape(-1, 2), owners
+
+    def summarize(self, include_overlap_matrix: bool = False) -> Dict:
         """
         Build a dictionary summary of the group, including gene IDs, coordinates,
-        CDS lengths and best hits.
+        CDS lengths and best hits (and the sparse ref x pred overlap matrix if include_overlap_matrix).
         """
-        return {
+        summary = {
             "ref_gene_ids": [g.id for g in self.ref_genes],
             "pred_gene_ids": [g.id for g in self.pred_genes],
             "ref_span_coords": [f"{g.span_start}-{g.span_end}" for g in self.ref_genes],
@@ -52,6 +102,9 @@ class OverlapGroup:
             ],
             "type": self.get_type(),
         }
+        if include_overlap_matrix:
+            summary["pairwise_overlaps"] = self.overlap_matrix()
+        return summary
 
     @staticmethod
     def _group_by_chrom_and_strand(genes: List["Gene"],) -> Dict[Tuple[str, str], List["Gene"]]:
@@ -177,3 +230,74 @@ class OverlapGroup:
             all_groups.extend(chrom_groups)
 
         return all_groups
+
+
+@define
+class MultiOverlapGroup:
+    """
+    Group of overlapping genes from N labelled annotations (sources), built in a single sweep over all of them.
+    """
+    members: Dict[str, List["Gene"]] = field(factory=dict)
+
+    def pair_types(self, source1: str, source2: str) -> List[str]:
+        """
+        Types of annotation change between two sources (source1 being the reference), as a two-way grouping of
+        these sources would find them: the members of both sources are regrouped on their own overlaps, since
+        the group may only be connected through the genes of other sources.
+
+        Returns:
+            The sorted types of the two-way groups (empty if neither source has a member in the group).
+        """
+        genes1, genes2 = self.members.get(source1, []), self.members.get(source2, [])
+        if not genes1 and not genes2:
+            return []
+        subgroups = MultiOverlapGroup._build_groups(OverlapGroup._build_tree(genes1, genes2))
+        return sorted(
+            OverlapGroup.classify(len(sub.members.get(source1, [])), len(sub.members.get(source2, [])))
+            for sub in subgroups
+        )
+
+    def summarize(self, sources: List[str]) -> Dict:
+        """
+        Build a dictionary summary of the group: gene IDs and span coordinates per source, and types per source pair
+        (several two-way groups of a pair being joined by commas, None if neither source has a member).
+        """
+        summary = {}
+        for source in sources:
+            genes = self.members.get(source, [])
+            summary[f"{source}_gene_ids"] = [g.id for g in genes]
+            summary[f"{source}_span_coords"] = [f"{g.span_start}-{g.span_end}" for g in genes]
+        for i, source1 in enumerate(sources):
+            for source2 in sources[i + 1:]:
+                types = self.pair_types(source1, source2)
+                summary[f"{source1}_vs_{source2}_type"] = ",".join(types) if types else None
+        return summary
+
+    @staticmethod
+    def _build_groups(tree: IntervalTree) -> List["MultiOverlapGroup"]:
+        """
+        Build MultiOverlapGroups from the connected genes of an interval tree, genes being sorted by source in the groups.
+        """
+        parents = OverlapGroup._build_parents(tree)
+        groups: Dict[str, MultiOverlapGroup] = {}
+        for interval in sorted(tree, key=lambda interval: (interval.begin, interval.end, interval.data.uid)):
+            group = groups.setdefault(OverlapGroup._find_root(interval.data.uid, parents), MultiOverlapGroup())
+            group.members.setdefault(interval.data.source, []).append(interval.data)
+        return list(groups.values())
+
+    @staticmethod
+    def overlap_groups_from_annotations(genes_by_source: Dict[str, List["Gene"]]) -> List["MultiOverlapGroup"]:
+        """
+        Identify groups of overlapping genes across N annotations, in one sweep per (chromosome, strand).
+
+        Parameters:
+            genes_by_source: Gene objects of each annotation, by source label (each gene having its source set).
+
+        Returns:
+            A list of MultiOverlapGroup instances, sorted by chromosome, strand and start.
+        """
+        all_genes = [gene for genes in genes_by_source.values() for gene in genes]
+        all_groups = []
+        for _, genes in sorted(OverlapGroup._group_by_chrom_and_strand(all_genes).items()):
+            all_groups.extend(MultiOverlapGroup._build_groups(OverlapGroup._build_tree(genes, [])))
+        return all_groups
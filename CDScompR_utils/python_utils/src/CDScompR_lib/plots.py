@@ -1,6 +1,7 @@
 import polars as pl
 import matplotlib.pyplot as plt
 import numpy as np
+from .arrow_io import scan_table
 
 
 def plot_identity_hist_from_csv(csv, ref_name, alt_name, out_path):
@@ -8,14 +9,14 @@ def plot_identity_hist_from_csv(csv, ref_name, alt_name, out_path):
     Plot a histogram of the identity scores computed by CDScompR.
 
     Args:
-        csv: CDScompR csv output
+        csv: CDScompR csv output (or its Parquet/Arrow version)
         ref_name (str): Name of the ref gff (for printing)
         alt_name (str): Name of the alt gff (for printing)
         out_path (str): Output file path
     """
 
     cols = ["Reference locus", "Alternative locus", "Identity score (%)"]
-    df = pl.read_csv(csv, null_values=["~"], columns=cols)
+    df = scan_table(csv, null_values=["~"]).select(cols).collect()
     ref_col, alt_col, score_col = cols
 
     # Count the number of unique non-null genes in ref and alt
@@ -80,3 +81,26 @@ def plot_identity_hist_from_csv(csv, ref_name, alt_name, out_path):
     plt.close()
 
     print(f"[{ref_name} vs. {alt_name}] Histogram saved: {out_path}")
+
+
+def write_identity_distribution(csv, out_path):
+    """
+    Write the number of overlapping genes (pairs with both a reference and an alternative locus) per identity score,
+    by increasing score, in the layout of 'sort -n | uniq -c'.
+
+    Args:
+        csv: CDScompR csv output (or its Parquet/Arrow version)
+        out_path (str): Output file path
+    """
+    cols = ["Reference locus", "Alternative locus", "Identity score (%)"]
+    ref_col, alt_col, score_col = cols
+    distribution = (
+        scan_table(csv, null_values=["~"]).select(cols)
+        .filter(pl.col(ref_col).is_not_null() & pl.col(alt_col).is_not_null())
+        .select(pl.col(score_col).cast(pl.Float64).drop_nulls())
+        .group_by(score_col).len().sort(score_col)
+        .collect()
+    )
+    with open(out_path, "w") as out:
+        for score, count in distribution.iter_rows():
+            out.write(f"{count:>7} {score}\n")
@@ -1,4 +1,5 @@
 import gffutils
+import numpy as np
 from attrs import define
 
 @define
@@ -18,3 +19,10 @@ class Protein:
         Count the number of CDS features in the transcript.
         """
         return sum(1 for _ in self.db.children(self.feature, featuretype='CDS', level=1))
+
+    def cds_coords(self) -> np.ndarray:
+        """
+        Coordinates (start, end, 1-based inclusive) of the CDS features of the transcript, sorted by start, as an (n, 2) array.
+        """
+        coords = [(cds.start, cds.end) for cds in self.db.children(self.feature, featuretype='CDS', level=1)]
+        return np.array(sorted(coords), dtype=np.int64).reshape(-1, 2)
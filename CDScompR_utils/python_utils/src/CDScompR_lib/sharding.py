@@ -0,0 +1,116 @@
+import sys
+import polars as pl
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from .arrow_io import is_table_path, scan_table, write_table
+from .gff_utils import Region
+
+# Region covering a whole chromosome (1-based, inclusive)
+WHOLE_CHROMOSOME = (1, sys.maxsize)
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parse an 'i/N' shard specification (i-th of N shards, 1-based).
+    """
+    try:
+        index, nb_shards = (int(value) for value in shard.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{shard}' (expected i/N, e.g. 1/8)")
+    if nb_shards < 1 or not 1 <= index <= nb_shards:
+        raise ValueError(f"Invalid shard '{shard}' (i must be between 1 and N)")
+    return index, nb_shards
+
+
+def count_genes_per_chromosome(path: str) -> Counter:
+    """
+    Number of genes per chromosome of a GFF file (single text pass, without building a database)
+    or of an annotation table (only its seqid column is read).
+    """
+    if is_table_path(path):
+        counts = scan_table(path).group_by("seqid").len().collect()
+        return Counter(dict(counts.iter_rows()))
+    counts = Counter()
+    with open(path) as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.split("\t", 3)
+            if len(fields) > 2 and fields[2] == "gene":
+                counts[fields[0]] += 1
+    return counts
+
+
+def partition_chromosomes(gene_counts: Dict[str, int], nb_shards: int) -> List[List[str]]:
+    """
+    Split the chromosomes into nb_shards shards of balanced gene counts: chromosomes are taken by decreasing gene count
+    (then by name) and each one goes to the shard with the fewest genes so far (then the lowest index).
+    The partition only depends on the gene counts, so every shard job computes the same one.
+    """
+    shards: List[List[str]] = [[] for _ in range(nb_shards)]
+    loads = [0] * nb_shards
+    for chrom, count in sorted(gene_counts.items(), key=lambda item: (-item[1], item[0])):
+        lightest = min(range(nb_shards), key=lambda i: (loads[i], i))
+        shards[lightest].append(chrom)
+        loads[lightest] += count
+    return [sorted(chroms) for chroms in shards]
+
+
+def shard_regions(annotation_paths: List[str], shard: str, regions: Optional[List[Region]] = None) -> List[Region]:
+    """
+    Regions to load for a shard: its whole chromosomes, or only the given regions that are on them.
+    """
+    index, nb_shards = parse_shard(shard)
+    gene_counts = Counter()
+    for path in annotation_paths:
+        gene_counts.update(count_genes_per_chromosome(path))
+    chroms = partition_chromosomes(gene_counts, nb_shards)[index - 1]
+    if regions is not None:
+        return [region for region in regions if region[0] in chroms]
+    return [(chrom, *WHOLE_CHROMOSOME) for chrom in chroms]
+
+
+def gather_tsv(tsv_paths: List[str], output_path: str) -> int:
+    """
+    Concatenate the shard outputs in the given order, keeping the header once (shards without any row may have
+    a shorter header and are skipped). Returns the number of rows written.
+    """
+    header, rows = None, []
+    for tsv_path in tsv_paths:
+        with open(tsv_path) as tsv:
+            lines = tsv.readlines()
+        if len(lines) < 2:
+            continue
+        if header is None:
+            header = lines[0]
+        elif lines[0] != header:
+            raise ValueError(f"The header of {tsv_path} differs from that of the previous shards")
+        rows.extend(lines[1:])
+    with open(output_path, "w") as out:
+        out.write(header or "span_type\n")
+        out.writelines(rows)
+    return len(rows)
+
+
+def gather_scores(score_paths: List[str], output_path: str) -> None:
+    """
+    Concatenate the identity scores of the shards (see identity.write_scores) in the given order, renumbering
+    their clusters so that the cluster names stay unique (shards without any group are skipped).
+    """
+    frames, nb_clusters = [], 0
+    for score_path in score_paths:
+        try:
+            df = scan_table(score_path, infer_schema_length=0).collect()
+        except pl.exceptions.NoDataError:
+            continue
+        if df.height == 0:
+            continue
+        cluster_indexes = df["Cluster name"].str.strip_prefix("cluster ").cast(pl.Int64)
+        df = df.with_columns(("cluster " + (cluster_indexes + nb_clusters).cast(pl.String)).alias("Cluster name"))
+        nb_clusters += int(cluster_indexes.max()) + 1
+        frames.append(df)
+    scores = pl.concat(frames, how="diagonal_relaxed") if frames else pl.DataFrame()
+    if is_table_path(output_path):
+        write_table(scores.to_arrow(), output_path)
+    else:
+        scores.write_csv(output_path)
@@ -0,0 +1,86 @@
+import sys
+import os
+import subprocess
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pandas as pd
+from CDScompR_lib.annotation_cache import cache_annotation, genes_from_records, read_cached_records
+from CDScompR_lib.gene import Gene
+from CDScompR_lib.gff_utils import build_db
+from CDScompR_lib.identity import compute_identity_scores
+from CDScompR_lib.overlap_group import OverlapGroup
+
+TEST_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, ".."))
+
+
+def summaries(ref_genes, pred_genes) -> list:
+    groups = OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
+    compute_identity_scores(groups)
+    return sorted(str(group.summarize(include_overlap_matrix=True)) for group in groups)
+
+
+def test_cached_genes_match_gff_genes(tmp_path: Path):
+    genes = {}
+    for name, is_ref in [("ref", True), ("pred", False)]:
+        gff_path = f"{TEST_DIR}/data/test_{name}.gff"
+        db = build_db(gff_path)
+        cache_path = cache_annotation(gff_path, "CDS", str(tmp_path / f"{name}.pkl"))
+        genes[name] = (
+            [Gene.from_gff(db, g, is_ref=is_ref, span_type="CDS") for g in db.features_of_type("gene")],
+            genes_from_records(read_cached_records(cache_path), is_ref=is_ref),
+        )
+    assert summaries(genes["ref"][0], genes["pred"][0]) == summaries(genes["ref"][1], genes["pred"][1])
+
+
+def test_cache_is_reused(tmp_path: Path):
+    gff_path = tmp_path / "ref.gff"
+    gff_path.write_text(Path(f"{TEST_DIR}/data/test_ref.gff").read_text())
+    cache_path = str(tmp_path / "ref.pkl")
+    cache_annotation(str(gff_path), "CDS", cache_path)
+    mtime = os.stat(cache_path).st_mtime_ns
+    cache_annotation(str(gff_path), "CDS", cache_path)
+    assert os.stat(cache_path).st_mtime_ns == mtime
+    # Another span type invalidates the cache
+    cache_annotation(str(gff_path), "gene", cache_path)
+    assert read_cached_records(cache_path)[0][6:8] == (100, 300)
+
+
+def test_compare_all_vs_all(tmp_path: Path):
+    output_tsv = tmp_path / "all_vs_all.tsv"
+    subprocess.run([
+        "python", f"{ROOT_DIR}/scripts/compare_all_vs_all.py",
+        "--gff", f"ref={TEST_DIR}/data/test_ref.gff", f"pred={TEST_DIR}/data/test_pred.gff",
+        f"example={ROOT_DIR}/example_data/pred_test.gff",
+        "--span_type", "CDS", "--cache_dir", str(tmp_path / "cache"), "--threads", "2",
+        "-o", str(output_tsv)
+    ], check=True)
+
+    df = pd.read_csv(output_tsv, sep="\t").set_index(["annotation1", "annotation2"])
+    assert len(df) == 6
+    ref_vs_pred = df.loc[("ref", "pred")]
+    assert [ref_vs_pred[t] for t in ["match", "split", "fusion", "complex", "appearance", "disappearance"]] == [1, 1, 1, 1, 1, 1]
+    assert ref_vs_pred["nb_paired_genes"] == 5
+    assert ref_vs_pred["mean_identity_score"] == 30.02
+    # Each comparison is run once and reported in both directions
+    assert df.loc[("pred", "example"), "split"] == df.loc[("example", "pred"), "fusion"]
+    assert df.loc[("pred", "example"), "mean_identity_score"] == df.loc[("example", "pred"), "mean_identity_score"]
+
+
+def test_compare_all_vs_all_duplicated_annotation(tmp_path: Path):
+    """
+    Two versions of an annotation keeping the same gene IDs (here, the same file twice) can be compared.
+    """
+    output_tsv = tmp_path / "all_vs_all.tsv"
+    subprocess.run([
+        "python", f"{ROOT_DIR}/scripts/compare_all_vs_all.py",
+        "--gff", f"ref={TEST_DIR}/data/test_ref.gff", f"pred={TEST_DIR}/data/test_pred.gff", f"pred_copy={TEST_DIR}/data/test_pred.gff",
+        "--span_type", "CDS", "--cache_dir", str(tmp_path / "cache"), "--threads", "2",
+        "-o", str(output_tsv)
+    ], check=True)
+
+    df = pd.read_csv(output_tsv, sep="\t").set_index(["annotation1", "annotation2"])
+    assert df.loc[("pred", "pred_copy"), "mean_identity_score"] == 100.0
+    assert df.loc[("pred", "pred_copy"), ["split", "fusion", "appearance", "disappearance"]].sum() == 0
+    assert df.loc[("ref", "pred_copy")].equals(df.loc[("ref", "pred")])
@@ -0,0 +1,114 @@
+import sys
+import os
+import io
+import subprocess
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from CDScompR_lib.arrow_io import genes_from_table, gff_to_table, read_table, write_gff, write_table
+from CDScompR_lib.comparison_utils import load_score_file
+from CDScompR_lib.gene import Gene
+from CDScompR_lib.gff_utils import build_db
+from CDScompR_lib.identity import compute_identity_scores, write_scores
+from CDScompR_lib.overlap_group import OverlapGroup
+
+TEST_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, ".."))
+EXAMPLE_DIR = f"{ROOT_DIR}/example_data"
+
+
+def db_genes(gff_path: str, is_ref: bool, span_type: str) -> list:
+    db = build_db(gff_path)
+    return [Gene.from_gff(db, g, is_ref=is_ref, span_type=span_type) for g in db.features_of_type("gene")]
+
+
+def summaries(ref_genes, pred_genes) -> list:
+    groups = OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
+    compute_identity_scores(groups)
+    return sorted(str(group.summarize(include_overlap_matrix=True)) for group in groups)
+
+
+@pytest.mark.parametrize("ref_gff, pred_gff", [
+    (f"{TEST_DIR}/data/test_ref.gff", f"{TEST_DIR}/data/test_pred.gff"),
+    (f"{EXAMPLE_DIR}/ref_test.gff", f"{EXAMPLE_DIR}/pred_test.gff"),
+])
+@pytest.mark.parametrize("suffix", [".arrow", ".parquet"])
+def test_table_genes_match_gff_genes(tmp_path: Path, ref_gff, pred_gff, suffix):
+    tables = {}
+    for name, gff_path in [("ref", ref_gff), ("pred", pred_gff)]:
+        write_table(gff_to_table(gff_path), str(tmp_path / f"{name}{suffix}"))
+        tables[name] = read_table(str(tmp_path / f"{name}{suffix}"))
+    for span_type in ["gene", "mRNA", "CDS"]:
+        assert summaries(genes_from_table(tables["ref"], True, span_type), genes_from_table(tables["pred"], False, span_type)) == \
+            summaries(db_genes(ref_gff, True, span_type), db_genes(pred_gff, False, span_type))
+
+
+def test_gff_export_round_trip(tmp_path: Path):
+    table = gff_to_table(f"{TEST_DIR}/data/test_pred.gff")
+    exported = io.StringIO()
+    write_gff(table, exported)
+    (tmp_path / "exported.gff").write_text(exported.getvalue())
+    assert gff_to_table(str(tmp_path / "exported.gff")).equals(table)
+
+
+def test_gff_to_table_requires_one_transcript(tmp_path: Path):
+    gff = tmp_path / "two_mrnas.gff"
+    gff.write_text(
+        "chr1\t.\tgene\t1\t100\t.\t+\t.\tID=g1\n"
+        "chr1\t.\tmRNA\t1\t100\t.\t+\t.\tID=g1.1;Parent=g1\n"
+        "chr1\t.\tmRNA\t1\t90\t.\t+\t.\tID=g1.2;Parent=g1\n"
+    )
+    with pytest.raises(ValueError):
+        gff_to_table(str(gff))
+
+
+def test_scores_table_round_trip(tmp_path: Path):
+    groups = OverlapGroup.overlap_groups_from_genes(
+        db_genes(f"{EXAMPLE_DIR}/ref_test.gff", True, "CDS"), db_genes(f"{EXAMPLE_DIR}/pred_test.gff", False, "CDS")
+    )
+    group_pairs = compute_identity_scores(groups)
+    for name in ["scores.csv", "scores.parquet", "scores.arrow"]:
+        write_scores(groups, group_pairs, str(tmp_path / name))
+    expected = load_score_file(str(tmp_path / "scores.csv"))
+    for name in ["scores.parquet", "scores.arrow"]:
+        assert load_score_file(str(tmp_path / name)).equals(expected)
+
+
+def test_compare_annots_with_tables(tmp_path: Path):
+    for name in ["ref", "pred"]:
+        subprocess.run([
+            "python", f"{ROOT_DIR}/scripts/annotation_table.py", "from_gff",
+            "--gff", f"{TEST_DIR}/data/test_{name}.gff", "-o", str(tmp_path / f"{name}.arrow")
+        ], check=True)
+    output_tsv = tmp_path / "observed_output.tsv"
+    subprocess.run([
+        "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+        "--ref_gff", str(tmp_path / "ref.arrow"),
+        "--pred_gff", str(tmp_path / "pred.arrow"),
+        "--cdscompr_csv", f"{TEST_DIR}/data/test_scores.csv",
+        "--span_type", "CDS",
+        "-o", str(output_tsv)
+    ], check=True)
+
+    with open(f"{TEST_DIR}/data/expected_output.tsv") as expected, open(output_tsv) as observed:
+        assert sorted(expected.readlines()) == sorted(observed.readlines())
+
+
+def test_compare_annots_tables_sharing_ids(tmp_path: Path):
+    """
+    Annotations sharing gene IDs and spans (here, the same annotation as ref and pred) give the same output from tables as from GFFs.
+    """
+    gff_path = f"{TEST_DIR}/data/test_ref.gff"
+    write_table(gff_to_table(gff_path), str(tmp_path / "ref.arrow"))
+    for name, annotation in [("gff", gff_path), ("table", str(tmp_path / "ref.arrow"))]:
+        subprocess.run([
+            "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+            "--ref_gff", annotation, "--pred_gff", annotation,
+            "--span_type", "CDS",
+            "-o", str(tmp_path / f"{name}.tsv")
+        ], check=True)
+
+    with open(tmp_path / "gff.tsv") as from_gff, open(tmp_path / "table.tsv") as from_table:
+        assert sorted(from_table.readlines()) == sorted(from_gff.readlines())
+    assert "100.0" in (tmp_path / "table.tsv").read_text()
@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import numpy as np
+import polars as pl
+import pytest
+from CDScompR_lib.gene import Gene
+from CDScompR_lib.gff_utils import build_db
+from CDScompR_lib.identity import compare_cds, compute_identity_scores, score_group, write_scores
+from CDScompR_lib.overlap_group import OverlapGroup
+
+TEST_DIR = os.path.dirname(__file__)
+EXAMPLE_DIR = os.path.abspath(os.path.join(TEST_DIR, "..", "example_data"))
+
+
+def cds(*coords) -> np.ndarray:
+    return np.array(coords, dtype=np.int64).reshape(-1, 2)
+
+
+def load_groups(ref_gff: str, pred_gff: str) -> list:
+    ref_db, pred_db = build_db(ref_gff), build_db(pred_gff)
+    ref_genes = [Gene.from_gff(ref_db, g, is_ref=True, span_type="CDS") for g in ref_db.features_of_type("gene")]
+    pred_genes = [Gene.from_gff(pred_db, g, is_ref=False, span_type="CDS") for g in pred_db.features_of_type("gene")]
+    return OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
+
+
+@pytest.mark.parametrize("strand, expected_counts", [
+    # Forward strand: the missing base 200 of pred shifts the frame of the second CDS
+    ("+", (10, 1, 9)),
+    # Reverse strand: transcription starts at 209, the frame shift is on the first CDS
+    ("-", (9, 1, 10)),
+])
+def test_compare_cds_strand(strand, expected_counts):
+    score = compare_cds(("ref", cds((100, 109), (200, 209)), strand), ("pred", cds((100, 109), (201, 209)), strand))
+    assert (score.matches, score.ei_mismatches, score.rf_mismatches) == expected_counts
+    assert score.ei_zones == [(200, 200)]
+
+
+def test_compare_cds_identical():
+    score = compare_cds(("ref", cds((10, 30), (50, 70)), "+"), ("pred", cds((10, 30), (50, 70)), "+"))
+    assert (score.matches, score.mismatches, score.identity_score) == (42, 0, 100.0)
+
+
+def test_score_group_pairs_best_first():
+    refs = [("ref", cds((310, 390)), "+")]
+    preds = [("pred1", cds((360, 390)), "+"), ("pred2", cds((310, 330)), "+"), ("pred3", cds((400, 450)), "+")]
+    pairs = score_group(refs, preds)
+    assert [(pair.ref_id, pair.pred_id, pair.identity_score) for pair in pairs] == [("ref", "pred2", 25.9)]
+
+
+def test_identity_scores_match_cdscompr_example(tmp_path):
+    """
+    The built-in scores of the example GFFs are those of the CDScompR output of example_data.
+    """
+    groups = load_groups(f"{EXAMPLE_DIR}/ref_test.gff", f"{EXAMPLE_DIR}/pred_test.gff")
+    group_pairs = compute_identity_scores(groups)
+    observed_csv = tmp_path / "scores.csv"
+    write_scores(groups, group_pairs, str(observed_csv))
+
+    columns = ["Chromosome", "Reference locus", "Alternative locus", "Comparison matches", "Comparison mismatches",
+               "Identity score (%)", "Exon_intron (EI) non-correspondance zones", "Reading frame (RF) non-correspondance zones",
+               "Exon_Intron (EI) mismatches", "Reading Frame (RF) mismatches"]
+
+    def paired_rows(csv_path) -> list:
+        df = pl.read_csv(csv_path, infer_schema_length=0).select(columns)
+        return sorted(df.filter((pl.col("Reference locus") != "~") & (pl.col("Alternative locus") != "~")).rows())
+
+    assert paired_rows(observed_csv) == paired_rows(f"{EXAMPLE_DIR}/pred_test_clean.csv")
+
+
+def test_identity_scores_match_test_scores():
+    groups = load_groups(f"{TEST_DIR}/data/test_ref.gff", f"{TEST_DIR}/data/test_pred.gff")
+    pairs = {(pair.ref_id, pair.pred_id): pair for group_pairs in compute_identity_scores(groups) for pair in group_pairs}
+
+    expected = pl.read_csv(f"{TEST_DIR}/data/test_scores.csv", infer_schema_length=0)
+    for ref_id, pred_id in [("Gene1", "Pred1"), ("Gene2", "Pred2a")]:
+        row = expected.filter((pl.col("Reference locus") == ref_id) & (pl.col("Alternative locus") == pred_id)).row(0, named=True)
+        pair = pairs[(ref_id, pred_id)]
+        assert pair.matches == int(row["Comparison matches"])
+        assert pair.mismatches == int(row["Comparison mismatches"])
+        assert pair.ei_mismatches == int(row["Exon_Intron (EI) mismatches"])
+        assert pair.rf_mismatches == int(row["Reading Frame (RF) mismatches"])
+        assert pair.identity_score == float(row["Identity score (%)"])
+
+    genes = {gene.uid: gene for group in groups for gene in group.ref_genes + group.pred_genes}
+    assert (genes["ref:Gene1"].best_hit_id, genes["ref:Gene1"].identity_score) == ("Pred1", 50.0)
+    assert (genes["pred:Pred2b"].best_hit_id, genes["pred:Pred2b"].identity_score) == (None, 0.0)
+
+
+def test_identity_scores_parallel():
+    groups = load_groups(f"{EXAMPLE_DIR}/ref_test.gff", f"{EXAMPLE_DIR}/pred_test.gff")
+    assert compute_identity_scores(groups, threads=2, chunk_size=1) == compute_identity_scores(groups)
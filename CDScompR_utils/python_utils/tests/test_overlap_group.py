@@ -2,9 +2,10 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
+import numpy as np
 import pytest
 from CDScompR_lib.gene import Gene
-from CDScompR_lib.overlap_group import OverlapGroup
+from CDScompR_lib.overlap_group import MultiOverlapGroup, OverlapGroup
 
 
 class DummyFeature:
@@ -14,8 +15,9 @@ class DummyFeature:
 
 
 class DummyProtein:
-    def __init__(self, seqid: str, strand: str):
+    def __init__(self, seqid: str, strand: str, cds: list = None):
         self.feature = DummyFeature(seqid, strand)
+        self.cds = cds or []
 
     def cds_length(self) -> int:
         return 100
@@ -23,13 +25,16 @@ class DummyProtein:
     def cds_count(self) -> int:
         return 2
 
+    def cds_coords(self) -> np.ndarray:
+        return np.array(self.cds, dtype=np.int64).reshape(-1, 2)
+
 
-def make_gene(id: str, span_start: int, span_end: int, is_ref: bool, seqid: str = "chr", strand: str = "+") -> Gene:
+def make_gene(id: str, span_start: int, span_end: int, is_ref: bool, seqid: str = "chr", strand: str = "+", cds: list = None) -> Gene:
     return Gene(
         id=id,
         span_start=span_start,
         span_end=span_end,
-        protein=DummyProtein(seqid, strand),
+        protein=DummyProtein(seqid, strand, cds),
         is_ref=is_ref,
         uid=f"{'ref' if is_ref else 'pred'}:{id}"
     )
@@ -79,3 +84,74 @@ def test_overlap_group_types(ref_genes, pred_genes, expected_nb_groups, expected
     groups = OverlapGroup.overlap_groups_from_genes(ref_genes, pred_genes)
     assert len(groups) == expected_nb_groups
     assert sorted(g.get_type() for g in groups) == sorted(expected_types)
+
+
+def test_overlap_matrix():
+    group = OverlapGroup(
+        ref_genes=[make_gene("ref1", 100, 199, True, cds=[(110, 130), (150, 190)]),
+                   make_gene("ref2", 300, 349, True, cds=[(300, 349)])],
+        pred_genes=[make_gene("pred1", 150, 249, False, cds=[(120, 160)]),
+                    make_gene("pred2", 340, 400, False, cds=[(380, 400)]),
+                    make_gene("pred3", 500, 600, False, cds=[(500, 600)])]
+    )
+    # Only the nonzero entries: pred3 overlaps no ref, and ref1/pred2, ref2/pred1 do not overlap
+    assert sorted(group.overlap_matrix()) == [
+        ("ref1", "pred1", 50, 0.5, 0.5, 22),
+        ("ref2", "pred2", 10, 0.2, 0.164, 0),
+    ]
+    assert "pairwise_overlaps" not in group.summarize()
+    assert group.summarize(include_overlap_matrix=True)["pairwise_overlaps"] == group.overlap_matrix()
+
+
+def test_overlap_matrix_one_side():
+    assert OverlapGroup(ref_genes=[make_gene("ref1", 100, 199, True, cds=[(110, 130)])]).overlap_matrix() == []
+
+
+def make_source_gene(source: str, id: str, span_start: int, span_end: int, seqid: str = "chr", strand: str = "+") -> Gene:
+    return Gene(id=id, span_start=span_start, span_end=span_end, protein=DummyProtein(seqid, strand),
+                is_ref=source == "ref", uid=f"{source}:{id}", source=source)
+
+
+def test_multi_overlap_groups():
+    genes_by_source = {
+        "ref": [make_source_gene("ref", "r1", 100, 200), make_source_gene("ref", "r2", 1000, 1100)],
+        "toolA": [make_source_gene("toolA", "a1", 150, 250), make_source_gene("toolA", "a2", 1000, 1040),
+                  make_source_gene("toolA", "a3", 1060, 1100)],
+        # b1 links r1 and b2 only through toolB, b3 is on the other strand
+        "toolB": [make_source_gene("toolB", "b1", 240, 300), make_source_gene("toolB", "b3", 100, 200, strand="-")],
+    }
+    groups = MultiOverlapGroup.overlap_groups_from_annotations(genes_by_source)
+    assert len(groups) == 3
+    first = next(g for g in groups if "ref" in g.members and g.members["ref"][0].id == "r1")
+    assert {source: [g.id for g in genes] for source, genes in first.members.items()} == {"ref": ["r1"], "toolA": ["a1"], "toolB": ["b1"]}
+    # r1 and b1 do not overlap: they are in the group through a1 only
+    assert first.pair_types("ref", "toolB") == ["appearance", "disappearance"]
+    assert first.pair_types("ref", "toolA") == ["match"]
+    summary = first.summarize(["ref", "toolA", "toolB"])
+    assert summary["ref_vs_toolB_type"] == "appearance,disappearance"
+    assert summary["toolA_vs_toolB_type"] == "match"
+
+
+def test_multi_overlap_pair_types_match_two_way_grouping():
+    """
+    The types of a source pair over all N-way groups are those of a two-way grouping of the pair.
+    """
+    rng = np.random.default_rng(0)
+    sources = ["ref", "toolA", "toolB"]
+    genes_by_source = {
+        source: [make_source_gene(source, f"{source}{i}", start, start + int(rng.integers(10, 200)))
+                 for i, start in enumerate(rng.integers(0, 5000, size=40).tolist())]
+        for source in sources
+    }
+    groups = MultiOverlapGroup.overlap_groups_from_annotations(genes_by_source)
+    assert sum(len(genes) for g in groups for genes in g.members.values()) == 120
+
+    for i, source1 in enumerate(sources):
+        for source2 in sources[i + 1:]:
+            two_way_groups = MultiOverlapGroup.overlap_groups_from_annotations(
+                {source1: genes_by_source[source1], source2: genes_by_source[source2]}
+            )
+            two_way_types = sorted(
+                OverlapGroup.classify(len(g.members.get(source1, [])), len(g.members.get(source2, []))) for g in two_way_groups
+            )
+            assert sorted(t for g in groups for t in g.pair_types(source1, source2)) == two_way_types
@@ -0,0 +1,62 @@
+import sys
+import os
+import subprocess
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from CDScompR_lib.gff_utils import filter_gff_by_regions, parse_region, read_regions
+
+TEST_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, ".."))
+
+
+def gene_ids(gff_path: Path) -> list:
+    with open(gff_path) as gff:
+        return [line.split("\t")[8].split(";")[0][3:] for line in gff if not line.startswith("#") and line.split("\t")[2] == "gene"]
+
+
+def test_parse_region():
+    assert parse_region("chr1:1,000-2,000") == ("chr1", 1000, 2000)
+    with pytest.raises(ValueError):
+        parse_region("chr1")
+
+
+def test_read_regions(tmp_path: Path):
+    regions_file = tmp_path / "zones.tsv"
+    regions_file.write_text("chr1\t100\t200\n\nchr2\t5\t10\n")
+    assert read_regions(str(regions_file)) == [("chr1", 100, 200), ("chr2", 5, 10)]
+
+
+@pytest.mark.parametrize("regions, expected_genes", [
+    ([("chr1", 450, 460)], ["Gene2"]),
+    ([("chr1", 300, 300), ("chr1", 1240, 1240)], ["Gene1", "Gene6", "Gene7"]),
+    ([("chr1", 301, 399)], []),
+    ([("chr2", 1, 2000)], []),
+])
+def test_filter_gff_by_regions(tmp_path: Path, regions, expected_genes):
+    out_gff = tmp_path / "filtered.gff"
+    nb_kept = filter_gff_by_regions(f"{TEST_DIR}/data/test_ref.gff", regions, str(out_gff))
+    assert nb_kept == len(expected_genes)
+    assert gene_ids(out_gff) == expected_genes
+    # gene models are kept whole
+    with open(out_gff) as gff:
+        kept_lines = [line for line in gff if not line.startswith("#")]
+    assert all(line.split("\t")[8].split(";")[0][3:].split(".")[0] in expected_genes for line in kept_lines)
+    assert len([line for line in kept_lines if line.split("\t")[2] == "mRNA"]) == len(expected_genes)
+
+
+def test_compare_annots_whole_chromosome_region(tmp_path: Path):
+    output_tsv = tmp_path / "observed_output.tsv"
+    subprocess.run([
+        "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+        "--ref_gff", f"{TEST_DIR}/data/test_ref.gff",
+        "--pred_gff", f"{TEST_DIR}/data/test_pred.gff",
+        "--cdscompr_csv", f"{TEST_DIR}/data/test_scores.csv",
+        "--span_type", "CDS",
+        "--region", "chr1:1-100000",
+        "-o", str(output_tsv)
+    ], check=True)
+
+    with open(f"{TEST_DIR}/data/expected_output.tsv") as expected, open(output_tsv) as observed:
+        assert sorted(expected.readlines()) == sorted(observed.readlines())
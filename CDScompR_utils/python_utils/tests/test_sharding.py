@@ -0,0 +1,80 @@
+import sys
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import pytest
+from CDScompR_lib.comparison_utils import load_score_file
+from CDScompR_lib.sharding import count_genes_per_chromosome, parse_shard, partition_chromosomes
+
+TEST_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, ".."))
+EXAMPLE_DIR = f"{ROOT_DIR}/example_data"
+COMPARE_ANNOTS = f"{ROOT_DIR}/scripts/compare_annots.py"
+
+
+def test_partition_chromosomes_balanced():
+    gene_counts = {"chr1": 50, "chr2": 40, "chr3": 30, "chr4": 20, "chr5": 10, "chrUn": 10}
+    assert partition_chromosomes(gene_counts, 2) == [["chr1", "chr4", "chr5"], ["chr2", "chr3", "chrUn"]]
+    assert partition_chromosomes(gene_counts, 8)[6:] == [[], []]
+
+
+@pytest.mark.parametrize("shard", ["0/2", "3/2", "1", "a/b"])
+def test_parse_shard_invalid(shard):
+    with pytest.raises(ValueError):
+        parse_shard(shard)
+
+
+def test_count_genes_per_chromosome():
+    assert count_genes_per_chromosome(f"{EXAMPLE_DIR}/ref_test.gff") == {"chr1": 9, "chrB": 8}
+
+
+def run_shard(args) -> None:
+    shard, out_dir = args
+    subprocess.run([
+        "python", COMPARE_ANNOTS,
+        "--ref_gff", f"{EXAMPLE_DIR}/ref_test.gff",
+        "--pred_gff", f"{EXAMPLE_DIR}/pred_test.gff",
+        "--span_type", "CDS",
+        "--shard", shard,
+        "-o", f"{out_dir}/overlaps_{shard.replace('/', '_of_')}.tsv",
+        "--scores_output", f"{out_dir}/scores_{shard.replace('/', '_of_')}.parquet",
+        "--summary_output", f"{out_dir}/summary_{shard.replace('/', '_of_')}.txt",
+        "--summary_json", f"{out_dir}/summary_{shard.replace('/', '_of_')}.json",
+    ], check=True)
+
+
+def test_scatter_gather_matches_single_run(tmp_path: Path):
+    """
+    Shards run in a process pool (standing in for the cluster jobs) and gathered give the output of a single run.
+    """
+    subprocess.run([
+        "python", COMPARE_ANNOTS,
+        "--ref_gff", f"{EXAMPLE_DIR}/ref_test.gff",
+        "--pred_gff", f"{EXAMPLE_DIR}/pred_test.gff",
+        "--span_type", "CDS",
+        "-o", str(tmp_path / "single.tsv"),
+        "--scores_output", str(tmp_path / "single.csv"),
+        "--summary_output", str(tmp_path / "single_summary.txt"),
+    ], check=True)
+
+    shards = [f"{i}/3" for i in range(1, 4)]
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        list(executor.map(run_shard, [(shard, tmp_path) for shard in shards]))
+    subprocess.run([
+        "python", COMPARE_ANNOTS, "gather",
+        "--overlaps", *[str(tmp_path / f"overlaps_{i}_of_3.tsv") for i in range(1, 4)],
+        "-o", str(tmp_path / "gathered.tsv"),
+        "--scores", *[str(tmp_path / f"scores_{i}_of_3.parquet") for i in range(1, 4)],
+        "--scores_output", str(tmp_path / "gathered.parquet"),
+        "--summaries", *[str(tmp_path / f"summary_{i}_of_3.json") for i in range(1, 4)],
+        "--summary_output", str(tmp_path / "gathered_summary.txt"),
+    ], check=True)
+
+    with open(tmp_path / "single.tsv") as single, open(tmp_path / "gathered.tsv") as gathered:
+        assert sorted(single.readlines()) == sorted(gathered.readlines())
+    assert (tmp_path / "gathered_summary.txt").read_text() == (tmp_path / "single_summary.txt").read_text()
+    assert load_score_file(str(tmp_path / "gathered.parquet")).sort("ref_id", "alt_id").equals(
+        load_score_file(str(tmp_path / "single.csv")).sort("ref_id", "alt_id"))
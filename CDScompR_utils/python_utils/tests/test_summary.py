@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+import subprocess
+from pathlib import Path
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from CDScompR_lib.comparison_utils import merge_overlap_summaries, summarize_overlap_types, write_overlap_summary
+from CDScompR_lib.gene import Gene
+from CDScompR_lib.overlap_group import OverlapGroup
+
+TEST_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, ".."))
+
+
+def make_match(id: str, best_hit_id, identity_score) -> OverlapGroup:
+    ref = Gene(id=id, span_start=1, span_end=10, protein=None, is_ref=True, uid=f"ref:{id}",
+               best_hit_id=best_hit_id, identity_score=identity_score)
+    pred = Gene(id=f"{id}.pred", span_start=1, span_end=10, protein=None, is_ref=False, uid=f"pred:{id}.pred")
+    return OverlapGroup(ref_genes=[ref], pred_genes=[pred])
+
+
+def test_summarize_overlap_types(tmp_path: Path):
+    groups = [
+        make_match("a", "a.pred", 90.0),
+        # IDs with brackets and colons do not disturb the summary
+        make_match("b[1]:x", "b.pred", 0.0),
+        make_match("c", None, 0.0),
+        make_match("d", None, None),
+        OverlapGroup(pred_genes=[Gene(id="e", span_start=1, span_end=10, protein=None, is_ref=False, uid="pred:e")]),
+    ]
+    summary = summarize_overlap_types(groups)
+    assert summary == {
+        "types": {"appearance": 1, "match": 4},
+        "match_mean_identity_score": 22.5,
+        "nb_matches_zero_score_with_hit": 1,
+        "nb_matches_zero_score_without_hit": 1,
+        "nb_matches": 4,
+        "match_identity_score_sum": 90.0,
+        "score_source": "CDScompR",
+    }
+
+    write_overlap_summary(summary, str(tmp_path / "summary.tsv"), str(tmp_path / "summary.json"))
+    assert (tmp_path / "summary.tsv").read_text() == (
+        "appearance:\t1\n"
+        "match:\t4 (mean id score: 22.50%)\n"
+        "--- including 1 match(es) with a 0.00% score, overlapping according to CDScompR\n"
+        "\n"
+        "WARNING: 1 match(es) were not detected by CDScompR and appear with a score of 0.00%\n"
+    )
+    assert json.loads((tmp_path / "summary.json").read_text()) == summary
+
+    # Scores computed by the built-in engine are not attributed to CDScompR
+    write_overlap_summary(summarize_overlap_types(groups, score_source="built-in"), str(tmp_path / "builtin_summary.tsv"))
+    assert (tmp_path / "builtin_summary.tsv").read_text() == (
+        "appearance:\t1\n"
+        "match:\t4 (mean id score: 22.50%)\n"
+        "--- including 1 match(es) with a 0.00% score, overlapping CDS\n"
+        "\n"
+        "WARNING: 1 match(es) were not paired by the built-in identity engine and appear with a score of 0.00%\n"
+    )
+
+
+def test_merge_overlap_summaries():
+    groups = [
+        make_match("a", "a.pred", 90.0),
+        make_match("b", "b.pred", 0.0),
+        make_match("c", None, 0.0),
+        make_match("d", "d.pred", 35.5),
+        OverlapGroup(pred_genes=[Gene(id="e", span_start=1, span_end=10, protein=None, is_ref=False, uid="pred:e")]),
+    ]
+    parts = [summarize_overlap_types(groups[:1]), summarize_overlap_types(groups[1:4]), summarize_overlap_types(groups[4:]), summarize_overlap_types([])]
+    assert merge_overlap_summaries(parts) == summarize_overlap_types(groups)
+    with pytest.raises(ValueError, match="different sources"):
+        merge_overlap_summaries([summarize_overlap_types(groups[:1]), summarize_overlap_types(groups[1:], score_source="built-in")])
+
+
+def test_compare_annots_summary(tmp_path: Path):
+    summary_tsv = tmp_path / "summary.tsv"
+    subprocess.run([
+        "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+        "--ref_gff", f"{TEST_DIR}/data/test_ref.gff",
+        "--pred_gff", f"{TEST_DIR}/data/test_pred.gff",
+        "--cdscompr_csv", f"{TEST_DIR}/data/test_scores.csv",
+        "--span_type", "CDS",
+        "-o", str(tmp_path / "overlaps.tsv"),
+        "--summary_output", str(summary_tsv)
+    ], check=True)
+    assert summary_tsv.read_text().splitlines() == [
+        "appearance:\t1", "complex:\t1", "disappearance:\t1", "fusion:\t1",
+        "match:\t1 (mean id score: 50.00%)",
+        "--- including 0 match(es) with a 0.00% score, overlapping according to CDScompR",
+        "split:\t1",
+    ]
+
+
+def test_compare_annots_rejects_incompatible_options_early(tmp_path: Path):
+    """
+    Incompatible options are rejected before any GFF is read or output written.
+    """
+    for options in [["--summary_json", str(tmp_path / "summary.json")],
+                    ["--cdscompr_csv", f"{TEST_DIR}/data/test_scores.csv", "--scores_output", str(tmp_path / "scores.csv")]]:
+        result = subprocess.run([
+            "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+            "--ref_gff", str(tmp_path / "missing_ref.gff"),
+            "--pred_gff", str(tmp_path / "missing_pred.gff"),
+            "-o", str(tmp_path / "overlaps.tsv"),
+            *options
+        ], capture_output=True, text=True)
+        assert result.returncode == 2
+        assert "requires" in result.stderr
+    assert not (tmp_path / "overlaps.tsv").exists()
+
+
+def test_compare_annots_requires_both_annotations(tmp_path: Path):
+    """
+    A missing --ref_gff or --pred_gff is a usage error, also with --shard (instead of a traceback).
+    """
+    for options in [["--pred_gff", f"{TEST_DIR}/data/test_pred.gff"],
+                    ["--ref_gff", f"{TEST_DIR}/data/test_ref.gff", "--shard", "1/2"]]:
+        result = subprocess.run([
+            "python", f"{ROOT_DIR}/scripts/compare_annots.py",
+            "-o", str(tmp_path / "overlaps.tsv"),
+            *options
+        ], capture_output=True, text=True)
+        assert result.returncode == 2
+        assert "--ref_gff and --pred_gff are required" in result.stderr
+    assert not (tmp_path / "overlaps.tsv").exists()
@@ -0,0 +1,248 @@
+#python LRRome_manifest.py <command> --manifest build_manifest.json ...
+
+"""
+Build manifest of build_incremental_LRRome.sh, used to only redo the steps whose inputs changed since the previous build.
+
+The manifest (JSON) records:
+- per input file and step (e.g. gff_cleaner): the content hash of the input, the step parameters and the output file,
+- per gene model and step: the hash of the gene model (or of its protein sequence) and the step output for this gene
+  (protein sequence for the protein extraction, LRRprofiler classification row for the classification).
+
+Commands:
+- is_current / record: check / record a per-file step (exit status 0 if the recorded output is up to date).
+- split_gff / merge_fasta: write the gene models whose protein is not cached, then merge the newly extracted proteins with the cached ones.
+- split_fasta / merge_table: write the proteins whose classification is not cached, then merge the new classification rows with the cached ones.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+GENE_MODEL_COLUMNS = (0, 2, 3, 4, 6, 7)  # seqid, type, start, end, strand, phase: what the extracted sequence depends on
+
+
+## Manifest I/O
+
+def load_manifest(manifest_path: str) -> Dict:
+    if not os.path.exists(manifest_path):
+        return {"version": MANIFEST_VERSION, "files": {}, "genes": {}, "headers": {}}
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Error: unsupported manifest version in {manifest_path}")
+    return manifest
+
+
+def save_manifest(manifest: Dict, manifest_path: str) -> None:
+    """Write the manifest atomically (a failed run never leaves a truncated manifest)."""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def file_sha256(path: str) -> str:
+    checksum = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def text_sha256(*texts: str) -> str:
+    return hashlib.sha256("\n".join(texts).encode()).hexdigest()
+
+
+## Parsing
+
+def read_gene_models(gff_path: str) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (gene ID, lines) for each gene model of a GFF where children follow their gene (e.g. gff_cleaner output)."""
+    gene_id, lines = None, []
+    with open(gff_path, "r") as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if fields[2] == "gene":
+                if gene_id is not None:
+                    yield gene_id, lines
+                gene_id = re.search(r"(?:^|;)ID=([^;]+)", fields[8]).group(1)
+                lines = []
+            if gene_id is not None:
+                lines.append(line)
+    if gene_id is not None:
+        yield gene_id, lines
+
+
+def gene_model_hash(lines: List[str], params: str) -> str:
+    """Hash of the coordinates, strands and phases of all the features of a gene model, and of the step parameters."""
+    features = ["\t".join(line.rstrip("\n").split("\t")[i] for i in GENE_MODEL_COLUMNS) for line in lines]
+    return text_sha256(params, *features)
+
+
+def read_fasta(fasta_path: str) -> Dict[str, str]:
+    """Return {record ID (first word of the header): sequence}."""
+    sequences: Dict[str, List[str]] = {}
+    seq_id = None
+    with open(fasta_path, "r") as fasta:
+        for line in fasta:
+            line = line.strip()
+            if line.startswith(">"):
+                seq_id = line[1:].split()[0]
+                sequences[seq_id] = []
+            elif seq_id is not None and line:
+                sequences[seq_id].append(line)
+    return {seq_id: "".join(chunks) for seq_id, chunks in sequences.items()}
+
+
+def write_fasta(records: List[Tuple[str, str]], fasta_path: str, line_width: int = 60) -> None:
+    with open(fasta_path, "w") as out:
+        for seq_id, sequence in records:
+            out.write(f">{seq_id}\n")
+            out.writelines(sequence[i:i + line_width] + "\n" for i in range(0, len(sequence), line_width))
+
+
+def table_key(row: str) -> str:
+    """ID of a classification row (its first field)."""
+    return re.split(r"[\t,;]", row, maxsplit=1)[0].strip().strip('"')
+
+
+## Commands
+
+def is_current(manifest: Dict, step: str, input_path: str, output_path: str, params: str) -> bool:
+    entry = manifest["files"].get(step, {}).get(os.path.realpath(input_path))
+    return (
+        entry is not None
+        and entry["params"] == params
+        and entry["output"] == os.path.realpath(output_path)
+        and os.path.exists(output_path)
+        and entry["sha256"] == file_sha256(input_path)
+        and entry["output_sha256"] == file_sha256(output_path)
+    )
+
+
+def record(manifest: Dict, step: str, input_path: str, output_path: str, params: str) -> None:
+    manifest["files"].setdefault(step, {})[os.path.realpath(input_path)] = {
+        "sha256": file_sha256(input_path),
+        "params": params,
+        "output": os.path.realpath(output_path),
+        "output_sha256": file_sha256(output_path),
+    }
+
+
+def split_gff(manifest: Dict, step: str, gff_path: str, params: str, out_gff: str) -> int:
+    """Write the gene models of gff_path without an up-to-date cached output to out_gff. Returns their number."""
+    cached = manifest["genes"].get(step, {})
+    nb_new = 0
+    with open(out_gff, "w") as out:
+        for gene_id, lines in read_gene_models(gff_path):
+            entry = cached.get(gene_id)
+            if entry is None or entry["hash"] != gene_model_hash(lines, params):
+                out.writelines(lines)
+                nb_new += 1
+    return nb_new
+
+
+def merge_fasta(manifest: Dict, step: str, gff_path: str, params: str, new_fasta: Optional[str], output: str) -> None:
+    """Write the sequences of all the genes of gff_path (new ones from new_fasta, the others from the manifest) and record the new ones."""
+    cached = manifest["genes"].setdefault(step, {})
+    new_sequences = read_fasta(new_fasta) if new_fasta and os.path.exists(new_fasta) else {}
+    records = []
+    for gene_id, lines in read_gene_models(gff_path):
+        if gene_id in new_sequences:
+            cached[gene_id] = {"hash": gene_model_hash(lines, params), "output": new_sequences[gene_id]}
+        entry = cached.get(gene_id)
+        if entry is not None and entry["hash"] == gene_model_hash(lines, params):
+            records.append((gene_id, entry["output"]))
+        else:
+            print(f"WARNING: no {step} output for gene {gene_id}", file=sys.stderr)
+    write_fasta(records, output)
+
+
+def split_fasta(manifest: Dict, step: str, fasta_path: str, params: str, out_fasta: str) -> int:
+    """Write the sequences of fasta_path without an up-to-date cached output to out_fasta. Returns their number."""
+    cached = manifest["genes"].get(step, {})
+    new_records = [
+        (seq_id, sequence) for seq_id, sequence in read_fasta(fasta_path).items()
+        if seq_id not in cached or cached[seq_id]["hash"] != text_sha256(params, sequence)
+    ]
+    write_fasta(new_records, out_fasta)
+    return len(new_records)
+
+
+def merge_table(manifest: Dict, step: str, fasta_path: str, params: str, new_table: Optional[str], output: str) -> None:
+    """
+    Write the rows of all the sequences of fasta_path (new ones from new_table, the others from the manifest) and record the new ones.
+    Sequences processed in this run but absent from new_table are recorded without row (e.g. proteins not classified as LRR).
+    """
+    cached = manifest["genes"].setdefault(step, {})
+    sequences = read_fasta(fasta_path)
+    new_rows: Dict[str, str] = {}
+    if new_table and os.path.exists(new_table):
+        with open(new_table, "r") as table:
+            lines = table.read().splitlines()
+        if lines:
+            manifest["headers"][step] = lines[0]
+            new_rows = {table_key(row): row for row in lines[1:] if row.strip()}
+        for seq_id, sequence in sequences.items():
+            entry = cached.get(seq_id)
+            if entry is None or entry["hash"] != text_sha256(params, sequence):
+                cached[seq_id] = {"hash": text_sha256(params, sequence), "output": new_rows.get(seq_id)}
+
+    for seq_id in sequences:
+        if seq_id not in cached:
+            print(f"WARNING: no {step} output for sequence {seq_id}", file=sys.stderr)
+    rows = [cached[seq_id]["output"] for seq_id in sequences if seq_id in cached and cached[seq_id]["output"] is not None]
+    with open(output, "w") as out:
+        if step in manifest["headers"]:
+            out.write(manifest["headers"][step] + "\n")
+        out.writelines(row + "\n" for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build manifest of build_incremental_LRRome.sh: only redo the steps whose inputs changed since the previous build.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help_text, *arguments):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--manifest", required=True, help="Manifest JSON file (created if missing)")
+        subparser.add_argument("--step", required=True, help="Step name (e.g. gff_cleaner, proteins, classification)")
+        subparser.add_argument("--params", default="", help="Step parameters: outputs are reused only if they were produced with the same parameters")
+        for argument in arguments:
+            subparser.add_argument(f"--{argument}", required=argument not in ("new_fasta", "new_table"))
+        return subparser
+
+    add_command("is_current", "Exit with status 0 if the recorded output of a per-file step is up to date", "input", "output")
+    add_command("record", "Record the output of a per-file step", "input", "output")
+    add_command("split_gff", "Write the gene models without cached output", "gff", "out_gff")
+    add_command("merge_fasta", "Merge new and cached sequences of the gene models", "gff", "new_fasta", "output")
+    add_command("split_fasta", "Write the sequences without cached output", "fasta", "out_fasta")
+    add_command("merge_table", "Merge new and cached table rows of the sequences", "fasta", "new_table", "output")
+
+    args = parser.parse_args()
+    manifest = load_manifest(args.manifest)
+
+    if args.command == "is_current":
+        sys.exit(0 if is_current(manifest, args.step, args.input, args.output, args.params) else 1)
+    elif args.command == "record":
+        record(manifest, args.step, args.input, args.output, args.params)
+    elif args.command == "split_gff":
+        print(split_gff(manifest, args.step, args.gff, args.params, args.out_gff))
+    elif args.command == "merge_fasta":
+        merge_fasta(manifest, args.step, args.gff, args.params, args.new_fasta, args.output)
+    elif args.command == "split_fasta":
+        print(split_fasta(manifest, args.step, args.fasta, args.params, args.out_fasta))
+    elif args.command == "merge_table":
+        merge_table(manifest, args.step, args.fasta, args.params, args.new_table, args.output)
+
+    if args.command in ("record", "merge_fasta", "merge_table"):
+        save_manifest(manifest, args.manifest)
+
+
+if __name__ == "__main__":
+    main()
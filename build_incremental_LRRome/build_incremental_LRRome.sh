@@ -16,12 +16,18 @@ set -euo pipefail
 # EXP_PREFIX: prefix for the expertised LRRome (eg: DWSvevo3January)
 # INIT_PREFIX: prefix for the initial LRRome (eg: IRGSP)
 # SEQ_TYPE: either 'FSprot' (will extract sequences with Extract_sequences_from_genome.py accounting for frameshifts) or 'prot' (will extract sequences with AGAT accounting for CDS phase)
+# BUILD_MANIFEST (optional): path to a build manifest (created if missing). When set, gff cleaning, protein extraction and LRRprofiler classification are only redone for the gff/gene models that changed since the previous build using this manifest
+# PROTEIN_CACHE_DIR (optional): directory of a protein cache shared between builds: the proteins of the gene models whose CDS, genome and SEQ_TYPE did not change are not extracted again. PROTEIN_CACHE_MAX_MB (optional) limits its size (least recently used proteins are evicted)
+# STAGE_JOBS (optional): maximum number of parallel jobs for gff cleaning (one job per gff) and protein extraction (one job per chromosome). Default: 1 (serial)
+# STAGE_EXECUTOR (optional): either 'local' (default, jobs run on the current node) or 'slurm' (jobs submitted as a SLURM job array, at most STAGE_JOBS at a time). STAGE_SLURM_PARTITION and STAGE_SLURM_MEM_MB (optional) set the partition and memory per CPU of the SLURM jobs
+# GFF_MERGE_MODE (optional): either 'concat' (default, concatAndRmRepeatGenes.py) or 'sorted_merge' (mergeSortedGffs.py: single k-way merge of the sorted cleaned gff, removing duplicated and overlapping genes from older gff)
 
 ## TO-DO
 # - Dealing with duplicated genes :
 #   Replace concatAndRmRepeatGenes.py with a simple cat (normally there should not be duplicated genes)
 #   Instead only check for duplicated/overlaping genes and print a warning (see check_gene_overlaps.py that does not rely on gene IDs to detect duplicates/overlaps)
 #   Write a separate script to remove duplicated genes if the issue arises
+#   >> mergeSortedGffs.py (GFF_MERGE_MODE=sorted_merge) merges the sorted gff and detects ID duplicates and coordinate overlaps in the same pass
 
 ## ----------------------------------- MAIN ------------------------------------------------ ##
 
@@ -45,8 +51,18 @@ main() {
     check_files_exist "$EXTRA_GFF_LIST"
   fi
   check_folders_exist "$GMT_DIR" "$INITIAL_LRROME"
+  if [[ -n "${PROTEIN_CACHE_DIR:-}" ]] ; then
+    PROTEIN_CACHE_DIR=$(realpath -m $PROTEIN_CACHE_DIR)
+  fi
+  if [[ -n "${BUILD_MANIFEST:-}" ]] ; then
+    BUILD_MANIFEST=$(realpath -m $BUILD_MANIFEST)
+    echo "Incremental build: reusing the outputs recorded in ${BUILD_MANIFEST}"
+  fi
 
   CONCAT_AND_RM_REPEAT_GENES=${SCRIPT_DIR}/concatAndRmRepeatGenes.py
+  if [[ "${GFF_MERGE_MODE:-concat}" == "sorted_merge" ]] ; then
+    CONCAT_AND_RM_REPEAT_GENES=${SCRIPT_DIR}/mergeSortedGffs.py
+  fi
 
 
   # building new LRRome
@@ -69,9 +85,7 @@ main() {
   concat_gff $INITIAL_LRR_GFF $exp_LRRome_gff ${final_gff_out_dir} ${INIT_PREFIX}_${EXP_PREFIX}_LRR.gff
   final_gff=${final_gff_out_dir}/${INIT_PREFIX}_${EXP_PREFIX}_LRR.gff
 
-  create_info_locus ${final_gff} ${final_gff_out_dir}/${INIT_PREFIX}_${EXP_PREFIX}_info_locus.txt
-
-  compute_gene_stats ${final_gff} ${final_gff_out_dir}/${INIT_PREFIX}_${EXP_PREFIX}_gene_stats.tsv
+  create_info_locus_and_gene_stats ${final_gff} ${final_gff_out_dir}/${INIT_PREFIX}_${EXP_PREFIX}_info_locus.txt ${final_gff_out_dir}/${INIT_PREFIX}_${EXP_PREFIX}_gene_stats.tsv
 
   write_infos $INITIAL_LRROME $GFF_LIST $INIT_PREFIX $EXP_PREFIX $exp_LRRome_out_dir $final_LRRome_out_dir $final_gff_out_dir ${extra_gene_list}
 }
@@ -3,59 +3,81 @@
 import argparse
 import os
 
-def check_gene_in_same_gff(gene_ID, gff_gene_list, gff_file):
-    if gene_ID in gff_gene_list:
+WRITE_BUFFER_SIZE = 1 << 20  # taille du buffer d'écriture du fichier de sortie (1 Mo)
+
+def check_gene_in_same_gff(gene_ID, gff_gene_set, gff_file):
+    if gene_ID in gff_gene_set:
         raise ValueError(f"Erreur : le gène {gene_ID} est présent plusieurs fois dans le fichier {gff_file}")
-    gff_gene_list.append(gene_ID)
+    gff_gene_set.add(gene_ID)
 
 
-def append_gff(gff_file, gene_list, out_file):
+def append_gff(gff_file, gene_set, out_file, skipped_genes):
     """
     Lit un gff ligne par ligne et les ajoute à out_file.
     Elle attend un gff avec les features dans le bon ordre (idéalement sorti de gff_cleaner).
-    A chaque nouveau gène elle rajoute le gene_ID à gene_list.
+    A chaque nouveau gène elle rajoute le gene_ID à gene_set.
     Si le gène est présent plusieurs fois dans le gff >> erreur.
-    Si le gène a déjà été vu dans un gff précédent elle n'écrit pas ses annotations dans out_file.
+    Si le gène a déjà été vu dans un gff précédent elle n'écrit pas ses annotations dans out_file et ajoute (gene_ID, gff_file) à skipped_genes.
         >> si on lui passe les gff du plus récent au plus ancien il supprime les doublons et ne garde que les versions les plus récentes dans out_file.
+    gene_set et le set des gènes du gff sont des set : chaque test d'appartenance est en temps constant.
     """
-    gff_gene_list=[]
+    gff_gene_set = set()
     with open(gff_file, "r") as gff:
        for line in gff:
             seqname, source, feature, start, end, score, strand, frame, attribute = line.split("\t")
             if (feature == "gene"):
-                gene_ID=attribute.split(";")[0].replace("ID=", "")
-                check_gene_in_same_gff(gene_ID, gff_gene_list, gff_file)
-                if gene_ID not in gene_list:
-                    gene_list.append(gene_ID)
+                gene_ID=attribute.rstrip("\n").split(";")[0].replace("ID=", "")
+                check_gene_in_same_gff(gene_ID, gff_gene_set, gff_file)
+                if gene_ID not in gene_set:
+                    gene_set.add(gene_ID)
                     out_file.write(line)
                     skip=False
                 else:
-                    print(f"INFO: Les annotations du gène {gene_ID} du fichier {gff_file} n'ont pas été conservées car elles étaient présentes dans un gff plus récent.\n")
+                    skipped_genes.append((gene_ID, gff_file))
                     skip=True
             elif (skip==False):
                 out_file.write(line)
 
 
+def report_skipped_genes(skipped_genes, skipped_output=None):
+    """
+    Affiche un résumé des gènes non conservés (présents dans un gff plus récent).
+    Si skipped_output est fourni, la liste des gènes (gene_ID et gff d'origine) y est écrite.
+    """
+    if not skipped_genes:
+        return
+    nb_files = len({gff_file for _, gff_file in skipped_genes})
+    print(f"INFO: Les annotations de {len(skipped_genes)} gène(s) issues de {nb_files} fichier(s) n'ont pas été conservées car elles étaient présentes dans un gff plus récent.")
+    if skipped_output:
+        with open(skipped_output, "w") as out:
+            out.writelines(f"{gene_ID}\t{gff_file}\n" for gene_ID, gff_file in skipped_genes)
+        print(f"INFO: Liste des gènes non conservés : {skipped_output}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Concatène une série de gff. Si le même gène apparaît plusieurs fois dans des gff différents c'est l'annotation issue du gff le plus récent qui conservée. A utiliser après gff_cleaner (les features doivent apparaître dans le bon ordre). Une erreur est levée si un même gff contient plusieurs fois le même gène.")
 
     parser.add_argument("--gff_list", help="Fichier listant les gff du plus récent au plus ancien. Soit les chemins complets (et laisser préfixe vide), soit juste les noms de fichiers et on peut passer un chemin +et/ou préfixe à '--prefix'. Si on passe juste un chemin il faut inclure le slash final.")
     parser.add_argument("--prefix", help="Préfixe des fichiers ggf. Ex : /home/user/02_build_exp_LRRome/CLEANED_GFF/cleaned_", default="")
     parser.add_argument("-o", "--output", help="Nom du fichier de sortie")
+    parser.add_argument("--skipped_output", help="Fichier (optionnel) listant les gènes non conservés car présents dans un gff plus récent (gene_ID et gff d'origine)", default=None)
 
     args = parser.parse_args()
     outfile_name=args.output
     gfflist_name=args.gff_list
     prefix=args.prefix
 
-    gene_list=[]
+    gene_set=set()
+    skipped_genes=[]
     with open(gfflist_name, "r") as gff_list:
-        with open(outfile_name, "w") as out_file:
+        with open(outfile_name, "w", buffering=WRITE_BUFFER_SIZE) as out_file:
             for gff_file in gff_list:
                 gff_file = gff_file.strip()
                 gff_file = os.path.realpath(prefix + gff_file)
-                append_gff(gff_file, gene_list, out_file)
+                append_gff(gff_file, gene_set, out_file, skipped_genes)
+
+    report_skipped_genes(skipped_genes, args.skipped_output)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,101 @@
+#python filterGffGenes.py --gff annot.gff --output filtered.gff [--keep_ids genes.list | --remove_ids genes.list] [--remove_families Non-LRR UC F-box] [--removed_ids_output removed.list]
+
+"""
+Filter the genes of a GFF in a single streaming pass, by gene ID (set lookup) and/or by LRR family.
+The decision taken for a gene (or any feature without Parent) is propagated to its children (mRNA, exon, CDS...) through their Parent attribute,
+so the parents must come before their children in the GFF (as in gff_cleaner outputs).
+The family of a gene is the value of its 'Fam=' attribute ('Non-LRR' if absent), as in the former awk/grep filter of remove_non_LRR_genes;
+top-level features other than genes are never removed by family.
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Set, TextIO
+
+
+def read_ids(id_list: str) -> Set[str]:
+    with open(id_list, "r") as ids:
+        return {line.strip() for line in ids if line.strip()}
+
+
+def get_attribute(attributes: str, key: str) -> Optional[str]:
+    for attribute in attributes.rstrip("\n").split(";"):
+        if attribute.startswith(key + "="):
+            return attribute[len(key) + 1:]
+    return None
+
+
+def get_family(attributes: str) -> str:
+    family = get_attribute(attributes, "Fam")
+    return "Non-LRR" if family is None else family
+
+
+def filter_gff(gff: TextIO, out: TextIO, keep_ids: Optional[Set[str]] = None, remove_ids: Optional[Set[str]] = None,
+               remove_families: Optional[Set[str]] = None) -> List[str]:
+    """
+    Write to out the lines of gff whose top-level feature is kept, i.e. its ID is in keep_ids (if given), not in remove_ids (if given)
+    and, for genes, its family is not in remove_families (if given). Returns the IDs of the removed top-level features, in the GFF order
+    (features without ID are removed silently).
+    Features whose parents were not seen before them are removed with a warning.
+    """
+    kept_features: Set[str] = set()
+    removed_features: Set[str] = set()
+    removed_ids: List[str] = []
+    nb_orphans = 0
+    for line in gff:
+        if line.startswith("#") or not line.strip():
+            out.write(line)
+            continue
+        fields = line.split("\t")
+        feature_id = get_attribute(fields[8], "ID")
+        parents = get_attribute(fields[8], "Parent")
+        if parents is None:
+            keep = (
+                (keep_ids is None or feature_id in keep_ids)
+                and (remove_ids is None or feature_id not in remove_ids)
+                and (remove_families is None or fields[2] != "gene" or get_family(fields[8]) not in remove_families)
+            )
+            if not keep and feature_id is not None:
+                removed_ids.append(feature_id)
+        else:
+            parent_ids = parents.split(",")
+            keep = any(parent_id in kept_features for parent_id in parent_ids)
+            if not keep and not any(parent_id in removed_features for parent_id in parent_ids):
+                nb_orphans += 1
+        if feature_id is not None:
+            (kept_features if keep else removed_features).add(feature_id)
+        if keep:
+            out.write(line)
+    if nb_orphans:
+        print(f"WARNING: {nb_orphans} feature(s) removed because their parent was not found before them.", file=sys.stderr)
+    return removed_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filter the genes of a GFF by ID and/or LRR family in a single pass, propagating the decision to their children (mRNA, exon, CDS) through Parent.")
+
+    parser.add_argument("-g", "--gff", required=True, help="Input GFF file (parents before children)")
+    parser.add_argument("-o", "--output", required=True, help="Output GFF file")
+    ids = parser.add_mutually_exclusive_group()
+    ids.add_argument("--keep_ids", default=None, help="File listing the IDs of the genes to keep (one per line)")
+    ids.add_argument("--remove_ids", default=None, help="File listing the IDs of the genes to remove (one per line)")
+    parser.add_argument("--remove_families", nargs="+", default=None, help="Remove the genes of these families (e.g. Non-LRR UC F-box; 'Non-LRR' = genes without Fam= attribute)")
+    parser.add_argument("--removed_ids_output", default=None, help="Output file listing the IDs of the removed genes (optional)")
+
+    args = parser.parse_args()
+
+    keep_ids = read_ids(args.keep_ids) if args.keep_ids else None
+    remove_ids = read_ids(args.remove_ids) if args.remove_ids else None
+    remove_families = set(args.remove_families) if args.remove_families else None
+
+    with open(args.gff, "r") as gff, open(args.output, "w", buffering=1 << 20) as out:
+        removed_ids = filter_gff(gff, out, keep_ids, remove_ids, remove_families)
+
+    print(f"INFO: {len(removed_ids)} gene(s) removed.", file=sys.stderr)
+    if args.removed_ids_output:
+        with open(args.removed_ids_output, "w") as out:
+            out.writelines(f"{removed_id}\n" for removed_id in removed_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#python gffGeneStats.py --gff final.gff --info_locus info_locus.txt --gene_stats gene_stats.tsv --genes_per_chr genes_per_chr.txt
+
+"""
+Gene statistics of LRR GFF files, computed in a single pass over each GFF (replaces the awk pipelines of lib_LRRome.sh and utils.sh).
+From the gene lines, it produces in the same pass:
+- the info locus rows (gene ID, family, class),
+- the number of genes per chromosome,
+- the number of genes per (species, chromosome, family, class) and per (chromosome, family).
+The family is read from the 'Fam=', 'Fam:' or 'family:' keys ('Non-LRR' if absent), the class from the 'Class=', 'Gene-Class:' or 'class:' keys
+('comment=' prefixes are ignored; if a key is present several times, the last value is kept). The species is the gene ID up to the first '_'.
+Several GFF files can be processed in parallel: their counts are summed and their info locus rows are written in the input order.
+"""
+
+import argparse
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+FIELD_SEPARATORS = re.compile(r"[ \t;]")
+FAM_KEYS = re.compile(r"^(Fam:|Fam=|family:)")
+CLASS_KEYS = re.compile(r"^(Class=|Gene-Class:|class:)")
+DEFAULT_FAM = "Non-LRR"
+
+
+class GeneStats:
+    """Info locus rows and gene counts of one or several GFF files."""
+
+    def __init__(self):
+        self.info_locus: List[Tuple[str, str, str]] = []
+        self.genes_per_chr: Counter = Counter()
+        self.gene_stats: Counter = Counter()
+        self.chr_fam_stats: Counter = Counter()
+
+    def add_gene(self, gene_id: str, chrom: str, fam: str, gene_class: str) -> None:
+        self.info_locus.append((gene_id, fam, gene_class))
+        self.genes_per_chr[chrom] += 1
+        self.gene_stats[(gene_id.split("_", 1)[0], chrom, fam, gene_class)] += 1
+        self.chr_fam_stats[(chrom, fam)] += 1
+
+    def update(self, other: "GeneStats") -> None:
+        self.info_locus.extend(other.info_locus)
+        self.genes_per_chr.update(other.genes_per_chr)
+        self.gene_stats.update(other.gene_stats)
+        self.chr_fam_stats.update(other.chr_fam_stats)
+
+
+def parse_gene_line(line: str) -> Tuple[str, str, str, str]:
+    """Return (gene ID, chromosome, family, class) of a GFF gene line."""
+    gene_id, fam, gene_class = "", DEFAULT_FAM, ""
+    fields = FIELD_SEPARATORS.split(line.rstrip("\n").replace("comment=", " "))
+    for field in fields:
+        if field.startswith("ID="):
+            gene_id = field[3:]
+        elif FAM_KEYS.match(field):
+            fam = FAM_KEYS.sub("", field, count=1)
+        elif CLASS_KEYS.match(field):
+            gene_class = CLASS_KEYS.sub("", field, count=1)
+    return gene_id, fields[0], fam, gene_class
+
+
+def read_gene_stats(gff_path: str) -> GeneStats:
+    stats = GeneStats()
+    with open(gff_path, "r") as gff:
+        for line in gff:
+            if line.startswith("#"):
+                continue
+            fields = line.split("\t", 3)
+            if len(fields) > 2 and fields[2] == "gene":
+                stats.add_gene(*parse_gene_line(line))
+    return stats
+
+
+def compute_gene_stats(gff_paths: List[str], threads: int = 1) -> GeneStats:
+    stats = GeneStats()
+    if threads > 1 and len(gff_paths) > 1:
+        with ProcessPoolExecutor(max_workers=threads) as pool:
+            for gff_stats in pool.map(read_gene_stats, gff_paths):
+                stats.update(gff_stats)
+    else:
+        for gff_path in gff_paths:
+            stats.update(read_gene_stats(gff_path))
+    return stats
+
+
+def write_rows(rows, output: str) -> None:
+    with open(output, "w") as out:
+        out.writelines("\t".join(str(value) for value in row) + "\n" for row in rows)
+
+
+def write_outputs(stats: GeneStats, info_locus: Optional[str] = None, gene_class: Optional[str] = None, fake_info_locus: Optional[str] = None,
+                  genes_per_chr: Optional[str] = None, gene_stats: Optional[str] = None, chr_fam_stats: Optional[str] = None) -> None:
+    if info_locus:
+        write_rows(stats.info_locus, info_locus)
+    if gene_class:
+        write_rows(((gene_id, cls) for gene_id, _, cls in stats.info_locus), gene_class)
+    if fake_info_locus:
+        write_rows(((gene_id, "UC", "Canonical") for gene_id, _, _ in stats.info_locus), fake_info_locus)
+    if genes_per_chr:
+        # Same layout as 'sort | uniq -c'
+        with open(genes_per_chr, "w") as out:
+            out.writelines(f"{count:7d} {chrom}\n" for chrom, count in sorted(stats.genes_per_chr.items()))
+    if gene_stats:
+        write_rows((key + (count,) for key, count in sorted(stats.gene_stats.items())), gene_stats)
+    if chr_fam_stats:
+        write_rows((key + (count,) for key, count in sorted(stats.chr_fam_stats.items())), chr_fam_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute the info locus file and the gene stats of LRR GFF files in a single pass over each GFF.")
+
+    parser.add_argument("--gff", nargs="+", required=True, help="GFF file(s). Counts of several GFF files are summed and their info locus rows are concatenated in the given order.")
+    parser.add_argument("--threads", type=int, default=1, help="Number of GFF files processed in parallel (default: 1)")
+    parser.add_argument("--info_locus", default=None, help="Output info locus file: gene ID, family, class")
+    parser.add_argument("--gene_class", default=None, help="Output file: gene ID, class")
+    parser.add_argument("--fake_info_locus", default=None, help="Output info locus file with all the genes set to UC/Canonical")
+    parser.add_argument("--genes_per_chr", default=None, help="Output file: number of genes per chromosome ('uniq -c' layout)")
+    parser.add_argument("--gene_stats", default=None, help="Output file: species, chromosome, family, class, number of genes")
+    parser.add_argument("--chr_fam_stats", default=None, help="Output file: chromosome, family, number of genes")
+
+    args = parser.parse_args()
+
+    stats = compute_gene_stats(args.gff, args.threads)
+    write_outputs(stats, args.info_locus, args.gene_class, args.fake_info_locus, args.genes_per_chr, args.gene_stats, args.chr_fam_stats)
+
+
+if __name__ == "__main__":
+    main()
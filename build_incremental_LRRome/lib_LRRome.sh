@@ -12,6 +12,14 @@ if ! command -v agat &>/dev/null; then
   module load AGAT/1.2.0-singularity
 fi
 
+LIB_LRROME_DIR="$(realpath "$(dirname "${BASH_SOURCE[0]}")")"
+LRROME_MANIFEST=${LIB_LRROME_DIR}/LRRome_manifest.py
+RUN_STAGE_JOBS=${LIB_LRROME_DIR}/runStageJobs.py
+GFF_GENE_STATS=${LIB_LRROME_DIR}/gffGeneStats.py
+MERGE_LRROMES=${LIB_LRROME_DIR}/mergeLRRomes.py
+FILTER_GFF_GENES=${LIB_LRROME_DIR}/filterGffGenes.py
+PROTEIN_CACHE=${LIB_LRROME_DIR}/proteinCache.py
+
 ## ------------------------------- FUNCTIONS --------------------------------------------- ##
 
 check_variables_exist() {
@@ -71,6 +79,26 @@ get_gene_ids_from_gff_list(){
   done
 }
 
+stage_is_parallel() {
+  [[ ${STAGE_JOBS:-1} -gt 1 || "${STAGE_EXECUTOR:-local}" == "slurm" ]]
+}
+
+run_stage_jobs() {
+  local jobs_file=$1
+  local log_dir=$2
+  local stitch_output="${3:-}"
+  local merged_log="${4:-}"
+
+  local options="--max_jobs ${STAGE_JOBS:-1} --executor ${STAGE_EXECUTOR:-local}"
+  if [[ -n "${STAGE_SLURM_PARTITION:-}" ]] ; then options="${options} --partition ${STAGE_SLURM_PARTITION}" ; fi
+  if [[ -n "${STAGE_SLURM_MEM_MB:-}" ]] ; then options="${options} --mem_mb ${STAGE_SLURM_MEM_MB}" ; fi
+  if [[ -n "${stitch_output}" ]] ; then options="${options} --stitch_output ${stitch_output}" ; fi
+  if [[ -n "${merged_log}" ]] ; then options="${options} --merged_log ${merged_log}" ; fi
+
+  echo -e python3 ${RUN_STAGE_JOBS} run --jobs ${jobs_file} --log_dir ${log_dir} ${options}"\n"
+  python3 ${RUN_STAGE_JOBS} run --jobs ${jobs_file} --log_dir ${log_dir} ${options}
+}
+
 clean_gff() {
   local gff_list=$1
   local cleaner_chr_prefix=$2
@@ -94,14 +122,36 @@ clean_gff() {
 
   ## Clean the gff files with gff_cleaner
   echo -e "... Running gff_cleaner.py...\n"
-  rm -f ${out_dir}/clean_gff.list
+  local cleaner_jobs=${out_dir}/gff_cleaner_jobs.tsv
+  rm -f ${out_dir}/clean_gff.list ${cleaner_jobs}
   for init_gff in $(cat ${gff_list}); do
     gff_name=$(basename $init_gff)
     gff=${out_dir}/GFF_chrOK/${gff_name}
-    echo -e python3 ${GMT_dir}/SCRIPT/VR/gff_cleaner.py -a -p $cleaner_chr_prefix -g $gff -o ${out_dir}/cleaned_${gff_name}"\n"
-    python3 ${GMT_dir}/SCRIPT/VR/gff_cleaner.py -a -p $cleaner_chr_prefix -g $gff -o ${out_dir}/cleaned_${gff_name}
-    echo $(realpath ${out_dir}/cleaned_${gff_name}) >>${out_dir}/clean_gff.list
-  done | grep -v "^WARNING: incompatible bounds" >${out_dir}/gff_cleaner.out
+    if [[ -n "${BUILD_MANIFEST:-}" ]] && python3 ${LRROME_MANIFEST} is_current --manifest ${BUILD_MANIFEST} --step gff_cleaner --params "${cleaner_chr_prefix}" --input $gff --output ${out_dir}/cleaned_${gff_name}; then
+      echo -e "${gff_name} unchanged since the previous build: keeping ${out_dir}/cleaned_${gff_name}\n"
+    elif stage_is_parallel; then
+      echo -e "${gff_name}\t$(realpath -m ${out_dir}/cleaned_${gff_name})\tpython3 ${GMT_dir}/SCRIPT/VR/gff_cleaner.py -a -p $cleaner_chr_prefix -g $(realpath $gff) -o $(realpath -m ${out_dir}/cleaned_${gff_name})" >>${cleaner_jobs}
+    else
+      echo -e python3 ${GMT_dir}/SCRIPT/VR/gff_cleaner.py -a -p $cleaner_chr_prefix -g $gff -o ${out_dir}/cleaned_${gff_name}"\n"
+      python3 ${GMT_dir}/SCRIPT/VR/gff_cleaner.py -a -p $cleaner_chr_prefix -g $gff -o ${out_dir}/cleaned_${gff_name}
+      if [[ -n "${BUILD_MANIFEST:-}" ]]; then
+        python3 ${LRROME_MANIFEST} record --manifest ${BUILD_MANIFEST} --step gff_cleaner --params "${cleaner_chr_prefix}" --input $gff --output ${out_dir}/cleaned_${gff_name}
+      fi
+    fi
+    echo $(realpath -m ${out_dir}/cleaned_${gff_name}) >>${out_dir}/clean_gff.list
+  done | { grep -v "^WARNING: incompatible bounds" || true; } >${out_dir}/gff_cleaner.out
+
+  ## Run the gff_cleaner jobs in parallel if required (one job per gff, logs in GFF_CLEANER_LOGS and appended to gff_cleaner.out)
+  if [[ -s ${cleaner_jobs} ]]; then
+    run_stage_jobs ${cleaner_jobs} ${out_dir}/GFF_CLEANER_LOGS "" ${out_dir}/gff_cleaner_jobs.out
+    grep -v "^WARNING: incompatible bounds" ${out_dir}/gff_cleaner_jobs.out >>${out_dir}/gff_cleaner.out || true
+    rm ${out_dir}/gff_cleaner_jobs.out
+    if [[ -n "${BUILD_MANIFEST:-}" ]]; then
+      cut -f1 ${cleaner_jobs} | while read gff_name; do
+        python3 ${LRROME_MANIFEST} record --manifest ${BUILD_MANIFEST} --step gff_cleaner --params "${cleaner_chr_prefix}" --input ${out_dir}/GFF_chrOK/${gff_name} --output ${out_dir}/cleaned_${gff_name}
+      done
+    fi
+  fi
 
   ## Count the genes in the gff files
   echo -e "... Counting genes in each gff in ${out_dir}/gff_gene_count.txt...\n"
@@ -131,7 +181,7 @@ clean_gff_for_LRRprofiler(){
 count_genes_per_chr() {
   local gff=$1
   local out_file=$2
-  awk '{if ($3 == "gene"){print $1}}' $gff | sort | uniq -c >$out_file
+  python3 ${GFF_GENE_STATS} --gff $gff --genes_per_chr $out_file
 }
 
 extract_prot_sequences(){
@@ -156,6 +206,86 @@ extract_prot_sequences(){
     fi
   }
 
+extract_prot_sequences_per_chr(){
+  local input_gff=$1
+  local input_fasta=$(realpath $2)
+  local seq_type=$3
+  local GMT_sif=$(realpath $4)
+  local GMT_dir=$(realpath $5)
+  local prot_sequences_output=$6
+
+  local chunk_dir=$(realpath -m ${prot_sequences_output%.fasta}_per_chr)
+  local extraction_jobs=${chunk_dir}/extraction_jobs.tsv
+  rm -rf ${chunk_dir} && mkdir -p ${chunk_dir}/GFF
+
+  echo -e "... Extracting protein sequences per chromosome (logs in ${chunk_dir}/LOGS)...\n"
+  python3 ${RUN_STAGE_JOBS} split_gff --gff ${input_gff} --out_dir ${chunk_dir}/GFF | while IFS=$'\t' read chr chr_gff; do
+    local chr_name=$(basename ${chr_gff} .gff)
+    echo -e "${chr_name}\t${chunk_dir}/${chr_name}_proteins.fasta\tsource ${LIB_LRROME_DIR}/lib_LRRome.sh && extract_prot_sequences ${chr_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${chunk_dir}/${chr_name}_proteins.fasta"
+  done >${extraction_jobs}
+
+  run_stage_jobs ${extraction_jobs} ${chunk_dir}/LOGS ${prot_sequences_output}
+}
+
+run_prot_extraction(){
+  if stage_is_parallel; then
+    extract_prot_sequences_per_chr "$@"
+  else
+    extract_prot_sequences "$@"
+  fi
+}
+
+extract_prot_sequences_cached(){
+  local input_gff=$1
+  local input_fasta=$2
+  local seq_type=$3
+  local GMT_sif=$4
+  local GMT_dir=$5
+  local prot_sequences_output=$6
+
+  local cache_options="--cache_dir ${PROTEIN_CACHE_DIR} --gff ${input_gff} --genome ${input_fasta} --seq_type ${seq_type}"
+  local not_cached_gff=${prot_sequences_output%.fasta}_not_cached.gff
+  local not_cached_prot_sequences=${prot_sequences_output%.fasta}_not_cached.fasta
+
+  local nb_not_cached=$(python3 ${PROTEIN_CACHE} split ${cache_options} --out_gff ${not_cached_gff})
+  echo -e "... ${nb_not_cached} gene model(s) not found in the protein cache ${PROTEIN_CACHE_DIR}\n"
+  rm -f ${not_cached_prot_sequences}
+  if [[ ${nb_not_cached} -gt 0 ]]; then
+    run_prot_extraction ${not_cached_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${not_cached_prot_sequences}
+  fi
+  python3 ${PROTEIN_CACHE} merge ${cache_options} --new_fasta ${not_cached_prot_sequences} --output ${prot_sequences_output} ${PROTEIN_CACHE_MAX_MB:+--max_size_mb ${PROTEIN_CACHE_MAX_MB}}
+}
+
+extract_all_prot_sequences(){
+  if [[ -n "${PROTEIN_CACHE_DIR:-}" ]]; then
+    extract_prot_sequences_cached "$@"
+  else
+    run_prot_extraction "$@"
+  fi
+}
+
+extract_prot_sequences_with_manifest(){
+  local input_gff=$1
+  local input_fasta=$2
+  local seq_type=$3
+  local GMT_sif=$4
+  local GMT_dir=$5
+  local prot_sequences_output=$6
+
+  # the genome is identified by its path, size and modification time (hashing whole genomes at each build would be too slow)
+  local params="${seq_type} $(realpath ${input_fasta}) $(stat -c %s-%Y ${input_fasta})"
+  local new_genes_gff=${prot_sequences_output%.fasta}_new_genes.gff
+  local new_prot_sequences=${prot_sequences_output%.fasta}_new_genes.fasta
+
+  local nb_new_genes=$(python3 ${LRROME_MANIFEST} split_gff --manifest ${BUILD_MANIFEST} --step proteins --params "${params}" --gff ${input_gff} --out_gff ${new_genes_gff})
+  echo -e "... ${nb_new_genes} gene model(s) new or changed since the previous build: extracting their proteins only\n"
+  rm -f ${new_prot_sequences}
+  if [[ ${nb_new_genes} -gt 0 ]]; then
+    extract_all_prot_sequences ${new_genes_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${new_prot_sequences}
+  fi
+  python3 ${LRROME_MANIFEST} merge_fasta --manifest ${BUILD_MANIFEST} --step proteins --params "${params}" --gff ${input_gff} --new_fasta ${new_prot_sequences} --output ${prot_sequences_output}
+}
+
 run_LRRprofiler(){
   local input_prot_sequences=$(realpath $1)
   local LRRprofiler_sif=$(realpath $2)
@@ -168,6 +298,25 @@ run_LRRprofiler(){
   cd - > /dev/null
 }
 
+run_LRRprofiler_with_manifest(){
+  local input_prot_sequences=$(realpath $1)
+  local LRRprofiler_sif=$(realpath $2)
+  local out_name=$3
+  local out_dir=$4
+
+  local new_prot_sequences=${out_dir}/${out_name}_new_proteins.fasta
+  local classification=Res_step3/LRR_classification.csv
+  local nb_new_prot=$(python3 ${LRROME_MANIFEST} split_fasta --manifest ${BUILD_MANIFEST} --step classification --params "${LRRprofiler_sif}" --fasta ${input_prot_sequences} --out_fasta ${new_prot_sequences})
+  echo -e "... ${nb_new_prot} protein(s) new or changed since the previous build: running LRRprofiler on them only\n"
+
+  rm -rf ${out_dir}/Res_${out_name}_new
+  if [[ ${nb_new_prot} -gt 0 ]]; then
+    run_LRRprofiler ${new_prot_sequences} ${LRRprofiler_sif} ${out_name}_new ${out_dir}
+  fi
+  mkdir -p ${out_dir}/Res_${out_name}/Res_step3
+  python3 ${LRROME_MANIFEST} merge_table --manifest ${BUILD_MANIFEST} --step classification --params "${LRRprofiler_sif}" --fasta ${input_prot_sequences} --new_table ${out_dir}/Res_${out_name}_new/${classification} --output ${out_dir}/Res_${out_name}/${classification}
+}
+
 remove_non_LRR_genes(){
   local init_gff=$1
   local LRRprofiler_res_dir=$2
@@ -186,16 +335,14 @@ remove_non_LRR_genes(){
   if [[ -n "${extra_genes_to_rm_list}" ]] ; then
     local LRR_info_with_extra_genes_gff=${LRR_info_out_dir}/${out_gff_prefix}_with_extra_genes_LRR_info.gff
     mv ${LRR_info_gff} ${LRR_info_with_extra_genes_gff}
-    echo "remove_genes_from_gff ${LRR_info_with_extra_genes_gff} $extra_genes_to_rm_list ${LRR_info_gff}"
-    remove_genes_from_gff ${LRR_info_with_extra_genes_gff} $extra_genes_to_rm_list ${LRR_info_gff}
+    echo "python3 ${FILTER_GFF_GENES} -g ${LRR_info_with_extra_genes_gff} --remove_ids $extra_genes_to_rm_list -o ${LRR_info_gff}"
+    python3 ${FILTER_GFF_GENES} -g ${LRR_info_with_extra_genes_gff} --remove_ids $extra_genes_to_rm_list -o ${LRR_info_gff}
   fi
 
-  local non_LRR_list=${LRR_info_out_dir}/not_LRR_genes.list 
-  awk '{if ($3 == "gene"){print $0}}' ${LRR_info_gff} | grep -v "Fam=" | cut -f2 -d"=" | cut -f1 -d";" > ${non_LRR_list} || true
-  awk '{if ($3 == "gene"){print $0}}' ${LRR_info_gff} | grep -E "Fam=UC|Fam=F-box" | cut -f2 -d"=" | cut -f1 -d";" >> ${non_LRR_list} || true
-
-  echo -e remove_genes_from_gff ${LRR_info_gff} ${non_LRR_list} ${LRR_gff_out_dir}/${out_gff_prefix}_LRR.gff"\n"
-  remove_genes_from_gff ${LRR_info_gff} ${non_LRR_list} ${LRR_gff_out_dir}/${out_gff_prefix}_LRR.gff
+  # non-LRR genes: genes without family or classified as UC/F-box
+  local non_LRR_list=${LRR_info_out_dir}/not_LRR_genes.list
+  echo -e python3 ${FILTER_GFF_GENES} -g ${LRR_info_gff} --remove_families Non-LRR UC F-box --removed_ids_output ${non_LRR_list} -o ${LRR_gff_out_dir}/${out_gff_prefix}_LRR.gff"\n"
+  python3 ${FILTER_GFF_GENES} -g ${LRR_info_gff} --remove_families Non-LRR UC F-box --removed_ids_output ${non_LRR_list} -o ${LRR_gff_out_dir}/${out_gff_prefix}_LRR.gff
 }
 
 detect_and_rm_non_LRR_genes(){
@@ -218,9 +365,13 @@ detect_and_rm_non_LRR_genes(){
     local prot_sequences=${LRRprofiler_out_dir}/${new_prefix}_proteins.fasta
   fi
   
-  extract_prot_sequences ${input_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${prot_sequences}
-
-  run_LRRprofiler ${prot_sequences} ${LRRprofiler_sif} ${new_prefix}_LRRprofiler_output ${LRRprofiler_out_dir}
+  if [[ -n "${BUILD_MANIFEST:-}" ]]; then
+    extract_prot_sequences_with_manifest ${input_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${prot_sequences}
+    run_LRRprofiler_with_manifest ${prot_sequences} ${LRRprofiler_sif} ${new_prefix}_LRRprofiler_output ${LRRprofiler_out_dir}
+  else
+    extract_all_prot_sequences ${input_gff} ${input_fasta} ${seq_type} ${GMT_sif} ${GMT_dir} ${prot_sequences}
+    run_LRRprofiler ${prot_sequences} ${LRRprofiler_sif} ${new_prefix}_LRRprofiler_output ${LRRprofiler_out_dir}
+  fi
 
   remove_non_LRR_genes ${input_gff} ${LRRprofiler_out_dir}/Res_${new_prefix}_LRRprofiler_output ${GMT_dir} ${new_prefix} ${LRRprofiler_out_dir} ${LRR_gff_out_dir} ${extra_genes_to_rm_list}
 }
@@ -231,8 +382,12 @@ compute_stats_before_after_removing_non_LRR(){
   local out_dir=$3
 
   echo -e "... Counting genes before and after removing non-LRR genes >> see ${out_dir}/genes_per_chr_[before/after]RemovingNonLRR.txt ...\n"
-  count_genes_per_chr ${gff_before} ${out_dir}/genes_per_chr_beforeRemovingNonLRR.txt
-  count_genes_per_chr ${gff_after} ${out_dir}/genes_per_chr_afterRemovingNonLRR.txt
+  count_genes_per_chr ${gff_before} ${out_dir}/genes_per_chr_beforeRemovingNonLRR.txt &
+  local before_pid=$!
+  count_genes_per_chr ${gff_after} ${out_dir}/genes_per_chr_afterRemovingNonLRR.txt &
+  local after_pid=$!
+  wait ${before_pid}
+  wait ${after_pid}
 }
 
 run_create_LRRome(){
@@ -293,7 +448,7 @@ build_exp_LRRome_multiGFF() {
   else
     local concat_gff=${LRRprofiler_out_dir}/${new_prefix}.gff
   fi
-  python3 $concatAndRmRepeatGenes --gff_list $gff_list --output ${concat_gff}
+  python3 $concatAndRmRepeatGenes --gff_list $gff_list --output ${concat_gff} --skipped_output ${LRRprofiler_out_dir}/genes_in_more_recent_gff.list
 
   build_exp_LRRome $new_prefix $input_fasta ${concat_gff} ${GMT_sif} ${seq_type} ${LRRprofiler_sif} ${GMT_dir} ${out_dir} ${extra_gene_list}
 }
@@ -302,22 +457,13 @@ merge_LRRome() {
   echo -e "\n3/ MERGING EXPERTISED AND INITIAL LRROMES...\n"
   local LRRome1=$(realpath $1)
   local LRRome2=$(realpath $2)
-  local LRRome_new=$(realpath $3)
-
-  mkdir -p ${LRRome_new}/REF_EXONS ${LRRome_new}/REF_PEP ${LRRome_new}/REF_cDNA
+  local LRRome_new=$(realpath -m $3)
 
-  local type
-  for type in EXONS PEP cDNA; do
-    cp ${LRRome1}/REF_${type}/* ${LRRome_new}/REF_${type}/
-    cp ${LRRome2}/REF_${type}/* ${LRRome_new}/REF_${type}/
-  done
+  # per-gene files are hardlinked, sequences of LRRome2 (the most recent) win ID collisions, merged REF_*.fasta are indexed (.fai)
+  echo -e python3 ${MERGE_LRROMES} --old_LRRome ${LRRome1} --new_LRRome ${LRRome2} --output ${LRRome_new} --collisions_output ${LRRome_new}_ID_collisions.tsv"\n"
+  python3 ${MERGE_LRROMES} --old_LRRome ${LRRome1} --new_LRRome ${LRRome2} --output ${LRRome_new} --collisions_output ${LRRome_new}_ID_collisions.tsv
 
-  for type in exons proteins cDNA; do
-    cp ${LRRome1}/REF_${type}.fasta ${LRRome_new}/ && chmod u+w ${LRRome_new}/REF_${type}.fasta
-    cat ${LRRome2}/REF_${type}.fasta >>${LRRome_new}/REF_${type}.fasta
-  done
-
-  echo -e "The new LRRome was built in: "$(realpath ${LRRome_new})"\n"
+  echo -e "The new LRRome was built in: "${LRRome_new}"\n"
 }
 
 concat_gff() {
@@ -340,67 +486,31 @@ create_info_locus() {
   local gff=$1
   local output=$2
 
-  awk -F '[ \t;]' 'BEGIN{OFS="\t"}{if ($3 == "gene"){
-    for (i = 1; i <= NF; i++) {
-      if ($i ~ /^ID=/) {
-        Gene_ID=gensub("ID=", "", "g", $i)
-      }
-      if ($i ~ /^Fam=/) {
-        Fam=gensub("Fam=", "", "g", $i)
-      }
-      if ($i ~ /^Class=/) {
-        Class=gensub("Class=", "", "g", $i)
-      }
-      if ($i ~ /^Gene-Class:/) {
-        Class=gensub("Gene-Class:", "", "g", $i)
-      }
-    }
-    print Gene_ID, Fam, Class
-  }}' $gff >$output
+  python3 ${GFF_GENE_STATS} --gff $gff --info_locus $output
+}
 
+create_info_locus_and_gene_stats() {
+  echo -e "\n5/ CREATING THE INFO LOCUS FILE AND COMPUTING THE FINAL GFF GENE STATS...\n"
+  local gff=$1
+  local info_locus_output=$2
+  local stats_file=$3
+
+  python3 ${GFF_GENE_STATS} --gff $gff --info_locus ${info_locus_output} --gene_stats ${stats_file}
 }
 
 compute_gene_stats() {
   echo -e "\n6/ COMPUTING THE FINAL GFF GENE STATS...\n"
   local gff=$1
   local stats_file=$2
-  awk -F '[ \t;]|comment=' 'BEGIN{
-    OFS="\t"
-    fam_keys = "^(Fam:|Fam=|family:)"
-    class_keys = "^(Class=|Gene-Class:|class:)"
-  }
-  {if ($3 == "gene"){
-    Fam="Non-LRR"
-    Chr=$1
-    for (i = 1; i <= NF; i++) {
-      if ($i ~ /^ID=/) {
-        Sp=gensub("ID=", "", "g", $i)
-        Sp=gensub(/_.*/, "", "g", Sp)
-      }
-      if (match($i, fam_keys)) {
-        Fam = gensub(fam_keys, "", 1, $i)
-      }
-      if (match($i, class_keys)) {
-        Class = gensub(class_keys, "", 1, $i)
-      }
-    }
-    print Sp, Chr, Fam, Class
-  }}' $gff | sort | uniq -c | awk 'BEGIN{OFS="\t"}{print $2, $3, $4, $5, $1}' >$stats_file
+
+  python3 ${GFF_GENE_STATS} --gff $gff --gene_stats $stats_file
 }
 
 compute_gene_stats_generic_gff() {
   local gff=$1
   local stats_file=$2
-  awk -F '[ \t;]' 'BEGIN{OFS="\t"}{if ($3 == "gene"){
-    Fam="Non-LRR"
-    Chr=$1
-    for (i = 1; i <= NF; i++) {
-      if ($i ~ /^Fam=/) {
-        Fam=gensub("Fam=", "", "g", $i)
-      }
-    }
-    print Chr, Fam
-  }}' $gff | sort | uniq -c | awk 'BEGIN{OFS="\t"}{print $2, $3, $1}' >$stats_file
+
+  python3 ${GFF_GENE_STATS} --gff $gff --chr_fam_stats $stats_file
 }
 
 write_infos() {
@@ -428,6 +538,7 @@ write_infos() {
   echo "- List of removed non-LRR genes: ${LRRprofiler_dir}/not_LRR_genes.list" >>LRRome_incremental_build_infos.txt
   echo "- Exp LRRome: ${exp_LRRome_dir}" >>LRRome_incremental_build_infos.txt
   echo "- New final LRRome: ${LRRome_dir}" >>LRRome_incremental_build_infos.txt
+  echo "- Sequence ID collisions between the initial and exp LRRomes (exp sequences kept): ${LRRome_dir%/}_ID_collisions.tsv" >>LRRome_incremental_build_infos.txt
   echo "- New final gff file: ${final_gff_dir}/${init_prefix}_${exp_prefix}_LRR.gff" >>LRRome_incremental_build_infos.txt
   echo "- Associated locus info file: ${final_gff_dir}/${init_prefix}_${exp_prefix}_info_locus.txt" >>LRRome_incremental_build_infos.txt
 
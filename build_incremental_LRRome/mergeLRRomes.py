@@ -0,0 +1,161 @@
+#python mergeLRRomes.py --old_LRRome initial_LRRome --new_LRRome exp_LRRome --output merged_LRRome [--collisions_output collisions.tsv]
+
+"""
+Merge two LRRomes (as built by GMT create_LRRome.sh) in a single streaming pass over each of them.
+- Per-gene files (REF_EXONS, REF_PEP, REF_cDNA) are hardlinked in the merged LRRome instead of being copied
+  (copied only if hardlinks are not possible, e.g. across file systems, or with --copy).
+- REF_exons.fasta, REF_proteins.fasta and REF_cDNA.fasta are merged record by record: when a sequence ID (or a per-gene file)
+  is present in both LRRomes, only the one from the new LRRome is kept and the collision is reported.
+- A .fai index (samtools faidx format) is written next to each merged FASTA.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from typing import BinaryIO, Iterator, List, Set, Tuple
+
+PER_GENE_DIRS = ["REF_EXONS", "REF_PEP", "REF_cDNA"]
+FASTA_FILES = ["REF_exons.fasta", "REF_proteins.fasta", "REF_cDNA.fasta"]
+COLLISION_COLUMNS = ["file", "name", "kept_from", "removed_from"]
+
+
+def link_or_copy(source: str, destination: str, copy: bool = False) -> bool:
+    """Hardlink source to destination (copy it if hardlinking fails or copy is True). Returns True if the file was linked."""
+    if os.path.lexists(destination):
+        os.remove(destination)
+    if not copy:
+        try:
+            os.link(source, destination)
+            return True
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
+    return False
+
+
+def merge_per_gene_files(old_dir: str, new_dir: str, out_dir: str, collisions: List[Tuple[str, str, str, str]], copy: bool = False) -> int:
+    """Link the files of new_dir and those of old_dir not present in new_dir into out_dir. Returns the number of copied (not linked) files."""
+    os.makedirs(out_dir, exist_ok=True)
+    nb_copied = 0
+    new_files = set(os.listdir(new_dir)) if os.path.isdir(new_dir) else set()
+    for name in sorted(new_files):
+        nb_copied += not link_or_copy(os.path.join(new_dir, name), os.path.join(out_dir, name), copy)
+    if os.path.isdir(old_dir):
+        for name in sorted(os.listdir(old_dir)):
+            if name in new_files:
+                collisions.append((os.path.basename(out_dir), name, new_dir, old_dir))
+            else:
+                nb_copied += not link_or_copy(os.path.join(old_dir, name), os.path.join(out_dir, name), copy)
+    return nb_copied
+
+
+def read_fasta_records(fasta: BinaryIO) -> Iterator[Tuple[str, bytes, List[bytes]]]:
+    """Yield (ID, header line, sequence lines) for each record of a FASTA opened in binary mode."""
+    header, lines = None, []
+    for line in fasta:
+        if line.startswith(b">"):
+            if header is not None:
+                yield record_id(header), header, lines
+            header, lines = line, []
+        elif header is not None and line.strip():
+            lines.append(line)
+    if header is not None:
+        yield record_id(header), header, lines
+
+
+def record_id(header: bytes) -> str:
+    fields = header[1:].split()
+    return fields[0].decode() if fields else ""
+
+
+def read_fasta_ids(fasta_path: str) -> Set[str]:
+    with open(fasta_path, "rb") as fasta:
+        return {record_id(line) for line in fasta if line.startswith(b">")}
+
+
+def write_fasta_record(out: BinaryIO, header: bytes, lines: List[bytes], offset: int) -> Tuple[bytes, int]:
+    """
+    Write a FASTA record at the given offset of out. Returns its .fai line and the offset after it.
+    Records whose lines do not all have the same length (but the last one) are rewrapped, as required by the .fai format.
+    """
+    sequences = [line.rstrip(b"\r\n") for line in lines]
+    line_bases = len(sequences[0]) if sequences else 0
+    if any(len(sequence) != line_bases for sequence in sequences[:-1]) or (sequences and len(sequences[-1]) > line_bases):
+        sequence = b"".join(sequences)
+        lines = [sequence[i:i + line_bases] + b"\n" for i in range(0, len(sequence), line_bases)]
+        sequences = [line[:-1] for line in lines]
+    if not header.endswith(b"\n"):
+        header += b"\n"
+    out.write(header)
+    out.writelines(lines)
+    length = sum(len(sequence) for sequence in sequences)
+    line_width = len(lines[0]) if lines else 0
+    sequence_offset = offset + len(header)
+    fai_line = b"%s\t%d\t%d\t%d\t%d\n" % (record_id(header).encode(), length, sequence_offset, line_bases, line_width)
+    return fai_line, sequence_offset + sum(len(line) for line in lines)
+
+
+def merge_fastas(old_fasta: str, new_fasta: str, out_fasta: str, collisions: List[Tuple[str, str, str, str]]) -> int:
+    """
+    Write the records of old_fasta whose ID is not in new_fasta, then those of new_fasta, to out_fasta and index it (out_fasta.fai).
+    Returns the number of written records.
+    """
+    new_ids = read_fasta_ids(new_fasta) if os.path.exists(new_fasta) else set()
+    written_ids: Set[str] = set()
+    fai_lines = []
+    offset = 0
+    with open(out_fasta, "wb", buffering=1 << 20) as out:
+        for fasta_path, is_new in ((old_fasta, False), (new_fasta, True)):
+            if not os.path.exists(fasta_path):
+                continue
+            with open(fasta_path, "rb") as fasta:
+                for seq_id, header, lines in read_fasta_records(fasta):
+                    if seq_id in written_ids or (not is_new and seq_id in new_ids):
+                        kept_from = new_fasta if is_new or seq_id in new_ids else old_fasta
+                        collisions.append((os.path.basename(out_fasta), seq_id, kept_from, fasta_path))
+                        continue
+                    written_ids.add(seq_id)
+                    fai_line, offset = write_fasta_record(out, header, lines, offset)
+                    fai_lines.append(fai_line)
+    with open(f"{out_fasta}.fai", "wb") as fai:
+        fai.writelines(fai_lines)
+    return len(fai_lines)
+
+
+def merge_LRRomes(old_LRRome: str, new_LRRome: str, out_LRRome: str, copy: bool = False) -> List[Tuple[str, str, str, str]]:
+    """Merge old_LRRome and new_LRRome into out_LRRome (new_LRRome wins collisions). Returns the collisions (see COLLISION_COLUMNS)."""
+    collisions: List[Tuple[str, str, str, str]] = []
+    nb_copied = 0
+    for per_gene_dir in PER_GENE_DIRS:
+        nb_copied += merge_per_gene_files(os.path.join(old_LRRome, per_gene_dir), os.path.join(new_LRRome, per_gene_dir), os.path.join(out_LRRome, per_gene_dir), collisions, copy)
+    if nb_copied and not copy:
+        print(f"WARNING: {nb_copied} per-gene file(s) could not be hardlinked and were copied.", file=sys.stderr)
+    for fasta_file in FASTA_FILES:
+        merge_fastas(os.path.join(old_LRRome, fasta_file), os.path.join(new_LRRome, fasta_file), os.path.join(out_LRRome, fasta_file), collisions)
+    return collisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge two LRRomes: per-gene files are hardlinked, REF_*.fasta files are merged with the new LRRome winning ID collisions and indexed (.fai).")
+
+    parser.add_argument("--old_LRRome", required=True, help="Least recent LRRome (e.g. the initial LRRome)")
+    parser.add_argument("--new_LRRome", required=True, help="Most recent LRRome (e.g. the expertised LRRome): its sequences are kept in case of ID collision")
+    parser.add_argument("-o", "--output", required=True, help="Output merged LRRome directory")
+    parser.add_argument("--collisions_output", default=None, help="Output TSV file reporting the ID collisions (optional)")
+    parser.add_argument("--copy", action="store_true", help="Copy the per-gene files instead of hardlinking them (use it if the merged LRRome files are to be modified in place)")
+
+    args = parser.parse_args()
+
+    collisions = merge_LRRomes(args.old_LRRome, args.new_LRRome, args.output, args.copy)
+
+    print(f"INFO: {len(collisions)} ID collision(s) between the LRRomes, the sequences/files of {args.new_LRRome} were kept.")
+    if args.collisions_output:
+        with open(args.collisions_output, "w") as out:
+            out.write("\t".join(COLLISION_COLUMNS) + "\n")
+            out.writelines("\t".join(collision) + "\n" for collision in collisions)
+        print(f"INFO: Collisions written to {args.collisions_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#python mergeSortedGffs.py --gff_list gff_list.txt --output merged_noDup.gff --skipped_output conflicts.tsv
+
+"""
+Merge coordinate-sorted GFF files (e.g. gff_cleaner outputs) into one sorted GFF in a single streaming k-way merge.
+Genes from different files sharing an ID or overlapping each other are detected and only the gene from the most recent
+file is kept (the GFF list is ordered from the most recent to the least recent file, as for concatAndRmRepeatGenes.py).
+A first pass over the gene lines records the most recent file (its rank in the list) of each gene ID, so that older copies
+of a gene are removed wherever they are: memory therefore grows with the number of gene IDs, on top of the current cluster
+of overlapping gene models kept by the merge.
+"""
+
+import argparse
+import heapq
+import os
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+REPORT_COLUMNS = ["conflict", "chrom", "kept_gene", "kept_start", "kept_end", "kept_gff", "removed_gene", "removed_start", "removed_end", "removed_gff", "action"]
+
+
+class GeneModel:
+    """A gene line and all the lines following it until the next gene (its mRNA/exon/CDS children)."""
+
+    __slots__ = ("chrom", "start", "end", "gene_id", "rank", "gff_file", "lines")
+
+    def __init__(self, chrom: str, start: int, end: int, gene_id: str, rank: int, gff_file: str, gene_line: str):
+        self.chrom = chrom
+        self.start = start
+        self.end = end
+        self.gene_id = gene_id
+        self.rank = rank  # Position of the GFF in the list (0 = most recent)
+        self.gff_file = gff_file
+        self.lines = [gene_line]
+
+    def sort_key(self) -> Tuple[str, int, int, int]:
+        return (self.chrom, self.start, self.end, self.rank)
+
+    def overlaps(self, other: "GeneModel") -> bool:
+        return self.chrom == other.chrom and self.start <= other.end and other.start <= self.end
+
+
+def get_gene_id(attributes: str) -> str:
+    for attribute in attributes.rstrip("\n").split(";"):
+        if attribute.startswith("ID="):
+            return attribute[3:]
+    raise ValueError(f"Gene without ID: {attributes}")
+
+
+def read_newest_ranks(gff_files: List[str]) -> Dict[str, int]:
+    """
+    First pass over the gene lines of the GFF files (most recent first): the rank of the most recent file containing each gene ID.
+    Raises an error if a GFF contains the same gene ID several times.
+    """
+    newest_ranks: Dict[str, int] = {}
+    for rank, gff_file in enumerate(gff_files):
+        with open(gff_file, "r") as gff:
+            for line in gff:
+                if line.startswith("#") or not line.strip():
+                    continue
+                fields = line.split("\t")
+                if fields[2] != "gene":
+                    continue
+                gene_id = get_gene_id(fields[8])
+                newest_rank = newest_ranks.get(gene_id)
+                if newest_rank is None:
+                    newest_ranks[gene_id] = rank
+                elif newest_rank == rank:
+                    raise ValueError(f"Error: gene {gene_id} is present several times in {gff_file}")
+    return newest_ranks
+
+
+def read_gene_models(gff_file: str, rank: int) -> Iterator[GeneModel]:
+    """Stream the gene models of a GFF, checking that they are sorted by chromosome, start and end."""
+    model: Optional[GeneModel] = None
+    with open(gff_file, "r") as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.split("\t")
+            if fields[2] == "gene":
+                new_model = GeneModel(fields[0], int(fields[3]), int(fields[4]), get_gene_id(fields[8]), rank, gff_file, line)
+                if model is not None:
+                    if new_model.sort_key() < model.sort_key():
+                        raise ValueError(f"Error: {gff_file} is not sorted by chromosome, start and end (gene {new_model.gene_id} comes after {model.gene_id}).")
+                    yield model
+                model = new_model
+            elif model is not None:
+                model.lines.append(line)
+    if model is not None:
+        yield model
+
+
+def report_row(conflict: str, kept: GeneModel, model: GeneModel, action: str) -> tuple:
+    return (conflict, model.chrom, kept.gene_id, kept.start, kept.end, kept.gff_file, model.gene_id, model.start, model.end, model.gff_file, action)
+
+
+def resolve_cluster(cluster: List[GeneModel], overlap_policy: str, gff_files: List[str], newest_ranks: Dict[str, int], report: List[tuple]) -> List[GeneModel]:
+    """
+    Resolve the conflicts inside a cluster of overlapping gene models, most recent file first:
+    a gene whose ID has a copy in a more recent file (anywhere in the files, see read_newest_ranks) is removed, and so is
+    a gene overlapping a kept gene from a more recent file (unless overlap_policy is 'flag', in which case the overlap is only reported).
+    Returns the kept gene models in coordinate order.
+    """
+    kept: List[GeneModel] = []
+    for model in sorted(cluster, key=lambda model: model.rank):
+        newest_rank = newest_ranks[model.gene_id]
+        if newest_rank < model.rank:
+            # Only the rank of the most recent copy is known here: its coordinates are not reported
+            report.append(("duplicated_id", model.chrom, model.gene_id, ".", ".", gff_files[newest_rank], model.gene_id, model.start, model.end, model.gff_file, "removed"))
+            continue
+        conflicts = [other for other in kept if other.rank != model.rank and other.overlaps(model)]
+        removed = bool(conflicts) and overlap_policy == "newest"
+        for other in conflicts:
+            report.append(report_row("overlap", other, model, "removed" if removed else "kept"))
+        if not removed:
+            kept.append(model)
+    return sorted(kept, key=GeneModel.sort_key)
+
+
+def merge_gffs(gff_files: List[str], out_file: TextIO, overlap_policy: str = "newest") -> List[tuple]:
+    """
+    K-way merge of the gene models of the sorted GFF files into out_file.
+    Returns the report rows (see REPORT_COLUMNS) of the detected conflicts.
+    """
+    report: List[tuple] = []
+    newest_ranks = read_newest_ranks(gff_files)
+    streams = [read_gene_models(gff_file, rank) for rank, gff_file in enumerate(gff_files)]
+    cluster: List[GeneModel] = []
+    cluster_end = 0
+
+    def flush(cluster: List[GeneModel]) -> None:
+        for model in resolve_cluster(cluster, overlap_policy, gff_files, newest_ranks, report):
+            out_file.writelines(model.lines)
+
+    for model in heapq.merge(*streams, key=GeneModel.sort_key):
+        if cluster and (model.chrom != cluster[0].chrom or model.start > cluster_end):
+            flush(cluster)
+            cluster = []
+        cluster_end = max(cluster_end, model.end) if cluster else model.end
+        cluster.append(model)
+    if cluster:
+        flush(cluster)
+
+    return report
+
+
+def write_report(report: List[tuple], report_file: str) -> None:
+    with open(report_file, "w") as out:
+        out.write("\t".join(REPORT_COLUMNS) + "\n")
+        out.writelines("\t".join(str(value) for value in row) + "\n" for row in report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge coordinate-sorted GFF files (e.g. gff_cleaner outputs) into one sorted GFF in a single pass. Genes from different files sharing an ID or overlapping each other are reported and only the gene from the most recent file is kept. Drop-in alternative to concatAndRmRepeatGenes.py.")
+
+    parser.add_argument("--gff_list", help="File listing the sorted GFF files from the most recent to the least recent. Either full paths (and leave --prefix empty), or file names with a path and/or prefix given to --prefix (include the final slash for a path).")
+    parser.add_argument("--prefix", help="GFF files prefix, e.g. /home/user/02_build_exp_LRRome/CLEANED_GFF/cleaned_", default="")
+    parser.add_argument("-o", "--output", help="Output GFF file")
+    parser.add_argument("--skipped_output", help="Output TSV file reporting the duplicated/overlapping genes (optional)", default=None)
+    parser.add_argument("--overlap_policy", choices=["newest", "flag"], default="newest", help="'newest' (default): of two overlapping genes from different files, only the one from the most recent file is kept. 'flag': overlapping genes are only reported (genes sharing an ID are still deduplicated).")
+
+    args = parser.parse_args()
+
+    with open(args.gff_list, "r") as gff_list:
+        gff_files = [os.path.realpath(args.prefix + line.strip()) for line in gff_list if line.strip()]
+
+    with open(args.output, "w", buffering=1 << 20) as out_file:
+        report = merge_gffs(gff_files, out_file, args.overlap_policy)
+
+    nb_removed = len({(row[6], row[9]) for row in report if row[-1] == "removed"})
+    print(f"INFO: {len(report)} conflict(s) between gene models detected, {nb_removed} gene model(s) removed.")
+    if args.skipped_output:
+        write_report(report, args.skipped_output)
+        print(f"INFO: Conflicts written to {args.skipped_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#python proteinCache.py split --cache_dir PROT_CACHE --gff genes.gff --genome genome.fasta --seq_type FSprot --out_gff missing_genes.gff
+
+"""
+Content-addressed cache of the protein sequences extracted from gene models (extract_prot_sequences in lib_LRRome.sh).
+A protein is stored in <cache_dir>/<key[:2]>/<key>.fasta, the key being the hash of the CDS coordinates, strands and phases of the gene model,
+of the genome FASTA checksum and of the sequence type: gene models that did not change are found in the cache whatever their ID.
+The genome checksums are themselves cached (by path, size and modification time) in <cache_dir>/genome_checksums.json.
+The least recently used proteins are evicted when the cache gets bigger than --max_size_mb.
+
+Commands:
+- split: write the gene models whose protein is not in the cache (to be sent to the extractor).
+- merge: add the newly extracted proteins to the cache, then write the proteins of all the gene models from the cache.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from LRRome_manifest import file_sha256, read_fasta, read_gene_models, text_sha256, write_fasta
+
+CDS_COLUMNS = (0, 3, 4, 6, 7)  # seqid, start, end, strand, phase
+ALL_COLUMNS = (0, 2, 3, 4, 6, 7)  # used for gene models without CDS lines
+GENOME_CHECKSUMS = "genome_checksums.json"
+
+
+def genome_checksum(cache_dir: str, genome_path: str) -> str:
+    """SHA-256 of the genome FASTA, only recomputed when its path, size or modification time changed."""
+    checksums_path = os.path.join(cache_dir, GENOME_CHECKSUMS)
+    checksums: Dict[str, str] = {}
+    if os.path.exists(checksums_path):
+        with open(checksums_path, "r") as f:
+            checksums = json.load(f)
+    stat = os.stat(genome_path)
+    genome_key = f"{os.path.realpath(genome_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    if genome_key not in checksums:
+        checksums[genome_key] = file_sha256(genome_path)
+        tmp_path = f"{checksums_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checksums, f)
+        os.replace(tmp_path, checksums_path)
+    return checksums[genome_key]
+
+
+def cache_key(lines: List[str], genome_sha256: str, seq_type: str) -> str:
+    """Hash of the CDS of a gene model (of all its features if it has no CDS), of the genome checksum and of the sequence type."""
+    features = [line.rstrip("\n").split("\t") for line in lines]
+    cds = [fields for fields in features if fields[2] == "CDS"]
+    columns = CDS_COLUMNS if cds else ALL_COLUMNS
+    return text_sha256(seq_type, genome_sha256, *sorted("\t".join(fields[i] for i in columns) for fields in (cds or features)))
+
+
+def cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], f"{key}.fasta")
+
+
+def read_cached_protein(cache_dir: str, key: str) -> Optional[str]:
+    path = cache_path(cache_dir, key)
+    try:
+        with open(path, "r") as f:
+            sequence = f.read().strip()
+    except OSError:
+        return None
+    os.utime(path)  # the modification time is used as last access time for the eviction
+    return sequence
+
+
+def write_cached_protein(cache_dir: str, key: str, sequence: str) -> None:
+    path = cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(sequence + "\n")
+    os.replace(tmp_path, path)
+
+
+def evict(cache_dir: str, max_size_bytes: int) -> int:
+    """Remove the least recently used proteins until the cache is not bigger than max_size_bytes. Returns the number of removed proteins."""
+    entries: List[Tuple[float, int, str]] = []
+    for sub_dir in os.scandir(cache_dir):
+        if sub_dir.is_dir():
+            for entry in os.scandir(sub_dir.path):
+                if entry.name.endswith(".fasta"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    nb_removed = 0
+    for _, size, path in sorted(entries):
+        if total_size <= max_size_bytes:
+            break
+        os.remove(path)
+        total_size -= size
+        nb_removed += 1
+    return nb_removed
+
+
+def split_gff(cache_dir: str, gff_path: str, genome_sha256: str, seq_type: str, out_gff: str) -> Tuple[int, int]:
+    """Write the gene models of gff_path whose protein is not cached to out_gff. Returns the numbers of cache hits and misses."""
+    nb_hits, nb_misses = 0, 0
+    with open(out_gff, "w") as out:
+        for _, lines in read_gene_models(gff_path):
+            if os.path.exists(cache_path(cache_dir, cache_key(lines, genome_sha256, seq_type))):
+                nb_hits += 1
+            else:
+                out.writelines(lines)
+                nb_misses += 1
+    return nb_hits, nb_misses
+
+
+def merge_fasta(cache_dir: str, gff_path: str, genome_sha256: str, seq_type: str, new_fasta: Optional[str], output: str) -> None:
+    """Cache the proteins of new_fasta, then write the proteins of all the gene models of gff_path (in the GFF order) to output."""
+    new_sequences = read_fasta(new_fasta) if new_fasta and os.path.exists(new_fasta) else {}
+    records = []
+    for gene_id, lines in read_gene_models(gff_path):
+        key = cache_key(lines, genome_sha256, seq_type)
+        if gene_id in new_sequences:
+            write_cached_protein(cache_dir, key, new_sequences[gene_id])
+            records.append((gene_id, new_sequences[gene_id]))
+            continue
+        sequence = read_cached_protein(cache_dir, key)
+        if sequence is None:
+            print(f"WARNING: no protein sequence for gene {gene_id}", file=sys.stderr)
+        else:
+            records.append((gene_id, sequence))
+    write_fasta(records, output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed cache of the protein sequences extracted from gene models: only the gene models missing from the cache are sent to the extractor.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help_text):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--cache_dir", required=True, help="Cache directory (created if missing)")
+        subparser.add_argument("--gff", required=True, help="GFF of the gene models (children following their gene)")
+        subparser.add_argument("--genome", required=True, help="Genome FASTA the proteins are extracted from")
+        subparser.add_argument("--seq_type", required=True, help="Sequence type (SEQ_TYPE: FSprot or prot)")
+        return subparser
+
+    split_parser = add_command("split", "Write the gene models whose protein is not cached")
+    split_parser.add_argument("--out_gff", required=True, help="Output GFF of the gene models missing from the cache")
+    merge_parser = add_command("merge", "Cache the newly extracted proteins and write the proteins of all the gene models")
+    merge_parser.add_argument("--new_fasta", default=None, help="Proteins extracted from the gene models missing from the cache")
+    merge_parser.add_argument("-o", "--output", required=True, help="Output protein FASTA")
+    merge_parser.add_argument("--max_size_mb", type=float, default=None, help="Maximum size of the cache in megabytes: the least recently used proteins are evicted beyond it (default: no limit)")
+
+    args = parser.parse_args()
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    genome_sha256 = genome_checksum(args.cache_dir, args.genome)
+
+    if args.command == "split":
+        nb_hits, nb_misses = split_gff(args.cache_dir, args.gff, genome_sha256, args.seq_type, args.out_gff)
+        print(f"INFO: {nb_hits} protein(s) found in the cache, {nb_misses} to extract.", file=sys.stderr)
+        print(nb_misses)
+    elif args.command == "merge":
+        merge_fasta(args.cache_dir, args.gff, genome_sha256, args.seq_type, args.new_fasta, args.output)
+        if args.max_size_mb is not None:
+            nb_evicted = evict(args.cache_dir, int(args.max_size_mb * 1024 * 1024))
+            if nb_evicted:
+                print(f"INFO: {nb_evicted} protein(s) evicted from the cache.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#python runStageJobs.py run --jobs jobs.tsv --log_dir LOGS --max_jobs 32 [--stitch_output all_outputs.txt] [--merged_log stage.log]
+
+"""
+Run the independent jobs of a build_incremental_LRRome.sh stage (e.g. gff_cleaner on each GFF, protein extraction on each chromosome)
+with a bounded concurrency, either on a local pool or as a SLURM job array.
+The jobs file is a TSV with one job per line: job name, job output file, bash command.
+Each job writes its stdout/stderr in <log_dir>/<job name>.log; once all the jobs are done, their outputs (and logs) can be stitched together in the jobs file order.
+
+Commands:
+- run: run all the jobs of a jobs file.
+- run_task: run a single job of a jobs file (used by the SLURM array tasks).
+- split_gff: split a GFF into one GFF per chromosome (gene models are kept whole), to parallelize per-chromosome steps.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Job(NamedTuple):
+    name: str
+    output: str
+    command: str
+
+
+def read_jobs(jobs_path: str) -> List[Job]:
+    jobs = []
+    with open(jobs_path, "r") as jobs_file:
+        for line in jobs_file:
+            if line.strip():
+                name, output, command = line.rstrip("\n").split("\t", 2)
+                jobs.append(Job(name, output, command))
+    if len({job.name for job in jobs}) != len(jobs):
+        raise ValueError(f"Error: job names are not unique in {jobs_path}")
+    return jobs
+
+
+def job_log(log_dir: str, job: Job) -> str:
+    return os.path.join(log_dir, f"{job.name}.log")
+
+
+def job_exit_file(log_dir: str, job: Job) -> str:
+    return os.path.join(log_dir, f"{job.name}.exit")
+
+
+def run_job(job: Job, log_dir: str) -> int:
+    """Run the job command with bash, its output going to the job log. Returns (and writes next to the log) the exit status."""
+    with open(job_log(log_dir, job), "w") as log:
+        exit_status = subprocess.run(["bash", "-c", job.command], stdout=log, stderr=subprocess.STDOUT).returncode
+    with open(job_exit_file(log_dir, job), "w") as exit_file:
+        exit_file.write(f"{exit_status}\n")
+    return exit_status
+
+
+def read_exit_status(log_dir: str, job: Job) -> int:
+    """Exit status written by run_job (1 if the job did not finish, e.g. killed by SLURM)."""
+    try:
+        with open(job_exit_file(log_dir, job), "r") as exit_file:
+            return int(exit_file.read().strip())
+    except (OSError, ValueError):
+        return 1
+
+
+def run_local(jobs: List[Job], log_dir: str, max_jobs: int) -> List[int]:
+    # The jobs are external commands: threads are enough to keep max_jobs processes running
+    with ThreadPoolExecutor(max_workers=max_jobs) as pool:
+        return list(pool.map(lambda job: run_job(job, log_dir), jobs))
+
+
+def run_slurm(jobs_path: str, jobs: List[Job], log_dir: str, max_jobs: int, partition: Optional[str], mem_mb: Optional[int]) -> List[int]:
+    """Submit the jobs as a SLURM job array (at most max_jobs tasks at a time) and wait for its end."""
+    sbatch = [
+        "sbatch", "--wait",
+        f"--array=0-{len(jobs) - 1}%{max_jobs}",
+        "--job-name=BILRRome.stage",
+        f"--output={os.path.join(log_dir, 'slurm_%A_%a.log')}",
+    ]
+    if partition:
+        sbatch.append(f"--partition={partition}")
+    if mem_mb:
+        sbatch.append(f"--mem-per-cpu={mem_mb}M")
+    sbatch.append(f"--wrap=python3 {os.path.realpath(__file__)} run_task --jobs {jobs_path} --log_dir {log_dir} --index $SLURM_ARRAY_TASK_ID")
+    subprocess.run(sbatch)
+    return [read_exit_status(log_dir, job) for job in jobs]
+
+
+def concat_files(paths: List[str], output: str) -> None:
+    with open(output, "wb") as out:
+        for path in paths:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+
+
+def run_stage(jobs_path: str, log_dir: str, max_jobs: int, executor: str = "local", partition: Optional[str] = None, mem_mb: Optional[int] = None,
+              stitch_output: Optional[str] = None, merged_log: Optional[str] = None) -> List[Job]:
+    """Run all the jobs of jobs_path and stitch their outputs/logs in order. Returns the failed jobs (nothing is stitched if any)."""
+    jobs_path = os.path.realpath(jobs_path)
+    log_dir = os.path.realpath(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
+    jobs = read_jobs(jobs_path)
+    if not jobs:
+        return []
+    for job in jobs:
+        if os.path.exists(job_exit_file(log_dir, job)):
+            os.remove(job_exit_file(log_dir, job))
+
+    if executor == "slurm":
+        exit_statuses = run_slurm(jobs_path, jobs, log_dir, max_jobs, partition, mem_mb)
+    else:
+        exit_statuses = run_local(jobs, log_dir, max_jobs)
+
+    if merged_log:
+        concat_files([job_log(log_dir, job) for job in jobs], merged_log)
+    failed_jobs = [job for job, exit_status in zip(jobs, exit_statuses) if exit_status != 0]
+    if stitch_output and not failed_jobs:
+        concat_files([job.output for job in jobs], stitch_output)
+    return failed_jobs
+
+
+def split_gff_by_chromosome(gff_path: str, out_dir: str) -> List[Tuple[str, str]]:
+    """
+    Write the lines of gff_path in one GFF per chromosome (<out_dir>/<chromosome>.gff), in the input order.
+    Returns (chromosome, GFF path) in order of first appearance of the chromosomes.
+    """
+    lines_per_chr: Dict[str, List[str]] = {}
+    with open(gff_path, "r") as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            lines_per_chr.setdefault(line.split("\t", 1)[0], []).append(line)
+
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = []
+    for chrom, lines in lines_per_chr.items():
+        chunk_path = os.path.join(os.path.realpath(out_dir), re.sub(r"[^\w.-]", "_", chrom) + ".gff")
+        with open(chunk_path, "w") as chunk:
+            chunk.writelines(lines)
+        chunks.append((chrom, chunk_path))
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the independent jobs of a build_incremental_LRRome.sh stage with a bounded concurrency (local pool or SLURM job array), then stitch their outputs and logs together in order.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run all the jobs of a jobs file")
+    run_parser.add_argument("--jobs", required=True, help="TSV file with one job per line: job name, job output file, bash command")
+    run_parser.add_argument("--log_dir", required=True, help="Directory of the job logs (<job name>.log)")
+    run_parser.add_argument("--max_jobs", type=int, default=1, help="Maximum number of jobs running at the same time (default: 1)")
+    run_parser.add_argument("--executor", choices=["local", "slurm"], default="local", help="'local' (default): run the jobs on this node. 'slurm': submit them as a SLURM job array.")
+    run_parser.add_argument("--partition", default=None, help="SLURM partition (slurm executor only)")
+    run_parser.add_argument("--mem_mb", type=int, default=None, help="Memory per CPU in megabytes (slurm executor only)")
+    run_parser.add_argument("--stitch_output", default=None, help="Concatenate the job outputs in this file, in the jobs file order (optional)")
+    run_parser.add_argument("--merged_log", default=None, help="Concatenate the job logs in this file, in the jobs file order (optional)")
+
+    task_parser = subparsers.add_parser("run_task", help="Run a single job of a jobs file (SLURM array task)")
+    task_parser.add_argument("--jobs", required=True)
+    task_parser.add_argument("--log_dir", required=True)
+    task_parser.add_argument("--index", type=int, required=True, help="0-based index of the job in the jobs file")
+
+    split_parser = subparsers.add_parser("split_gff", help="Split a GFF into one GFF per chromosome and print 'chromosome<TAB>GFF path' for each")
+    split_parser.add_argument("--gff", required=True)
+    split_parser.add_argument("--out_dir", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.max_jobs < 1:
+            parser.error("--max_jobs must be at least 1")
+        failed_jobs = run_stage(args.jobs, args.log_dir, args.max_jobs, args.executor, args.partition, args.mem_mb, args.stitch_output, args.merged_log)
+        if failed_jobs:
+            for job in failed_jobs:
+                print(f"ERROR: job {job.name} failed, see {job_log(os.path.realpath(args.log_dir), job)}", file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "run_task":
+        sys.exit(run_job(read_jobs(args.jobs)[args.index], args.log_dir))
+    elif args.command == "split_gff":
+        for chrom, chunk_path in split_gff_by_chromosome(args.gff, args.out_dir):
+            print(f"{chrom}\t{chunk_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,396 @@
-"""
-Check overlaps between gene features across multiple GFF files.
-Only 'gene' features are considered. Prints overlaps with file and line context.
-"""
-
-from pathlib import Path
-from typing import Dict
-from intervaltree import Interval, IntervalTree
-import sys
-
-def parse_gff_line(line: str) -> tuple[str, int, int, str] | None:
-    """Extract chromosome, start, end, and the full line if it's a 'gene' feature."""
-    if line.startswith("#"):
-        return None
-    parts = line.strip().split("\t")
-    if len(parts) < 9 or parts[2].lower() != "gene":
-        return None
-    chrom = parts[0]
-    start = int(parts[3]) - 1  # Convert to 0-based for IntervalTree
-    end = int(parts[4])
-    return chrom, start, end, line.strip()
-
-def process_gff(file_path: Path, trees_by_chr: Dict[str, IntervalTree]) -> None:
-    """Process one GFF file and update interval trees. Print overlaps if found."""
-    with file_path.open() as f:
-        for line in f:
-            parsed = parse_gff_line(line)
-            if not parsed:
-                continue
-            chrom, start, end, original_line = parsed
-
-            tree = trees_by_chr.setdefault(chrom, IntervalTree())
-            overlaps = tree.overlap(start, end)
-
-            if overlaps:
-                print(f"\n- Overlap found in file: {file_path.name}")
-                print(f"\tCurrent gene:\t\t\t{original_line}")
-                for ov in sorted(overlaps):
-                    print(f"\t-- Overlaps with: {ov.data}")
-
-            tree.add(Interval(start, end, f"[{file_path.name}]\t{original_line}"))
-
-def main(gff_list_file: Path) -> None:
-    trees_by_chr: Dict[str, IntervalTree] = {}
-    with gff_list_file.open() as f:
-        for gff_path in f:
-            gff_file = Path(gff_path.strip())
-            if gff_file.exists():
-                process_gff(gff_file, trees_by_chr)
-            else:
-                print(f"Error: File not found: {gff_file}", file=sys.stderr)
-                sys.exit(1)
-
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: check_gene_overlaps.py <gff_list_file>", file=sys.stderr)
-        sys.exit(1)
-
-    gff_list_file = Path(sys.argv[1])
-    if not gff_list_file.exists():
-        print(f"Error: File {gff_list_file} does not exist.", file=sys.stderr)
-        sys.exit(1)
-
-    main(gff_list_file)
+"""
+Check overlaps between gene features across multiple GFF files.
+Only 'gene' features are considered. Prints overlaps with file and line context.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+from array import array
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from intervaltree import Interval, IntervalTree
+import argparse
+import gzip
+import hashlib
+import heapq
+import json
+import sys
+
+def parse_gff_line(line: str) -> tuple[str, int, int, str] | None:
+    """Extract chromosome, start, end, and the full line if it's a 'gene' feature."""
+    if line.startswith("#"):
+        return None
+    parts = line.strip().split("\t")
+    if len(parts) < 9 or parts[2].lower() != "gene":
+        return None
+    chrom = parts[0]
+    start = int(parts[3]) - 1  # Convert to 0-based for IntervalTree
+    end = int(parts[4])
+    return chrom, start, end, line.strip()
+
+def process_gff(file_path: Path, trees_by_chr: Dict[str, IntervalTree]) -> None:
+    """Process one GFF file and update interval trees. Print overlaps if found."""
+    with file_path.open() as f:
+        for line in f:
+            parsed = parse_gff_line(line)
+            if not parsed:
+                continue
+            chrom, start, end, original_line = parsed
+
+            tree = trees_by_chr.setdefault(chrom, IntervalTree())
+            overlaps = tree.overlap(start, end)
+
+            if overlaps:
+                print(f"\n- Overlap found in file: {file_path.name}")
+                print(f"\tCurrent gene:\t\t\t{original_line}")
+                for ov in sorted(overlaps):
+                    print(f"\t-- Overlaps with: {ov.data}")
+
+            tree.add(Interval(start, end, f"[{file_path.name}]\t{original_line}"))
+
+
+## Batch mode: all genes are loaded first, then each chromosome is sorted once and swept
+
+@dataclass
+class ChromosomeGenes:
+    """Coordinates (0-based, half-open) of the genes of one chromosome, tagged with their input file and line."""
+    chrom: str
+    starts: array = field(default_factory=lambda: array("q"))
+    ends: array = field(default_factory=lambda: array("q"))
+    ranks: array = field(default_factory=lambda: array("q"))  # Global reading order of the genes (list order, then line order)
+    file_indices: array = field(default_factory=lambda: array("l"))
+    line_numbers: array = field(default_factory=lambda: array("q"))
+    lines: List[str] = field(default_factory=list)
+
+    def append(self, start: int, end: int, rank: int, file_index: int, line_number: int, line: str) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.ranks.append(rank)
+        self.file_indices.append(file_index)
+        self.line_numbers.append(line_number)
+        self.lines.append(line)
+
+def read_gff_genes(file_path: Path) -> List[Tuple[str, int, int, int, str]]:
+    """Return the (chromosome, start, end, line number, line) of each gene of a GFF file."""
+    genes = []
+    with file_path.open() as f:
+        for line_number, line in enumerate(f, start=1):
+            parsed = parse_gff_line(line)
+            if not parsed:
+                continue
+            chrom, start, end, original_line = parsed
+            genes.append((chrom, start, end, line_number, original_line))
+    return genes
+
+def add_genes(genes_by_chr: Dict[str, ChromosomeGenes], genes: List[Tuple[str, int, int, int, str]], file_index: int, rank: int) -> int:
+    """Add the genes of one file to genes_by_chr, numbering them from rank. Returns the next rank."""
+    for chrom, start, end, line_number, line in genes:
+        genes_by_chr.setdefault(chrom, ChromosomeGenes(chrom)).append(start, end, rank, file_index, line_number, line)
+        rank += 1
+    return rank
+
+def load_genes(gff_files: List[Path]) -> Dict[str, ChromosomeGenes]:
+    """Stream all GFF files and store their genes by chromosome."""
+    genes_by_chr: Dict[str, ChromosomeGenes] = {}
+    rank = 0
+    for file_index, file_path in enumerate(gff_files):
+        rank = add_genes(genes_by_chr, read_gff_genes(file_path), file_index, rank)
+    return genes_by_chr
+
+def sweep_overlaps(genes: ChromosomeGenes) -> List[Tuple[int, List[int]]]:
+    """
+    Find all overlapping gene pairs of one chromosome with a single sort and sweep.
+    Each pair is attributed to the gene read last (as in process_gff, a gene is reported when it overlaps genes read before it).
+    Returns (current gene, overlapped genes) tuples of indices in genes, ordered by reading order.
+    """
+    overlapped_by: Dict[int, List[int]] = {}
+    active: List[Tuple[int, int]] = []  # Heap of (end, index) of the genes that may overlap the next ones
+    for i in sorted(range(len(genes.starts)), key=lambda i: (genes.starts[i], genes.ends[i])):
+        start = genes.starts[i]
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, j in active:
+            current, earlier = (i, j) if genes.ranks[i] > genes.ranks[j] else (j, i)
+            overlapped_by.setdefault(current, []).append(earlier)
+        heapq.heappush(active, (genes.ends[i], i))
+    return sorted(overlapped_by.items(), key=lambda item: genes.ranks[item[0]])
+
+def format_overlaps(genes: ChromosomeGenes, current: int, earlier_genes: List[int], file_names: List[str]) -> str:
+    """Format an overlap block the same way process_gff prints it."""
+    def gene_data(i: int) -> str:
+        return f"[{file_names[genes.file_indices[i]]}]\t{genes.lines[i]}"
+
+    block = [
+        f"\n- Overlap found in file: {file_names[genes.file_indices[current]]}\n",
+        f"\tCurrent gene:\t\t\t{genes.lines[current]}\n",
+    ]
+    for j in sorted(earlier_genes, key=lambda j: (genes.starts[j], genes.ends[j], gene_data(j))):
+        block.append(f"\t-- Overlaps with: {gene_data(j)}\n")
+    return "".join(block)
+
+def sweep_chromosomes(genes_by_chr: Dict[str, ChromosomeGenes], threads: int = 1, min_rank: int = 0) -> List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]]:
+    """
+    Sweep each chromosome (optionally in parallel). Returns the genes and overlaps of each chromosome.
+    Only the overlaps of genes whose rank is at least min_rank are kept (genes with a lower rank were already checked).
+    """
+    chromosomes = list(genes_by_chr.values())
+
+    if threads > 1 and len(chromosomes) > 1:
+        with ProcessPoolExecutor(max_workers=threads) as executor:
+            overlaps_by_chr = list(executor.map(sweep_overlaps, chromosomes))
+    else:
+        overlaps_by_chr = [sweep_overlaps(genes) for genes in chromosomes]
+
+    if min_rank:
+        overlaps_by_chr = [
+            [(current, earlier_genes) for current, earlier_genes in overlaps if genes.ranks[current] >= min_rank]
+            for genes, overlaps in zip(chromosomes, overlaps_by_chr)
+        ]
+
+    return list(zip(chromosomes, overlaps_by_chr))
+
+def find_overlaps_batch(gff_files: List[Path], threads: int = 1) -> List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]]:
+    """Load all GFF files and sweep each chromosome (optionally in parallel). Returns the genes and overlaps of each chromosome."""
+    return sweep_chromosomes(load_genes(gff_files), threads)
+
+def format_report(results: List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]], file_names: List[str]) -> str:
+    """Format all overlap blocks, ordered by reading order of the current gene."""
+    blocks = [
+        (genes.ranks[current], format_overlaps(genes, current, earlier_genes, file_names))
+        for genes, overlaps in results
+        for current, earlier_genes in overlaps
+    ]
+    blocks.sort(key=lambda block: block[0])
+    return "".join(text for _, text in blocks)
+
+def check_overlaps_batch(gff_files: List[Path], threads: int = 1) -> str:
+    """Load all GFF files, sweep each chromosome (optionally in parallel) and return the whole overlap report."""
+    file_names = [file_path.name for file_path in gff_files]
+    return format_report(find_overlaps_batch(gff_files, threads), file_names)
+
+
+## Incremental mode: the genes of already checked files are stored in an on-disk index
+
+INDEX_VERSION = 1
+
+def file_sha256(file_path: Path) -> str:
+    """Return the SHA-256 checksum of a file."""
+    checksum = hashlib.sha256()
+    with file_path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+def file_stat(file_path: Path) -> Tuple[int, int]:
+    """Return the size and modification time (ns) of a file."""
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+def read_index(index_path: Path) -> Dict[str, dict]:
+    """Return the indexed files ({path: {"sha256": ..., "size": ..., "mtime_ns": ..., "genes": [...]}}), or an empty index if index_path does not exist."""
+    if not index_path.exists():
+        return {}
+    with gzip.open(index_path, "rt") as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        print(f"Warning: ignoring {index_path} (unsupported index version).", file=sys.stderr)
+        return {}
+    return index["files"]
+
+def write_index(index_path: Path, indexed_files: Dict[str, dict]) -> None:
+    with gzip.open(index_path, "wt") as f:
+        json.dump({"version": INDEX_VERSION, "files": indexed_files}, f)
+
+def find_overlaps_incremental(gff_files: List[Path], index_path: Path, threads: int = 1) -> Tuple[List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]], List[str]]:
+    """
+    Check only the new or changed files of gff_files against the genes of the files stored in the index, then update the index.
+    Indexed files are considered read before the new ones, so only overlaps involving a new gene are reported.
+    A file is only hashed if its size or modification time differ from those of its index entry.
+    Returns the overlaps of each chromosome and the file names (indexed files first, then new files).
+    """
+    indexed_files = read_index(index_path)
+    cached_files, new_files = [], []
+    for file_path in gff_files:
+        key = str(file_path.resolve())
+        size, mtime_ns = file_stat(file_path)
+        entry = indexed_files.get(key)
+        if entry is not None and (entry.get("size"), entry.get("mtime_ns")) == (size, mtime_ns):
+            cached_files.append((file_path, entry))
+            continue
+        checksum = file_sha256(file_path)
+        if entry is not None and entry["sha256"] == checksum:
+            cached_files.append((file_path, {**entry, "size": size, "mtime_ns": mtime_ns}))
+        else:
+            new_files.append((file_path, {"sha256": checksum, "size": size, "mtime_ns": mtime_ns, "genes": read_gff_genes(file_path)}))
+    print(f"{len(cached_files)} indexed file(s) reused, {len(new_files)} new or changed file(s) to check.", file=sys.stderr)
+
+    genes_by_chr: Dict[str, ChromosomeGenes] = {}
+    rank = 0
+    for file_index, (_, entry) in enumerate(cached_files):
+        rank = add_genes(genes_by_chr, [tuple(gene) for gene in entry["genes"]], file_index, rank)
+    first_new_rank = rank
+    for file_index, (_, entry) in enumerate(new_files, start=len(cached_files)):
+        rank = add_genes(genes_by_chr, entry["genes"], file_index, rank)
+
+    results = sweep_chromosomes(genes_by_chr, threads, min_rank=first_new_rank)
+
+    write_index(index_path, {str(file_path.resolve()): entry for file_path, entry in cached_files + new_files})
+    return results, [file_path.name for file_path, _ in cached_files + new_files]
+
+
+## Structured report: one row per overlapping pair, plus summary counts per file and chromosome
+
+PAIR_COLUMNS = [
+    "chrom",
+    "file", "line", "gene_id", "start", "end",
+    "overlapped_file", "overlapped_line", "overlapped_gene_id", "overlapped_start", "overlapped_end",
+    "overlap_length", "reciprocal_fraction",
+]
+SUMMARY_COLUMNS = ["file", "chrom", "genes", "overlapping_genes", "overlapping_pairs"]
+
+def get_gene_id(gff_line: str) -> str:
+    """Return the ID attribute of a GFF line (or '.' if there is none)."""
+    for attribute in gff_line.split("\t")[8].split(";"):
+        if attribute.startswith("ID="):
+            return attribute[3:]
+    return "."
+
+def overlap_pair_rows(results: List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]], file_names: List[str]) -> List[tuple]:
+    """
+    Build one row per overlapping pair (see PAIR_COLUMNS), ordered by reading order of the current gene.
+    Coordinates are 1-based as in the GFF; the reciprocal fraction is the overlap length divided by the length of the longest gene of the pair.
+    """
+    rows = []
+    for genes, overlaps in results:
+        chrom = genes.chrom
+        for current, earlier_genes in overlaps:
+            for j in sorted(earlier_genes, key=lambda j: (genes.starts[j], genes.ends[j], genes.ranks[j])):
+                overlap_length = min(genes.ends[current], genes.ends[j]) - max(genes.starts[current], genes.starts[j])
+                longest_length = max(genes.ends[current] - genes.starts[current], genes.ends[j] - genes.starts[j])
+                rows.append((
+                    genes.ranks[current],
+                    (
+                        chrom,
+                        file_names[genes.file_indices[current]], genes.line_numbers[current], get_gene_id(genes.lines[current]),
+                        genes.starts[current] + 1, genes.ends[current],
+                        file_names[genes.file_indices[j]], genes.line_numbers[j], get_gene_id(genes.lines[j]),
+                        genes.starts[j] + 1, genes.ends[j],
+                        overlap_length, round(overlap_length / longest_length, 4),
+                    ),
+                ))
+    rows.sort(key=lambda row: row[0])
+    return [row for _, row in rows]
+
+def summarize_overlaps(results: List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]], file_names: List[str]) -> List[tuple]:
+    """Count genes, genes overlapping previously read genes, and overlapping pairs per (file, chromosome)."""
+    counts: Dict[Tuple[int, str], List[int]] = {}
+    for genes, overlaps in results:
+        for file_index in genes.file_indices:
+            counts.setdefault((file_index, genes.chrom), [0, 0, 0])[0] += 1
+        for current, earlier_genes in overlaps:
+            file_counts = counts[(genes.file_indices[current], genes.chrom)]
+            file_counts[1] += 1
+            file_counts[2] += len(earlier_genes)
+    return [(file_names[file_index], chrom, *values) for (file_index, chrom), values in sorted(counts.items())]
+
+def write_table(rows: List[tuple], columns: List[str], output: Path, out_format: str) -> None:
+    """Write rows to a TSV file (in one buffered write) or to a Parquet file (requires pyarrow)."""
+    if out_format == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Error: pyarrow is required to write Parquet files.", file=sys.stderr)
+            sys.exit(1)
+        table = pa.table({column: [row[i] for row in rows] for i, column in enumerate(columns)})
+        pq.write_table(table, output)
+    else:
+        lines = ["\t".join(columns)] + ["\t".join(str(value) for value in row) for row in rows]
+        output.write_text("\n".join(lines) + "\n")
+
+def check_thresholds(pair_rows: List[tuple], max_pairs: int | None, max_fraction: float | None) -> bool:
+    """Return True if the overlaps exceed one of the provided thresholds (and print why to stderr)."""
+    failed = False
+    if max_pairs is not None and len(pair_rows) > max_pairs:
+        print(f"Error: {len(pair_rows)} overlapping gene pairs found (maximum allowed: {max_pairs}).", file=sys.stderr)
+        failed = True
+    if max_fraction is not None:
+        fraction_index = PAIR_COLUMNS.index("reciprocal_fraction")
+        above = sum(1 for row in pair_rows if row[fraction_index] > max_fraction)
+        if above:
+            print(f"Error: {above} overlapping gene pairs have a reciprocal fraction above {max_fraction}.", file=sys.stderr)
+            failed = True
+    return failed
+
+def read_gff_list(gff_list_file: Path) -> List[Path]:
+    """Return the paths listed in gff_list_file, exiting if one of them does not exist."""
+    gff_files = []
+    with gff_list_file.open() as f:
+        for gff_path in f:
+            gff_file = Path(gff_path.strip())
+            if not gff_file.exists():
+                print(f"Error: File not found: {gff_file}", file=sys.stderr)
+                sys.exit(1)
+            gff_files.append(gff_file)
+    return gff_files
+
+def main(gff_list_file: Path) -> None:
+    trees_by_chr: Dict[str, IntervalTree] = {}
+    with gff_list_file.open() as f:
+        for gff_path in f:
+            gff_file = Path(gff_path.strip())
+            if gff_file.exists():
+                process_gff(gff_file, trees_by_chr)
+            else:
+                print(f"Error: File not found: {gff_file}", file=sys.stderr)
+                sys.exit(1)
+
+def collect_overlaps(gff_list_file: Path, threads: int = 1, index: Path | None = None) -> Tuple[List[Tuple[ChromosomeGenes, List[Tuple[int, List[int]]]]], List[str]]:
+    """Find the overlaps of all the listed files, or only of the new/changed ones if an index is provided."""
+    gff_files = read_gff_list(gff_list_file)
+    if index:
+        return find_overlaps_incremental(gff_files, index, threads)
+    return find_overlaps_batch(gff_files, threads), [file_path.name for file_path in gff_files]
+
+def main_batch(gff_list_file: Path, threads: int = 1, index: Path | None = None) -> None:
+    results, file_names = collect_overlaps(gff_list_file, threads, index)
+    sys.stdout.write(format_report(results, file_names))
+
+def main_structured(gff_list_file: Path, out_format: str, output: Path, summary: Path | None = None, threads: int = 1,
+                    max_pairs: int | None = None, max_fraction: float | None = None, index: Path | None = None) -> int:
+    """Write the overlapping pairs (and optionally the summary counts) as tables. Returns the exit status (2 if a threshold is exceeded)."""
+    results, file_names = collect_overlaps(gff_list_file, threads, index)
+
+    pair_rows = overlap_pair_rows(results, file_names)
+    write_table(pair_rows, PAIR_COLUMNS, output, out_format)
+    if summary:
+        write_table(summarize_overlaps(results, file_names), SUMMARY_COLUMNS, summary, out_format)
+
+    return 2 if check_thresholds(pair_rows, max_pairs, max_fraction) else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check overlaps between gene features across multiple GFF files (listed from the first to the last one to check).")
+    parser.add_argument("gff_list_file", type=Path, help="File listing the GFF files to check, one path per line.")
+    parser.add_argument("--batch", action="store_true", help="Load all genes first, then sort and sweep each chromosome once and write the report in a single pass (faster on large GFF lists).")
+    parser.add_argument("--threads", type=int, default=1, help="Number of chromosomes processed in parallel in --batch mode (default: 1).")
+    parser.add_argument("--format", dest="out_format", choices=["text", "tsv", "parquet"], default="text", help="'text' (default) prints overlap blocks to stdout; 'tsv' and 'parquet' write one row per overlapping pair to --output (implies --batch).")
+    parser.add_argument("-o", "--output", type=Path, help="Output file for the overlapping pairs (required with --format tsv/parquet).")
+    parser.add_argument("--summary", type=Path, help="Output file for the counts of genes and overlaps per file and chromosome (with --format tsv/parquet).")
+    parser.add_argument("--max_pairs", type=int, help="Exit with status 2 if more overlapping pairs than this are found (with --format tsv/parquet).")
+    parser.add_argument("--max_fraction", type=float, help="Exit with status 2 if a pair has a reciprocal overlap fraction above this value (with --format tsv/parquet).")
+    parser.add_argument("--index", type=Path, help="On-disk index of the already checked files (created if missing, implies --batch). Only new or changed files are read and checked against the indexed genes, then the index is updated.")
+    args = parser.parse_args()
+
+    if args.out_format != "text" and args.output is None:
+        parser.error("--output is required with --format tsv/parquet.")
+
+    if not args.gff_list_file.exists():
+        print(f"Error: File {args.gff_list_file} does not exist.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.out_format != "text":
+        sys.exit(main_structured(args.gff_list_file, args.out_format, args.output, args.summary, args.threads, args.max_pairs, args.max_fraction, args.index))
+    elif args.batch or args.index:
+        main_batch(args.gff_list_file, args.threads, args.index)
+    else:
+        main(args.gff_list_file)
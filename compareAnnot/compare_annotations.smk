@@ -13,6 +13,8 @@ outDir = "OUTPUTS"
 CDScompR_outDir = outDir+"/01_CDScompR"
 mergeCompR_outDir = outDir+"/02_merge_compR"
 plots_outDir = outDir+"/03_plots"
+allVsAll_outDir = outDir+"/04_all_vs_all"
+compareAnnots_outDir = outDir+"/05_compare_annots"
 
 
 # Functions
@@ -39,6 +41,16 @@ merge_compR = config["merge_path"]
 
 gff_dict = tsv2dict(config["alt_gff_list"])
 
+# Optional: all-vs-all comparison of the reference and all the alternative annotations (CDScompR_utils/python_utils/scripts/compare_all_vs_all.py)
+all_vs_all = config.get("all_vs_all_path")
+all_vs_all_span_type = config.get("all_vs_all_span_type", "CDS")
+
+# Optional: overlap groups and built-in identity scores of the reference and each alternative annotation (CDScompR_utils/python_utils/scripts/compare_annots.py),
+# scattered into compare_annots_shards jobs of balanced gene counts (by chromosome) and gathered
+compare_annots = config.get("compare_annots_path")
+compare_annots_span_type = config.get("compare_annots_span_type", "CDS")
+compare_annots_shards = int(config.get("compare_annots_shards", 1))
+
 
 
 
@@ -48,7 +60,9 @@ gff_dict = tsv2dict(config["alt_gff_list"])
 rule all:
   input:
     plots_outDir+"/id_score_plot.png",
-    plots_outDir+"/id_score_distribution.png"
+    plots_outDir+"/id_score_distribution.png",
+    [allVsAll_outDir+"/all_vs_all.tsv"] if all_vs_all else [],
+    expand(compareAnnots_outDir+"/"+ref_name+"_{base}/summary.txt", base=gff_dict.keys()) if compare_annots else []
 # --------------------------------------------------------
 
 rule sort_refGFF:
@@ -140,4 +154,53 @@ rule plot_scores:
         "Rscript {scripts_dir}/plot_scores.R {input} {params.alt1_name} {params.alt2_name} {plots_outDir}"
 
 
+rule all_vs_all:
+    input:
+        ref_gff=ref_gff,
+        alt_gffs=[gff_dict[base][0] for base in gff_dict]
+    output:
+        allVsAll_outDir+"/all_vs_all.tsv"
+    singularity:
+        singularity_image
+    threads:
+        default_threads
+    params:
+        annotations=" ".join([ref_name+"="+ref_gff] + [base+"="+gff_dict[base][0] for base in gff_dict])
+    shell:
+        "python {all_vs_all} --gff {params.annotations} --span_type {all_vs_all_span_type} --cache_dir {allVsAll_outDir}/annotation_cache --threads {threads} -o {output}"
+
 
+rule compare_annots_shard:
+    input:
+        ref_gff=ref_gff,
+        alt_gff=lambda wildcards: gff_dict[wildcards.base][0]
+    output:
+        overlaps=temp(compareAnnots_outDir+"/"+ref_name+"_{base}/shards/overlaps_{shard}.tsv"),
+        scores=temp(compareAnnots_outDir+"/"+ref_name+"_{base}/shards/scores_{shard}.parquet"),
+        summary=temp(compareAnnots_outDir+"/"+ref_name+"_{base}/shards/summary_{shard}.txt"),
+        summary_json=temp(compareAnnots_outDir+"/"+ref_name+"_{base}/shards/summary_{shard}.json")
+    wildcard_constraints:
+        shard="\\d+"
+    singularity:
+        singularity_image
+    threads:
+        default_threads
+    shell:
+        "python {compare_annots} --ref_gff {input.ref_gff} --pred_gff {input.alt_gff} --span_type {compare_annots_span_type} --shard {wildcards.shard}/{compare_annots_shards} --threads {threads} -o {output.overlaps} --scores_output {output.scores} --summary_output {output.summary} --summary_json {output.summary_json}"
+
+
+rule compare_annots_gather:
+    input:
+        overlaps=expand(compareAnnots_outDir+"/"+ref_name+"_{{base}}/shards/overlaps_{shard}.tsv", shard=range(1, compare_annots_shards+1)),
+        scores=expand(compareAnnots_outDir+"/"+ref_name+"_{{base}}/shards/scores_{shard}.parquet", shard=range(1, compare_annots_shards+1)),
+        summaries=expand(compareAnnots_outDir+"/"+ref_name+"_{{base}}/shards/summary_{shard}.json", shard=range(1, compare_annots_shards+1))
+    output:
+        overlaps=compareAnnots_outDir+"/"+ref_name+"_{base}/overlaps.tsv",
+        scores=compareAnnots_outDir+"/"+ref_name+"_{base}/scores.parquet",
+        summary=compareAnnots_outDir+"/"+ref_name+"_{base}/summary.txt"
+    singularity:
+        singularity_image
+    threads:
+        default_threads
+    shell:
+        "python {compare_annots} gather --overlaps {input.overlaps} -o {output.overlaps} --scores {input.scores} --scores_output {output.scores} --summaries {input.summaries} --summary_output {output.summary}"
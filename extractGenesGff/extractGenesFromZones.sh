@@ -2,13 +2,8 @@
 
 set -euo pipefail
 
-if ! command -v AGAT &> /dev/null; then
-  module load AGAT/1.2.0-singularity
-fi
-
-
-
-
+SCRIPT_DIR="$(realpath "$(dirname "${BASH_SOURCE[0]}")")"
+EXTRACT_GENES_FROM_ZONES=${SCRIPT_DIR}/../gffFiltering/extractGenesFromZones.py
 
 usage() {
     echo "Usage: $0 <annot.gff> <regions.tsv> <output_folder>"
@@ -21,21 +16,11 @@ usage() {
     echo -e "  <output_folder>    The output folder name.\n"
 }
 
-agat_sp_filter_record_by_coordinates(){
+extractGenesPerChr() {
   local gff=$1
   local zones=$2
-  mkdir -p AGAT_output
-  cd AGAT_output
-  agat_sp_filter_record_by_coordinates.pl --gff $gff --tsv $zones
-  cd ..
-}
-
-concatGFFperChr() {
-  local zones=$1
-  mkdir -p GFFperChr
-  for chr in $(cut -f1 $zones | sort | uniq) ; do
-    cat AGAT_output/filter_record_by_coordinates/${chr}*.gff3 > GFFperChr/${chr}_in_zones.gff
-  done
+  # single pass over the gff: genes overlapping a zone are kept whole (with all their exons, even those outside the zone)
+  python3 ${EXTRACT_GENES_FROM_ZONES} --gff $gff --zones $zones --out_dir GFFperChr
 }
 
 
@@ -53,6 +38,5 @@ zones=$(realpath $zones)
 
 mkdir -p $output_folder
 cd $output_folder
-agat_sp_filter_record_by_coordinates $gff $zones
-concatGFFperChr $zones
+extractGenesPerChr $gff $zones
 cd ..
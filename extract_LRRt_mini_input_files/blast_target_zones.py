@@ -0,0 +1,85 @@
+#python blast_target_zones.py --gene_list genes.list --blast LRRt_blast.tsv --margin 5000 --max_zones 20 --seed 42 --output target_zones.bed
+
+"""
+Target zones of a gene list for extract_LRRt_mini_input_files.sh, computed in a single pass over the LRRtransfer BLAST output
+(replaces grep -w -f | cut | awk | bedtools sort | bedtools merge | shuf).
+- the BLAST hits whose query (first column) is in the gene list are kept (hash lookup),
+- their intervals (second column: target contig, 7th and 8th columns: hit bounds, in any order) are padded with the margin,
+- the padded intervals are merged per contig (overlapping or adjacent intervals),
+- at most max_zones merged zones are sampled with a seeded reservoir sampler (same seed, same zones) and written in BED format, sorted by contig and start.
+"""
+
+import argparse
+import random
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+Zone = Tuple[str, int, int]
+
+
+def read_gene_list(gene_list: str) -> Set[str]:
+    with open(gene_list, "r") as genes:
+        return {line.strip() for line in genes if line.strip()}
+
+
+def read_hit_intervals(blast_path: str, genes: Set[str], margin: int) -> Dict[str, List[Tuple[int, int]]]:
+    """Padded BED intervals (0-based start, clamped to 0) of the hits of the genes, per target contig."""
+    intervals: Dict[str, List[Tuple[int, int]]] = {}
+    with open(blast_path, "r") as blast:
+        for line in blast:
+            fields = line.split("\t", 8)
+            if len(fields) < 8 or fields[0] not in genes:
+                continue
+            start, end = sorted((int(fields[6]), int(fields[7])))
+            intervals.setdefault(fields[1], []).append((max(0, start - margin), end + margin))
+    return intervals
+
+
+def merge_intervals(intervals: Dict[str, List[Tuple[int, int]]]) -> Iterator[Zone]:
+    """Merge the overlapping or adjacent intervals of each contig (sweep over the sorted intervals), contigs in lexicographic order."""
+    for contig in sorted(intervals):
+        zone_start, zone_end = None, None
+        for start, end in sorted(intervals[contig]):
+            if zone_end is not None and start <= zone_end:
+                zone_end = max(zone_end, end)
+                continue
+            if zone_end is not None:
+                yield contig, zone_start, zone_end
+            zone_start, zone_end = start, end
+        if zone_end is not None:
+            yield contig, zone_start, zone_end
+
+
+def sample_zones(zones: Iterator[Zone], max_zones: int, seed: Optional[int] = None) -> List[Zone]:
+    """Reservoir sampling (algorithm R) of at most max_zones zones, returned sorted by contig and start."""
+    rng = random.Random(seed)
+    reservoir: List[Zone] = []
+    for nb_seen, zone in enumerate(zones):
+        if nb_seen < max_zones:
+            reservoir.append(zone)
+        else:
+            index = rng.randint(0, nb_seen)
+            if index < max_zones:
+                reservoir[index] = zone
+    return sorted(reservoir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write (a sample of) the merged target zones hit by the genes of a list in an LRRtransfer BLAST output, in BED format.")
+
+    parser.add_argument("--gene_list", required=True, help="File listing the gene IDs (one per line)")
+    parser.add_argument("--blast", required=True, help="LRRtransfer BLAST output (tabular)")
+    parser.add_argument("--margin", type=int, default=0, help="Margin (bp) added on both sides of the hits (default: 0)")
+    parser.add_argument("--max_zones", type=int, required=True, help="Maximum number of merged zones to sample")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the zone sampling (default: random)")
+    parser.add_argument("-o", "--output", required=True, help="Output BED file")
+
+    args = parser.parse_args()
+
+    intervals = read_hit_intervals(args.blast, read_gene_list(args.gene_list), args.margin)
+    zones = sample_zones(merge_intervals(intervals), args.max_zones, args.seed)
+    with open(args.output, "w") as out:
+        out.writelines(f"{contig}\t{start}\t{end}\n" for contig, start, end in zones)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-#extract_LRRt_mini_input_files.sh <UTILS_DIR> <GENE_LIST> <BLAST> <TARGET_GENOME> <REF_GENOME> <REF_GFF> <REF_LOCUS_INFO> <MAX_TARGET_ZONES> <OUTDIR> <REF_FASTA_MARGIN> <TARGET_FASTA_MARGIN>
+#extract_LRRt_mini_input_files.sh <UTILS_DIR> <GENE_LIST> <BLAST> <TARGET_GENOME> <REF_GENOME> <REF_GFF> <REF_LOCUS_INFO> <MAX_TARGET_ZONES> <OUTDIR> <REF_FASTA_MARGIN> <TARGET_FASTA_MARGIN> [<SAMPLING_SEED>]
 # E. g. when LRRtransfer has been run and you want to quickly re-run the transfer on a small subset of genes.
 # Requires :
 # a gene list file,
@@ -6,6 +6,7 @@
 # the target genome/ref genome/ref gff/ref locus info used as input for LRRt,
 # the max number of target zones you want to retain,
 # and the margins (bp) to add around sequences in the output ref and target fasta files
+# Optionally, the seed of the target zones sampling (default: 42, the same seed always gives the same zones)
 
 set -euo pipefail
 
@@ -20,6 +21,12 @@ MAX_TARGET_ZONES=$8
 OUTDIR=$9
 REF_FASTA_MARGIN=${10}
 TARGET_FASTA_MARGIN=${11}
+SAMPLING_SEED=${12:-42}
+
+SCRIPT_DIR="$(realpath "$(dirname "${BASH_SOURCE[0]}")")"
+FILTER_GFF_GENES=${SCRIPT_DIR}/../build_incremental_LRRome/filterGffGenes.py
+BLAST_TARGET_ZONES=${SCRIPT_DIR}/blast_target_zones.py
+INDEXED_FASTA=${SCRIPT_DIR}/indexed_fasta.py
 
 source ${UTILS_DIR}/bash_utils/init_utils.sh
 
@@ -54,23 +61,10 @@ check_gff_fasta_consistency() {
   local new_fasta=$4
 
   log "Checking for gff and fasta inconsistency"
-  module_load bedtools __
-  tmp_dir=$(create_and_return_tmp_dir)
-
-  gff_fasta_corresp=(
-    "$old_gff $old_fasta old_ref"
-    "$new_gff $new_fasta new_ref"
-  )
-  for elements in "${gff_fasta_corresp[@]}"; do
-    read -r gff fasta name <<<"$elements"
-    awk -F '[\t=;]' 'BEGIN{OFS="\t"}{print $1, $4-1, $5, $10}' $gff >${tmp_dir}/${name}.bed #Convert GFF to BED: GFF is 1-based with inclusive start and end, while BED is 0-based with inclusive start and exclusive end >> we substract 1 from start and leave end unchanged
-    bedtools getfasta -fi $fasta -bed ${tmp_dir}/${name}.bed -name | sed 's/::.*//' >${tmp_dir}/${name}.fasta
-  done
-
-  if ! diff ${tmp_dir}/old_ref.fasta ${tmp_dir}/new_ref.fasta >/dev/null; then
-    exit_with_error "Extracted sequences from fasta files don't match. Maybe there was an error when computing the new coordinates or extracting the corresponding sequences"
+  # GFF coordinates are 1-based with inclusive start and end, indexed_fasta.py converts them to 0-based half-open intervals
+  if ! python3 ${INDEXED_FASTA} check_consistency --old_gff $old_gff --old_fasta $old_fasta --new_gff $new_gff --new_fasta $new_fasta; then
+    exit_with_error "Extracted sequences from fasta files don't match (see the first mismatching feature above). Maybe there was an error when computing the new coordinates or extracting the corresponding sequences"
   fi
-  rm -r $tmp_dir
 }
 
 create_ref_gff_and_fasta() {
@@ -88,12 +82,9 @@ create_target_fasta() {
   local out_target_fasta=$1
 
   log "Creating the new target fasta file by sampling a maximum of ${MAX_TARGET_ZONES} zones, with a margin of ${TARGET_FASTA_MARGIN} bp of flanking sequence around each zone"
-  module_load bedtools __
   tmp_dir=$(create_and_return_tmp_dir)
-  grep -w -f ${GENE_LIST} ${BLAST} | cut -f2,7,8 | awk -v margin=$TARGET_FASTA_MARGIN 'BEGIN{OFS="\t"}{if ($2>$3){print $1, $3-margin, $2+margin} else {print $1,$2-margin,$3+margin}}' >${tmp_dir}/blast.bed
-  bedtools sort -i ${tmp_dir}/blast.bed | bedtools merge | shuf -n $MAX_TARGET_ZONES >${tmp_dir}/blast_merged_sample.bed
-  bedtools getfasta -fi ${TARGET_GENOME} -bed ${tmp_dir}/blast_merged_sample.bed -fo ${out_target_fasta}
-  sed -i '/^>/ s/:/_/' ${out_target_fasta}
+  python3 ${BLAST_TARGET_ZONES} --gene_list ${GENE_LIST} --blast ${BLAST} --margin ${TARGET_FASTA_MARGIN} --max_zones ${MAX_TARGET_ZONES} --seed ${SAMPLING_SEED} --output ${tmp_dir}/blast_merged_sample.bed
+  python3 ${INDEXED_FASTA} getfasta --fasta ${TARGET_GENOME} --bed ${tmp_dir}/blast_merged_sample.bed --output ${out_target_fasta}
 
   rm -r $tmp_dir
 }
@@ -140,9 +131,8 @@ print_config() {
 ## Main
 mkdir -p $OUTDIR
 
-# extract relevant genes from ref gff
-module_load singularity __
-singularity exec $GMT_SINGULARITY_IMAGE python $GMT/SCRIPT/CANDIDATE_LOCI/filter_gff_by_geneID.py -g ${REF_GFF} -l ${GENE_LIST} -o ${OUTDIR}/tmp_ref.gff
+# extract relevant genes (and their mRNA/exon/CDS) from ref gff
+python3 ${FILTER_GFF_GENES} -g ${REF_GFF} --keep_ids ${GENE_LIST} -o ${OUTDIR}/tmp_ref.gff
 
 # make ref gff and ref fasta
 create_ref_gff_and_fasta ${OUTDIR}/tmp_ref.gff ${OUTDIR}/ref.gff ${OUTDIR}/ref.fasta
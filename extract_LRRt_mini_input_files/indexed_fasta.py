@@ -0,0 +1,210 @@
+#python indexed_fasta.py getfasta --fasta genome.fasta --bed zones.bed --output zones.fasta
+#python indexed_fasta.py check_consistency --old_gff old.gff --old_fasta old.fasta --new_gff new.gff --new_fasta new.fasta
+
+"""
+Random access to FASTA files through a memory map and a .fai index (samtools faidx format, built and written next to the FASTA if missing or outdated).
+Used by extract_LRRt_mini_input_files.sh instead of bedtools getfasta on whole genomes:
+- getfasta: write the sequences of the zones of a BED file (headers '<contig>_<start>-<end>', as in the former bedtools getfasta | sed output,
+  zones going beyond the end of their contig are truncated),
+- check_consistency: check that each feature of two GFFs (same features, e.g. before/after recomputing coordinates) has the same sequence
+  in their respective FASTA, and report the first mismatching feature.
+"""
+
+import argparse
+import mmap
+import os
+import sys
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+
+class FaiEntry(NamedTuple):
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+def build_fai(fasta_path: str) -> Dict[str, FaiEntry]:
+    """Index a FASTA in one pass. Raises ValueError if the lines of a record (but the last one) do not all have the same length."""
+    index: Dict[str, FaiEntry] = {}
+    name, length, offset, line_bases, line_width = None, 0, 0, 0, 0
+    last_line_short = False
+    position = 0
+    with open(fasta_path, "rb") as fasta:
+        for line in fasta:
+            if line.startswith(b">"):
+                if name is not None:
+                    index[name] = FaiEntry(length, offset, line_bases, line_width)
+                name = line[1:].split()[0].decode()
+                length, offset, line_bases, line_width = 0, position + len(line), 0, 0
+                last_line_short = False
+            elif name is not None:
+                bases = len(line.rstrip(b"\r\n"))
+                if line_bases == 0:
+                    line_bases, line_width = bases, len(line)
+                elif bases and (last_line_short or bases > line_bases):
+                    raise ValueError(f"{fasta_path} cannot be indexed, the lines of {name} do not all have the same length")
+                last_line_short = bases < line_bases
+                length += bases
+            position += len(line)
+    if name is not None:
+        index[name] = FaiEntry(length, offset, line_bases, line_width)
+    return index
+
+
+def read_fai(fai_path: str) -> Dict[str, FaiEntry]:
+    index = {}
+    with open(fai_path, "r") as fai:
+        for line in fai:
+            fields = line.rstrip("\n").split("\t")
+            index[fields[0]] = FaiEntry(*(int(field) for field in fields[1:5]))
+    return index
+
+
+def write_fai(index: Dict[str, FaiEntry], fai_path: str) -> None:
+    with open(fai_path, "w") as fai:
+        fai.writelines(f"{name}\t{entry.length}\t{entry.offset}\t{entry.line_bases}\t{entry.line_width}\n" for name, entry in index.items())
+
+
+class IndexedFasta:
+    """Memory-mapped FASTA with a .fai index. Use it as a context manager."""
+
+    def __init__(self, fasta_path: str):
+        self.fasta_path = fasta_path
+        self.index = self.load_index(fasta_path)
+        self.file = open(fasta_path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(fasta_path) else b""
+
+    @staticmethod
+    def load_index(fasta_path: str) -> Dict[str, FaiEntry]:
+        fai_path = f"{fasta_path}.fai"
+        if os.path.exists(fai_path) and os.path.getmtime(fai_path) >= os.path.getmtime(fasta_path):
+            return read_fai(fai_path)
+        index = build_fai(fasta_path)
+        try:
+            write_fai(index, fai_path)
+        except OSError:
+            pass  # e.g. read-only genome directory: the index is only kept in memory
+        return index
+
+    def __enter__(self) -> "IndexedFasta":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def fetch(self, contig: str, start: int, end: int) -> bytes:
+        """
+        Sequence of contig between start (0-based, included) and end (excluded), as in BED.
+        Only the bytes of the region are read from the memory map (newlines removed if it spans several lines).
+        Raises KeyError if contig is not in the FASTA and ValueError if the region is out of its bounds.
+        """
+        entry = self.index.get(contig)
+        if entry is None:
+            raise KeyError(f"{contig} not found in {self.fasta_path} (requested {contig}:{start}-{end})")
+        if start < 0 or end > entry.length or start > end:
+            raise ValueError(f"{contig}:{start}-{end} is out of the bounds of {contig} (length {entry.length}) in {self.fasta_path}")
+        if start == end:
+            return b""
+        first_byte = entry.offset + (start // entry.line_bases) * entry.line_width + start % entry.line_bases
+        last_byte = entry.offset + ((end - 1) // entry.line_bases) * entry.line_width + (end - 1) % entry.line_bases
+        if start // entry.line_bases == (end - 1) // entry.line_bases:
+            return self.map[first_byte:last_byte + 1]
+        return self.map[first_byte:last_byte + 1].translate(None, b"\r\n")
+
+
+def read_bed(bed_path: str) -> Iterator[Tuple[str, int, int]]:
+    with open(bed_path, "r") as bed:
+        for line in bed:
+            if line.strip() and not line.startswith(("#", "track", "browser")):
+                fields = line.split("\t")
+                yield fields[0], int(fields[1]), int(fields[2])
+
+
+def getfasta(fasta_path: str, bed_path: str, output: str) -> None:
+    with IndexedFasta(fasta_path) as fasta, open(output, "wb") as out:
+        for contig, start, end in read_bed(bed_path):
+            if contig in fasta.index:
+                end = min(end, fasta.index[contig].length)  # zones padded beyond the end of the contig
+            out.write(f">{contig}_{start}-{end}\n".encode())
+            out.write(fasta.fetch(contig, start, end))
+            out.write(b"\n")
+
+
+def read_gff_features(gff_path: str) -> Iterator[Tuple[int, str, int, int, str]]:
+    """Yield (line number, contig, BED start, end, ID) for each feature of a GFF."""
+    with open(gff_path, "r") as gff:
+        for line_number, line in enumerate(gff, start=1):
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            feature_id = next((attribute[3:] for attribute in fields[8].split(";") if attribute.startswith("ID=")), "")
+            yield line_number, fields[0], int(fields[3]) - 1, int(fields[4]), feature_id
+
+
+def check_consistency(old_gff: str, old_fasta_path: str, new_gff: str, new_fasta_path: str) -> Optional[str]:
+    """Compare the sequences of the features of old_gff/new_gff (in the same order). Returns the description of the first mismatch (None if all match)."""
+    with IndexedFasta(old_fasta_path) as old_fasta, IndexedFasta(new_fasta_path) as new_fasta:
+        old_features, new_features = read_gff_features(old_gff), read_gff_features(new_gff)
+        for old_feature, new_feature in zip(old_features, new_features):
+            old_line, old_contig, old_start, old_end, feature_id = old_feature
+            new_line, new_contig, new_start, new_end, new_id = new_feature
+            try:
+                old_sequence = old_fasta.fetch(old_contig, old_start, old_end)
+                new_sequence = new_fasta.fetch(new_contig, new_start, new_end)
+            except (KeyError, ValueError) as error:
+                return (
+                    f"feature {feature_id} ({old_gff} line {old_line}: {old_contig}:{old_start + 1}-{old_end}) or feature {new_id} "
+                    f"({new_gff} line {new_line}: {new_contig}:{new_start + 1}-{new_end}) cannot be extracted: {error.args[0]}"
+                )
+            if old_sequence != new_sequence:
+                return (
+                    f"feature {feature_id} ({old_gff} line {old_line}: {old_contig}:{old_start + 1}-{old_end}, {old_end - old_start} bp) "
+                    f"has another sequence than feature {new_id} ({new_gff} line {new_line}: {new_contig}:{new_start + 1}-{new_end}, {new_end - new_start} bp)"
+                )
+        if next(old_features, None) is not None or next(new_features, None) is not None:
+            return f"{old_gff} and {new_gff} do not have the same number of features"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random access to FASTA files through a memory map and a .fai index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    getfasta_parser = subparsers.add_parser("getfasta", help="Write the sequences of the zones of a BED file")
+    getfasta_parser.add_argument("--fasta", required=True)
+    getfasta_parser.add_argument("--bed", required=True)
+    getfasta_parser.add_argument("-o", "--output", required=True)
+
+    check_parser = subparsers.add_parser("check_consistency", help="Check that the features of two GFFs have the same sequences in their respective FASTA")
+    check_parser.add_argument("--old_gff", required=True)
+    check_parser.add_argument("--old_fasta", required=True)
+    check_parser.add_argument("--new_gff", required=True)
+    check_parser.add_argument("--new_fasta", required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "getfasta":
+        try:
+            getfasta(args.fasta, args.bed, args.output)
+        except (KeyError, ValueError) as error:
+            print(f"Error: {error.args[0]}", file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "check_consistency":
+        try:
+            mismatch = check_consistency(args.old_gff, args.old_fasta, args.new_gff, args.new_fasta)
+        except ValueError as error:  # FASTA that cannot be indexed
+            print(f"Error: {error.args[0]}", file=sys.stderr)
+            sys.exit(1)
+        if mismatch is not None:
+            print(f"Sequences don't match: {mismatch}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
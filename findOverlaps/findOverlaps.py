@@ -1,12 +1,52 @@
 import pandas as pd
+import numpy as np
 import argparse
 import os
+from array import array
 
 
 ### ------------ Classes ---------------- ###
 
+class OverlapGraph:
+    """
+    Compact (CSR-like) adjacency of the overlaps between genes.
+    Genes are identified by their integer index in Gene.instances: the neighbors of gene i are neighbors[offsets[i]:offsets[i+1]], in the order the overlaps were added.
+    """
+
+    def __init__(self, offsets, neighbors):
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.counts = np.diff(offsets)
+
+    @classmethod
+    def from_edges(cls, num_genes, sources, targets):
+        """Builds the graph from two parallel arrays of directed edges (source gene index -> target gene index)."""
+        sources = np.frombuffer(sources, dtype=np.int64) if isinstance(sources, array) else np.asarray(sources, dtype=np.int64)
+        targets = np.frombuffer(targets, dtype=np.int64) if isinstance(targets, array) else np.asarray(targets, dtype=np.int64)
+        # A stable sort keeps the neighbors of each gene in insertion order
+        order = np.argsort(sources, kind='stable')
+        neighbors = targets[order].astype(np.int32)
+        offsets = np.zeros(num_genes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_genes), out=offsets[1:])
+        return cls(offsets, neighbors)
+
+    def num_genes(self):
+        return len(self.offsets) - 1
+
+    def degree(self, index):
+        """Returns the number of genes overlapping the gene at the given index."""
+        return int(self.counts[index])
+
+    def neighbors_of(self, index):
+        """Returns the indices of the genes overlapping the gene at the given index."""
+        return self.neighbors[self.offsets[index]:self.offsets[index + 1]]
+
+
 class Gene:
     instances = []
+    _overlap_sources = array('q')  # Overlaps stored as parallel arrays of gene indices (source -> target)
+    _overlap_targets = array('q')
+    _overlap_graph = None  # CSR view of the overlaps, rebuilt lazily when new overlaps are added
 
     def __init__(self, gene_id, start, end, dna_mol, gene_class=None, gene_fam=None, gene_origin=None, gene_source=None):
         self.gene_id = gene_id
@@ -17,17 +57,35 @@ class Gene:
         self.gene_fam = gene_fam
         self.gene_origin = gene_origin
         self.gene_source = gene_source
-        self.overlapping_genes = []  # List of overlapping genes in the other GFF
-        self.num_overlapping_genes = 0  # Count of overlapping genes
+        self.index = len(Gene.instances)  # Position of the gene in Gene.instances, used as node ID in the overlap graph
         Gene.instances.append(self)
+        Gene._overlap_graph = None
 
     def add_overlap(self, other_gene):
-        self.overlapping_genes.append(other_gene)
-        self.num_overlapping_genes += 1
+        Gene._overlap_sources.append(self.index)
+        Gene._overlap_targets.append(other_gene.index)
+        Gene._overlap_graph = None
+
+    @classmethod
+    def overlap_graph(cls):
+        """Returns the OverlapGraph of all the overlaps added so far."""
+        if cls._overlap_graph is None:
+            cls._overlap_graph = OverlapGraph.from_edges(len(cls.instances), cls._overlap_sources, cls._overlap_targets)
+        return cls._overlap_graph
+
+    @property
+    def overlapping_genes(self):
+        """List of overlapping genes in the other GFF (built on demand from the overlap graph)."""
+        return [Gene.instances[i] for i in Gene.overlap_graph().neighbors_of(self.index)]
+
+    @property
+    def num_overlapping_genes(self):
+        """Count of overlapping genes."""
+        return Gene.overlap_graph().degree(self.index)
 
     def get_overlapping_gene_ids(self):
         """Returns a human-readable list of the overlapped genes IDs."""
-        return [gene.gene_id for gene in self.overlapping_genes]
+        return [Gene.instances[i].gene_id for i in Gene.overlap_graph().neighbors_of(self.index)]
 
     def display(self):
         """Shows all attributes of the gene."""
@@ -46,10 +104,12 @@ class Gene:
     @classmethod
     def find_GeneOverlapGroups(cls):
         """Searches for all instances with more than one overlapping gene and instantiates a GeneOverlapGroup for each, first sorting the overlapping_genes by start coordinate."""
-        for gene in cls.instances:
-            if gene.num_overlapping_genes > 1:
-                sorted_overlapping_genes = sorted(gene.overlapping_genes, key=lambda x: x.start)
-                overlap_group = GeneOverlapGroup(gene, sorted_overlapping_genes)
+        graph = cls.overlap_graph()
+        starts = np.fromiter((gene.start for gene in cls.instances), dtype=np.int64, count=len(cls.instances))
+        for index in np.flatnonzero(graph.counts > 1):
+            neighbors = graph.neighbors_of(index)
+            sorted_neighbors = neighbors[np.argsort(starts[neighbors], kind='stable')]
+            overlap_group = GeneOverlapGroup(cls.instances[index], [cls.instances[i] for i in sorted_neighbors])
 
 
 class GeneOverlapGroup:
@@ -123,7 +183,9 @@ class GeneOverlapGroup:
 
     def all_overlaps_have_single_overlap(self):
         """Returns True if all overlapping genes have only one overlap, False otherwise."""
-        return all(gene.num_overlapping_genes == 1 for gene in self.overlapping_genes)
+        graph = Gene.overlap_graph()
+        indices = np.fromiter((gene.index for gene in self.overlapping_genes), dtype=np.int64)
+        return bool(np.all(graph.counts[indices] == 1))
 
 
     @classmethod
@@ -161,10 +223,24 @@ class GeneOverlapGroup:
 
 
 
-def read_gff(gff_path, source):
-    """Reads a GFF file and returns a dictionary of genes by DNA molecule (= chromosome strand)."""
+DUPLICATE_POLICIES = ['keep_first', 'report', 'error']
+
+
+def read_gff(gff_path, source, duplicate_policy='keep_first', duplicates=None):
+    """
+    Reads a GFF file and returns a dictionary of genes by DNA molecule (= chromosome strand).
+    Genes sharing the same ID and coordinates as a previously read gene are considered duplicates
+    (and are appended to the duplicates list if one is provided):
+    - with duplicate_policy='keep_first', only the first occurrence is kept (the duplicates are never instantiated)
+    - with duplicate_policy='report', all the copies are kept (as if duplicates were not checked) and the duplicates are only listed
+    - with duplicate_policy='error', a ValueError is raised.
+    """
+    if duplicate_policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {duplicate_policy} (accepted policies are {', '.join(DUPLICATE_POLICIES)})")
+
     gff_data = pd.read_csv(gff_path, sep='\t', comment='#', header=None)
     gff_dict = {}
+    seen_genes = set()
 
     for index, row in gff_data.iterrows():
         seqid, _, feature, start, end, _, strand, _, attributes = row
@@ -173,6 +249,25 @@ def read_gff(gff_path, source):
 
             dna_mol = f"{seqid}_{strand}"
 
+            # Skip duplicated genes (same ID and coordinates), unless they are only reported
+            gene_key = (gene_id, dna_mol, int(start), int(end))
+            if gene_key in seen_genes:
+                if duplicate_policy == 'error':
+                    raise ValueError(f"Gene {gene_id} ({seqid}:{int(start)}-{int(end)} {strand}) is present several times in {gff_path}")
+                if duplicates is not None:
+                    duplicates.append({
+                        "gff_file": os.path.basename(gff_path),
+                        "source": source,
+                        "gene_id": gene_id,
+                        "seqid": seqid,
+                        "strand": strand,
+                        "start": int(start),
+                        "end": int(end)
+                    })
+                if duplicate_policy == 'keep_first':
+                    continue
+            seen_genes.add(gene_key)
+
             # Extract extra info from the attributes field (ie the class and confidence if they can be found)
             gene_class = None
             gene_fam = None
@@ -220,8 +315,9 @@ def find_overlaps(ref_gff_dict, alt_gff_dict, alt_prefix, verbose=False):
     if verbose: print(f"\nDetecting overlaps...")
 
     results = []
+    dna_mols = ref_gff_dict.keys() | alt_gff_dict.keys()
 
-    for dna_mol in ref_gff_dict.keys() | alt_gff_dict.keys():
+    for dna_mol in dna_mols:
         for ref_gene in ref_gff_dict.get(dna_mol, []):
             for alt_gene in alt_gff_dict.get(dna_mol, []):
                 if overlap(ref_gene, alt_gene):
@@ -230,17 +326,19 @@ def find_overlaps(ref_gff_dict, alt_gff_dict, alt_prefix, verbose=False):
                     ref_gene.add_overlap(alt_gene)
                     alt_gene.add_overlap(ref_gene)
 
-        # For each REF gene, list its overlapping genes, and how many genes each of them overlaps
+    # For each REF gene, list its overlapping genes, and how many genes each of them overlaps (read from the overlap graph, built once all overlaps are known)
+    graph = Gene.overlap_graph()
+    for dna_mol in dna_mols:
         for ref_gene in ref_gff_dict.get(dna_mol, []):
-            overlapping_genes=ref_gene.overlapping_genes
-            num_overlaps_alt_genes=[gene.num_overlapping_genes for gene in overlapping_genes]
-            overlapping_gene_ids = ', '.join(ref_gene.get_overlapping_gene_ids())
+            neighbors = graph.neighbors_of(ref_gene.index)
+            num_overlaps_alt_genes = graph.counts[neighbors].tolist()
+            overlapping_gene_ids = ', '.join(Gene.instances[i].gene_id for i in neighbors)
             results.append((
                 ref_gene.gene_id,
                 ref_gene.gene_class,
                 ref_gene.gene_fam,
                 ref_gene.gene_origin,
-                ref_gene.num_overlapping_genes,
+                len(neighbors),
                 f"[{overlapping_gene_ids}]",
                 num_overlaps_alt_genes
             ))
@@ -248,9 +346,6 @@ def find_overlaps(ref_gff_dict, alt_gff_dict, alt_prefix, verbose=False):
 
     results_df = pd.DataFrame(results, columns=['REF_gene_id', 'REF_gene_class', 'REF_gene_fam', 'REF_gene_origin', f'REF_num_overlaps_{alt_prefix}', f'{alt_prefix}_overlaps_id', f'{alt_prefix}_num_overlaps'])
 
-    # delete potential duplicated rows (it can happen when an input gff contains duplicated genes by mistake)
-    results_df.drop_duplicates(subset=['REF_gene_id', 'REF_gene_class', 'REF_gene_fam'], inplace=True)
-
     return results_df
 
 
@@ -265,6 +360,8 @@ def main():
     parser.add_argument('--groups_output', help='Name of the output file for the overlapping groups results (optional).')
     parser.add_argument('--overreach_thr', type=float, help='Overreach max threshold to keep a group (if you provided a --groups_output). Set to 0.05 for 5% of the main gene length.')
     parser.add_argument('--overlap_thr', type=float, help='Overlap max threshold to keep a group (if you provided a --groups_output). Set to 0.05 for 5% of the main gene length.')
+    parser.add_argument('--duplicates', choices=DUPLICATE_POLICIES, default='keep_first', help="What to do with genes present several times (same ID and coordinates) in an input GFF: keep the first occurrence only ('keep_first', default), keep all the copies and only list the duplicates in --duplicates_output ('report'), or stop with an error ('error'). With 'keep_first', the skipped duplicates can also be listed with --duplicates_output.")
+    parser.add_argument('--duplicates_output', help="Name of the output file listing the duplicated genes (required with '--duplicates report', optional otherwise).")
     parser.add_argument('--prefix', default='', help='Prefix for the ALT gene id column name.')
     parser.add_argument('--verbose', action='store_true', help="Display more information.")
     parser.add_argument('--show_all_genes', action='store_true', help="Display information for all genes in both GFF files.")
@@ -277,11 +374,21 @@ def main():
     if args.groups_output:
         if args.overreach_thr is None or args.overlap_thr is None:
             parser.error("--overreach_thr and --overlap_thr are required when a --groups_output is provided.")
+    if args.duplicates == 'report' and not args.duplicates_output:
+        parser.error("--duplicates_output is required with '--duplicates report'.")
 
 
     ## READ INPUT GFF FILES
-    ref_gff_dict = read_gff(args.ref_gff, "REF")
-    alt_gff_dict = read_gff(args.alt_gff, "ALT")
+    duplicates = []
+    ref_gff_dict = read_gff(args.ref_gff, "REF", args.duplicates, duplicates)
+    alt_gff_dict = read_gff(args.alt_gff, "ALT", args.duplicates, duplicates)
+
+    if duplicates:
+        kept = "all the copies were kept" if args.duplicates == 'report' else "only the first occurrence of each gene was kept"
+        print(f"\nWARNING: {len(duplicates)} duplicated gene(s) found in the input GFF files ({kept}).")
+    if args.duplicates_output:
+        pd.DataFrame(duplicates, columns=["gff_file", "source", "gene_id", "seqid", "strand", "start", "end"]).to_csv(args.duplicates_output, sep='\t', index=False)
+        print(f"\nDuplicated genes saved to {args.duplicates_output}\n")
 
 
     ## DETECT OVERLAPS
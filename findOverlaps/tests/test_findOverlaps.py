@@ -5,7 +5,7 @@ script_dir = os.path.dirname(__file__)
 script_dir = "/".join(script_dir.split("/")[:-1]) + "/"
 sys.path.append(script_dir)
 
-from findOverlaps import Gene, GeneOverlapGroup
+from findOverlaps import Gene, GeneOverlapGroup, OverlapGraph, read_gff
 
 
 # Fixture pour créer des groupes d'overlap dynamiquement
@@ -57,3 +57,63 @@ def test_overlaps_dont_overlap(main_gene_data, overlap_genes_data, threshold, ex
 
     result = overlap_group.overlaps_dont_overlap(threshold)
     assert result == expected_result
+
+
+
+# Test de la représentation compacte (CSR) des overlaps
+def test_overlap_graph_from_edges():
+    graph = OverlapGraph.from_edges(4, [0, 2, 0, 3, 2], [2, 0, 3, 0, 1])
+    assert graph.offsets.tolist() == [0, 2, 2, 4, 5]
+    assert graph.neighbors_of(0).tolist() == [2, 3]
+    assert graph.neighbors_of(1).tolist() == []
+    assert graph.neighbors_of(2).tolist() == [0, 1]
+    assert [graph.degree(i) for i in range(4)] == [2, 0, 2, 1]
+
+
+def test_gene_overlaps_view():
+    main_gene = Gene("ref1", 500, 600, "chr1")
+    alt_a = Gene("alt1", 550, 580, "chr1")
+    alt_b = Gene("alt2", 510, 530, "chr1")
+    for alt_gene in (alt_a, alt_b):
+        main_gene.add_overlap(alt_gene)
+        alt_gene.add_overlap(main_gene)
+
+    assert main_gene.overlapping_genes == [alt_a, alt_b]
+    assert main_gene.num_overlapping_genes == 2
+    assert alt_a.get_overlapping_gene_ids() == ["ref1"]
+
+    Gene.find_GeneOverlapGroups()
+    group = GeneOverlapGroup.instances[-1]
+    assert group.main_gene is main_gene
+    assert group.overlapping_genes == [alt_b, alt_a]
+    assert group.all_overlaps_have_single_overlap()
+
+
+# Test de la gestion des gènes dupliqués à la lecture du gff
+@pytest.mark.parametrize("duplicate_policy, expected_genes", [
+    # keep_first: the duplicate is skipped
+    ("keep_first", ["gene1", "gene2"]),
+    # report: all the copies are kept, the duplicate is only listed
+    ("report", ["gene1", "gene2", "gene1"]),
+])
+def test_read_gff_duplicates(tmp_path, duplicate_policy, expected_genes):
+    gff = tmp_path / "dup.gff"
+    gff.write_text(
+        "chr1\tsource\tgene\t100\t200\t.\t+\t.\tID=gene1\n"
+        "chr1\tsource\tgene\t300\t400\t.\t+\t.\tID=gene2\n"
+        "chr1\tsource\tgene\t100\t200\t.\t+\t.\tID=gene1\n"
+    )
+    duplicates = []
+    gff_dict = read_gff(str(gff), "REF", duplicate_policy, duplicates)
+    assert [gene.gene_id for gene in gff_dict["chr1_+"]] == expected_genes
+    assert [(dup["gene_id"], dup["start"], dup["end"]) for dup in duplicates] == [("gene1", 100, 200)]
+
+
+def test_read_gff_duplicates_error(tmp_path):
+    gff = tmp_path / "dup.gff"
+    gff.write_text(
+        "chr1\tsource\tgene\t100\t200\t.\t+\t.\tID=gene1\n"
+        "chr1\tsource\tgene\t100\t200\t.\t+\t.\tID=gene1\n"
+    )
+    with pytest.raises(ValueError):
+        read_gff(str(gff), "REF", "error")
@@ -0,0 +1,137 @@
+#python extractGenesFromZones.py --gff annot.gff --zones zones.tsv --out_dir GFFperChr
+
+"""
+Extract the genes included in or overlapping a list of zones (chr start end, 1-based inclusive) in a single pass over the GFF.
+A gene is selected if one of its exons overlaps a zone, even partially (e.g. only one of its exons is in the zone), and is then kept whole
+with all its descendants (mRNA, exon, CDS...). A gene whose span overlaps a zone only through an intron is not selected; a gene without
+exon is selected on its own span. The descendants are found through their Parent attribute: each gene model is buffered until the next
+top-level feature, so the features of a model must follow its gene (as in AGAT/gff_cleaner outputs).
+The kept features are written directly in one GFF per chromosome of the zones (<out_dir>/<chr>_in_zones.gff), in the input order;
+a gene overlapping several zones is written once.
+"""
+
+import argparse
+import bisect
+import os
+from typing import Dict, List, Optional, Set, TextIO, Tuple
+
+
+class ZoneIndex:
+    """Zones of one chromosome sorted by start, with the running maximum of their ends to answer overlap queries in O(log n)."""
+
+    def __init__(self, zones: List[Tuple[int, int]]):
+        zones = sorted(zones)
+        self.starts = [start for start, _ in zones]
+        self.max_ends = []
+        max_end = None
+        for _, end in zones:
+            max_end = end if max_end is None else max(max_end, end)
+            self.max_ends.append(max_end)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if [start, end] overlaps a zone (both inclusive)."""
+        nb_zones_starting_before_end = bisect.bisect_right(self.starts, end)
+        return nb_zones_starting_before_end > 0 and self.max_ends[nb_zones_starting_before_end - 1] >= start
+
+
+def read_zones(zones_path: str) -> Dict[str, ZoneIndex]:
+    zones: Dict[str, List[Tuple[int, int]]] = {}
+    with open(zones_path, "r") as zones_file:
+        for line in zones_file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split()
+            zones.setdefault(fields[0], []).append((int(fields[1]), int(fields[2])))
+    return {chrom: ZoneIndex(chrom_zones) for chrom, chrom_zones in zones.items()}
+
+
+def get_attribute(attributes: str, key: str) -> Optional[str]:
+    for attribute in attributes.rstrip("\n").split(";"):
+        if attribute.startswith(key + "="):
+            return attribute[len(key) + 1:]
+    return None
+
+
+class PendingModel:
+    """A top-level feature and the descendants read after it, until the selection of the model is decided."""
+
+    def __init__(self, chrom: str, start: int, end: int, feature_id: Optional[str], line: str):
+        self.chrom = chrom
+        self.start = start
+        self.end = end
+        self.ids: Set[str] = {feature_id} if feature_id is not None else set()
+        self.lines = [line]
+        self.has_exon = False
+        self.exon_in_zone = False
+
+    def in_zone(self, zone_index: ZoneIndex) -> bool:
+        return self.exon_in_zone if self.has_exon else zone_index.overlaps(self.start, self.end)
+
+
+def extract_genes_from_zones(gff: TextIO, zones: Dict[str, ZoneIndex], outputs: Dict[str, TextIO]) -> int:
+    """Write the top-level features of gff with an exon overlapping a zone, and their descendants, to the output of their chromosome. Returns the number of kept top-level features."""
+    kept_features: Set[str] = set()
+    nb_kept = 0
+    model: Optional[PendingModel] = None
+
+    def flush(model: Optional[PendingModel]) -> int:
+        if model is None or not model.in_zone(zones[model.chrom]):
+            return 0
+        kept_features.update(model.ids)
+        outputs[model.chrom].writelines(model.lines)
+        return 1
+
+    for line in gff:
+        if line.startswith("#") or not line.strip():
+            continue
+        fields = line.split("\t")
+        chrom = fields[0]
+        if chrom not in zones:
+            continue
+        feature_id = get_attribute(fields[8], "ID")
+        parents = get_attribute(fields[8], "Parent")
+        if parents is None:
+            nb_kept += flush(model)
+            model = PendingModel(chrom, int(fields[3]), int(fields[4]), feature_id, line)
+            continue
+        parent_ids = parents.split(",")
+        if model is not None and any(parent_id in model.ids for parent_id in parent_ids):
+            model.lines.append(line)
+            if feature_id is not None:
+                model.ids.add(feature_id)
+            if fields[2] == "exon":
+                model.has_exon = True
+                model.exon_in_zone = model.exon_in_zone or zones[chrom].overlaps(int(fields[3]), int(fields[4]))
+        elif any(parent_id in kept_features for parent_id in parent_ids):
+            if feature_id is not None:
+                kept_features.add(feature_id)
+            outputs[chrom].write(line)
+    nb_kept += flush(model)
+    return nb_kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write, per chromosome, the genes (with all their features) included in or overlapping a list of zones, in a single pass over the GFF.")
+
+    parser.add_argument("-g", "--gff", required=True, help="Input annotation GFF")
+    parser.add_argument("-z", "--zones", required=True, help="Zones file: chr, start, end (1-based, inclusive), one zone per line")
+    parser.add_argument("-o", "--out_dir", required=True, help="Output directory of the <chr>_in_zones.gff files")
+
+    args = parser.parse_args()
+
+    zones = read_zones(args.zones)
+    os.makedirs(args.out_dir, exist_ok=True)
+    outputs = {chrom: open(os.path.join(args.out_dir, f"{chrom}_in_zones.gff"), "w", buffering=1 << 20) for chrom in sorted(zones)}
+    try:
+        for output in outputs.values():
+            output.write("##gff-version 3\n")
+        with open(args.gff, "r") as gff:
+            nb_kept = extract_genes_from_zones(gff, zones, outputs)
+    finally:
+        for output in outputs.values():
+            output.close()
+    print(f"{nb_kept} gene(s) selected within the {sum(len(index.starts) for index in zones.values())} zone(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#python gffRegionStore.py build --gff annot.gff --output annot.gff.bgz
+#python gffRegionStore.py query --store annot.gff.bgz Chr1A:8000000-10000000 [Chr2B:1-500000 ...]
+
+"""
+Region-indexed GFF store: a coordinate-sorted, BGZF-compressed GFF (readable with zcat) and its region index (<store>.gri),
+to read the gene models of a few windows of a big GFF without reading the whole file.
+- Gene models (a top-level feature and all its descendants, found through Parent) are kept intact and sorted by chromosome, start and end.
+- The index is a linear index per chromosome: for each window of INDEX_WINDOW bp, the virtual offset (BGZF block offset << 16 | offset in the block)
+  of the first gene model overlapping it. A query seeks straight to the block of its first window and reads the gene models until they start after the region.
+A gene model is returned by a query if its top-level feature overlaps the region (1-based, inclusive), as in extractGenesFromZones.py.
+"""
+
+import argparse
+import gzip
+import json
+import re
+import struct
+import sys
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = 1
+INDEX_WINDOW = 16384
+BGZF_MAX_BLOCK_DATA = 65280
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+## BGZF
+
+def bgzf_block(data: bytes) -> bytes:
+    """One BGZF block: a gzip member with the 'BC' extra subfield giving its compressed size."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00" + struct.pack("<H", len(compressed) + 25)
+    return header + compressed + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+class BgzfWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "wb")
+        self.buffer = bytearray()
+        self.block_offset = 0
+
+    def virtual_offset(self) -> int:
+        return (self.block_offset << 16) | len(self.buffer)
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        while len(self.buffer) >= BGZF_MAX_BLOCK_DATA:
+            self.flush_block(bytes(self.buffer[:BGZF_MAX_BLOCK_DATA]))
+            del self.buffer[:BGZF_MAX_BLOCK_DATA]
+
+    def flush_block(self, data: bytes) -> None:
+        block = bgzf_block(data)
+        self.file.write(block)
+        self.block_offset += len(block)
+
+    def close(self) -> None:
+        if self.buffer:
+            self.flush_block(bytes(self.buffer))
+            self.buffer = bytearray()
+        self.file.write(BGZF_EOF)
+        self.file.close()
+
+
+## Building
+
+def get_attribute(attributes: str, key: str) -> Optional[str]:
+    for attribute in attributes.rstrip("\n").split(";"):
+        if attribute.startswith(key + "="):
+            return attribute[len(key) + 1:]
+    return None
+
+
+def read_gene_models(gff_path: str) -> List[Tuple[str, int, int, List[str]]]:
+    """Group the lines of a GFF into gene models: (chromosome, start, end, lines), a descendant being attached to the model of its first parent."""
+    models: List[Tuple[str, int, int, List[str]]] = []
+    model_of_feature: Dict[str, int] = {}
+    with open(gff_path, "r") as gff:
+        for line in gff:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.split("\t")
+            if not line.endswith("\n"):
+                line += "\n"
+            feature_id = get_attribute(fields[8], "ID")
+            parents = get_attribute(fields[8], "Parent")
+            start, end = int(fields[3]), int(fields[4])
+            model_index = model_of_feature.get(parents.split(",")[0]) if parents is not None else None
+            if model_index is None:
+                if parents is not None:
+                    print(f"WARNING: parent of {feature_id or line.strip()} not found before it, indexed as a top-level feature", file=sys.stderr)
+                models.append((fields[0], start, end, [line]))
+                model_index = len(models) - 1
+            else:
+                chrom, model_start, model_end, lines = models[model_index]
+                lines.append(line)
+                models[model_index] = (chrom, min(model_start, start), max(model_end, end), lines)
+            if feature_id is not None:
+                model_of_feature[feature_id] = model_index
+    return models
+
+
+def build_store(gff_path: str, store_path: str) -> int:
+    """Write the sorted BGZF store and its index. Returns the number of gene models."""
+    models = sorted(read_gene_models(gff_path), key=lambda model: model[:3])
+    index: Dict[str, List[Optional[int]]] = {}
+    writer = BgzfWriter(store_path)
+    for chrom, start, end, lines in models:
+        linear = index.setdefault(chrom, [])
+        virtual_offset = writer.virtual_offset()
+        last_window = (end - 1) // INDEX_WINDOW
+        if len(linear) <= last_window:
+            linear.extend([None] * (last_window + 1 - len(linear)))
+        for window in range((start - 1) // INDEX_WINDOW, last_window + 1):
+            if linear[window] is None:
+                linear[window] = virtual_offset
+        writer.write("".join(lines).encode())
+    writer.close()
+    with gzip.open(f"{store_path}.gri", "wt") as index_file:
+        json.dump({"version": INDEX_VERSION, "window": INDEX_WINDOW, "linear": index}, index_file)
+    return len(models)
+
+
+## Querying
+
+def parse_region(region: str) -> Tuple[str, int, Optional[int]]:
+    """'chr:start-end' (1-based, inclusive, commas allowed) or 'chr' (whole chromosome)."""
+    match = re.fullmatch(r"(.+?)(?::([\d,]+)(?:-([\d,]+))?)?", region.strip())
+    if match is None:
+        raise ValueError(f"Error: invalid region {region}")
+    chrom, start, end = match.groups()
+    start = int(start.replace(",", "")) if start else 1
+    end = int(end.replace(",", "")) if end else (start if match.group(2) else None)
+    return chrom, start, end
+
+
+class GffRegionStore:
+    """Region queries on a store written by build_store. Use it as a context manager."""
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        with gzip.open(f"{store_path}.gri", "rt") as index_file:
+            index = json.load(index_file)
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Error: unsupported index version in {store_path}.gri")
+        self.window = index["window"]
+        self.linear: Dict[str, List[Optional[int]]] = index["linear"]
+        self.file = open(store_path, "rb")
+
+    def __enter__(self) -> "GffRegionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def first_offset(self, chrom: str, start: int, end: Optional[int]) -> Optional[int]:
+        """Virtual offset of the first gene model that may overlap the region (None if none can)."""
+        linear = self.linear.get(chrom, [])
+        last_window = len(linear) - 1 if end is None else min(len(linear) - 1, (end - 1) // self.window)
+        for window in range((start - 1) // self.window, last_window + 1):
+            if linear[window] is not None:
+                return linear[window]
+        return None
+
+    def query(self, chrom: str, start: int = 1, end: Optional[int] = None) -> Iterator[List[str]]:
+        """Yield the lines of each gene model whose top-level feature overlaps chrom:start-end (1-based, inclusive; end=None: up to the chromosome end)."""
+        virtual_offset = self.first_offset(chrom, start, end)
+        if virtual_offset is None:
+            return
+        self.file.seek(virtual_offset >> 16)
+        with gzip.GzipFile(fileobj=self.file, mode="rb") as store:
+            store.read(virtual_offset & 0xFFFF)
+            model: List[str] = []
+            model_overlaps = False
+            for raw_line in store:
+                line = raw_line.decode()
+                fields = line.split("\t")
+                if get_attribute(fields[8], "Parent") is None:
+                    if model_overlaps:
+                        yield model
+                    feature_start, feature_end = int(fields[3]), int(fields[4])
+                    if fields[0] != chrom or (end is not None and feature_start > end):
+                        return
+                    model, model_overlaps = [line], feature_end >= start
+                else:
+                    model.append(line)
+            if model_overlaps:
+                yield model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Region-indexed GFF store: sorted BGZF GFF with intact gene models and a region index, for fast region queries.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Write the sorted BGZF store of a GFF and its index (<store>.gri)")
+    build_parser.add_argument("--gff", required=True, help="Input GFF")
+    build_parser.add_argument("-o", "--output", required=True, help="Output store (e.g. annot.gff.bgz)")
+
+    query_parser = subparsers.add_parser("query", help="Print the gene models overlapping regions")
+    query_parser.add_argument("--store", required=True, help="Store written by the build command")
+    query_parser.add_argument("regions", nargs="+", help="Regions: chr:start-end (1-based, inclusive) or chr")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        nb_models = build_store(args.gff, args.output)
+        print(f"INFO: {nb_models} gene model(s) written to {args.output} (index: {args.output}.gri)", file=sys.stderr)
+    elif args.command == "query":
+        with GffRegionStore(args.store) as store:
+            for region in args.regions:
+                for model in store.query(*parse_region(region)):
+                    sys.stdout.writelines(model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import io
+import subprocess
+from pathlib import Path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from extractGenesFromZones import ZoneIndex, extract_genes_from_zones
+
+TEST_DIR = os.path.dirname(__file__)
+EXON_OVERLAP_DIR = f"{TEST_DIR}/exon_overlap_region"
+SCRIPT = os.path.abspath(os.path.join(TEST_DIR, "..", "extractGenesFromZones.py"))
+
+
+def extract(gff_path: str, chrom: str, zones: list) -> str:
+    output = io.StringIO()
+    with open(gff_path) as gff:
+        extract_genes_from_zones(gff, {chrom: ZoneIndex(zones)}, {chrom: output})
+    return output.getvalue()
+
+
+def test_exon_overlap_region(tmp_path: Path):
+    subprocess.run([
+        "python3", SCRIPT,
+        "--gff", f"{EXON_OVERLAP_DIR}/input.gff",
+        "--zones", f"{EXON_OVERLAP_DIR}/zones.tsv",
+        "--out_dir", str(tmp_path),
+    ], check=True)
+    observed = (tmp_path / "Chr1A_in_zones.gff").read_text()
+    assert observed == "##gff-version 3\n" + Path(f"{EXON_OVERLAP_DIR}/output.gff").read_text()
+
+
+@pytest.mark.parametrize("zone, selected", [
+    # Only the second exon (8209197-8212284) overlaps the zone
+    ((8212000, 8300000), True),
+    # The first exon (8208734-8209104) ends in the zone
+    ((8209000, 8209150), True),
+    # The zone is inside the intron (8209105-8209196): the gene span overlaps it, but none of its exons
+    ((8209110, 8209190), False),
+    ((8300000, 8400000), False),
+])
+def test_gene_selected_by_exon_overlap(zone, selected):
+    observed = extract(f"{EXON_OVERLAP_DIR}/input.gff", "Chr1A", [zone])
+    expected = Path(f"{EXON_OVERLAP_DIR}/input.gff").read_text() if selected else ""
+    assert observed == expected
+
+
+def test_gene_without_exon_selected_by_span(tmp_path: Path):
+    gff = tmp_path / "no_exon.gff"
+    gff.write_text("Chr1\t.\tgene\t100\t200\t.\t+\t.\tID=g1\nChr1\t.\tgene\t300\t400\t.\t+\t.\tID=g2\n")
+    assert extract(str(gff), "Chr1", [(150, 160)]) == "Chr1\t.\tgene\t100\t200\t.\t+\t.\tID=g1\n"